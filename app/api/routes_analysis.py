@@ -83,5 +83,6 @@ def get_antenna_pattern(model_id):
             "name": model.name,
             "horizontal_pattern": model.horizontal_pattern,
             "vertical_pattern": model.vertical_pattern,
+            "pattern_unit": model.pattern_unit,
             "gain_dbi": model.gain_dbi
         })
@@ -4,15 +4,20 @@ from http import HTTPStatus
 import json
 from typing import Any, Dict
 
-from flask import Blueprint, jsonify, request, send_from_directory
+import numpy as np
+from flask import Blueprint, jsonify, request, send_file, send_from_directory
 from geoalchemy2.shape import from_shape
+from rasterio.errors import RasterioIOError
 from shapely.geometry import Point
 from sqlalchemy import cast, func, select
 from sqlalchemy.types import Integer
 
 from app.config import get_session
+from app.core.population import PopulationRaster
+from app.core.rasters import read_raster, render_png, render_style
+from app.core.result_cache import coverage_cache, coverage_key_for
 from app.models import Project, ProjectArtifact, Simulation, Station, VectorFeature, VectorLayer
-from app.tasks import run_coverage_simulation
+from app.tasks import record_simulation_result, run_coverage_simulation
 
 core_bp = Blueprint("core", __name__)
 
@@ -108,6 +113,12 @@ def start_simulation():
         session.add(simulation)
         session.flush()
 
+        # Identical physical inputs already computed: reuse the raster instead of enqueueing.
+        cached = coverage_cache.get(coverage_key_for(station, radius_km))
+        if cached is not None:
+            record_simulation_result(simulation, cached, session)
+            return jsonify({"simulation_id": simulation.id, "task_id": None, "cached": True}), HTTPStatus.OK
+
         async_result = run_coverage_simulation.delay(simulation.id, radius_km)
         simulation.task_id = async_result.id
         session.flush()
@@ -126,6 +137,7 @@ def simulation_status(simulation_id: str):
             "simulation_id": simulation.id,
             "status": simulation.status,
             "result_path": simulation.result_path,
+            "overlay_url": f"/api/simulation/{simulation.id}/overlay.png" if simulation.result_path else None,
             "bbox": {
                 "north": simulation.bbox_north,
                 "south": simulation.bbox_south,
@@ -138,6 +150,37 @@ def simulation_status(simulation_id: str):
         return jsonify(response)
 
 
+@core_bp.get("/simulation/<string:simulation_id>/overlay.png")
+def simulation_overlay(simulation_id: str):
+    """Render (or reuse a cached render of) the simulation raster as a PNG overlay."""
+    with get_session() as session:
+        simulation = session.get(Simulation, simulation_id)
+        if not simulation:
+            return jsonify({"error": "Simulation not found"}), HTTPStatus.NOT_FOUND
+        if not simulation.result_path:
+            return jsonify({"error": "Simulation not complete"}), HTTPStatus.BAD_REQUEST
+        raster_path = simulation.result_path
+        artifact = next((a for a in simulation.artifacts if a.file_path == raster_path), None)
+        style: Dict[str, Any] = dict(artifact.style_metadata or {}) if artifact else {}
+
+    if raster_path.endswith(".png"):
+        # Results from before rasters were persisted.
+        return send_file(raster_path, mimetype="image/png")
+
+    try:
+        if "cmap" in request.args:
+            style["cmap"] = request.args["cmap"]
+        for key in ("alpha", "vmin", "vmax", "mask_below", "mask_above"):
+            if key in request.args:
+                style[key] = float(request.args[key])
+        png_path = render_png(raster_path, **render_style(**style))
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), HTTPStatus.BAD_REQUEST
+    except FileNotFoundError:
+        return jsonify({"error": "Result raster not found"}), HTTPStatus.NOT_FOUND
+    return send_file(png_path, mimetype="image/png")
+
+
 @core_bp.get("/analytics/population")
 def analytics_population():
     simulation_id = request.args.get("simulation_id")
@@ -153,13 +196,32 @@ def analytics_population():
         ):
             return jsonify({"error": "Simulation not complete"}), HTTPStatus.BAD_REQUEST
 
-        envelope = func.ST_MakeEnvelope(
-            simulation.bbox_west,
-            simulation.bbox_south,
-            simulation.bbox_east,
-            simulation.bbox_north,
-            4326,
-        )
+        bbox = {
+            "north": simulation.bbox_north,
+            "south": simulation.bbox_south,
+            "east": simulation.bbox_east,
+            "west": simulation.bbox_west,
+        }
+        raster = PopulationRaster.default()
+        if raster is not None and simulation.result_path.endswith(".tif"):
+            # Cells of the study raster (optionally within [mask_below, mask_above]).
+            try:
+                values = np.flipud(read_raster(simulation.result_path)[0])
+                thresholds = {key: float(request.args[key]) for key in ("mask_below", "mask_above") if key in request.args}
+            except ValueError as exc:
+                return jsonify({"error": str(exc)}), HTTPStatus.BAD_REQUEST
+            except (FileNotFoundError, RasterioIOError):
+                return jsonify({"error": "Result raster not found"}), HTTPStatus.NOT_FOUND
+            mask = ~np.isnan(values)
+            if "mask_below" in thresholds:
+                mask &= values >= thresholds["mask_below"]
+            if "mask_above" in thresholds:
+                mask &= values <= thresholds["mask_above"]
+            total_population, households = raster.sum_where(mask, bbox)
+            return jsonify({"total_population": total_population, "households": households})
+
+        # No population raster built yet: every sector touching the bbox.
+        envelope = func.ST_MakeEnvelope(bbox["west"], bbox["south"], bbox["east"], bbox["north"], 4326)
 
         population_sum = func.sum(cast(VectorFeature.properties["population"].astext, Integer))
         household_sum = func.sum(cast(VectorFeature.properties["households"].astext, Integer))
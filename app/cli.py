@@ -76,3 +76,58 @@ def register_cli(app: Flask) -> None:
         from app.seeds.regulatory_data import seed_regulatory_data
         seed_regulatory_data()
         click.echo("Regulatory data seeded.")
+
+    @app.cli.group("terrain")
+    def terrain_cmd():
+        """Terrain data commands."""
+
+    @terrain_cmd.command("build-store")
+    @click.option("--srtm-root", default="SRTM", show_default=True, help="Directory with .hgt tiles")
+    @click.option("--out", "store_root", help="Output directory (defaults to <srtm-root>/store)")
+    @click.option("--levels", default="3,9,30", show_default=True, help="Overview levels in arcsec")
+    def build_store(srtm_root: str, store_root: str | None, levels: str):
+        """Convert HGT tiles into a tiled, compressed multi-resolution GeoTIFF store."""
+        from pathlib import Path
+
+        from app.core.terrain_store import build_terrain_store
+
+        target = Path(store_root) if store_root else Path(srtm_root) / "store"
+        levels_arcsec = [int(level) for level in levels.split(",") if level.strip()]
+        written = build_terrain_store(srtm_root, target, levels_arcsec)
+        for arcsec, path in sorted(written.items()):
+            click.echo(f'{arcsec}": {path}')
+
+    @app.cli.group("population")
+    def population_cmd():
+        """Population data commands."""
+
+    @population_cmd.command("build-raster")
+    @click.option("--out", "out_path", help="Output GeoTIFF (defaults to POPULATION_RASTER)")
+    @click.option("--resolution", default=100, show_default=True, help="Cell size in metres")
+    def build_population(out_path: str | None, resolution: int):
+        """Rasterize census sector population (area-weighted) for impacted-population queries."""
+        from app.config import AppConfig, get_session
+        from app.core.population import build_population_raster
+
+        with get_session() as session:
+            path = build_population_raster(session, out_path or AppConfig().POPULATION_RASTER, resolution)
+        click.echo(f"Population raster written to {path}")
+
+    @app.cli.group("viability")
+    def viability_cmd():
+        """Plan-wide viability studies."""
+
+    @viability_cmd.command("sweep")
+    @click.option("--service", "service_type", default="FM", show_default=True, help="Service type (FM/TV)")
+    @click.option("--workers", type=int, help="Processes (defaults to INTERFERENCE_WORKERS)")
+    def viability_sweep(service_type: str, workers: int | None):
+        """Contour-screen every station pair of a service and store the conflict table."""
+        from app.config import get_session
+        from app.regulatory.sweep import sweep_service
+
+        with get_session() as session:
+            counts = sweep_service(session, service_type, workers=workers)
+        click.echo(
+            f"{counts['stations']} stations, {counts['pairs']} pairs screened, "
+            f"{counts['conflicts']} conflicts stored in station_conflicts"
+        )
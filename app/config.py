@@ -110,6 +110,13 @@ class AppConfig:
     MAIL_PASSWORD: Optional[str] = os.getenv("MAIL_PASSWORD")
     MAIL_USE_TLS: bool = os.getenv("MAIL_USE_TLS", "True").lower() == "true"
     MAIL_DEFAULT_SENDER: str = os.getenv("MAIL_DEFAULT_SENDER", "noreply@spectrum.com")
+    RESULT_CACHE_MAX_MB: int = int(os.getenv("RESULT_CACHE_MAX_MB", "2048"))
+    LOSS_STORE_MAX_MB: int = int(os.getenv("LOSS_STORE_MAX_MB", "4096"))
+    PROFILE_CACHE_MAX_MB: int = int(os.getenv("PROFILE_CACHE_MAX_MB", "512"))
+    RENDER_CACHE_MAX_MB: int = int(os.getenv("RENDER_CACHE_MAX_MB", "256"))
+    INTERFERENCE_WORKERS: int = int(os.getenv("INTERFERENCE_WORKERS", "1"))
+    POPULATION_RASTER: str = os.getenv("POPULATION_RASTER", "population/population.tif")
+    STATION_INDEX_REFRESH_S: float = float(os.getenv("STATION_INDEX_REFRESH_S", "5"))
 
 
 def init_db(bind: Optional[Engine] = None) -> None:
@@ -131,3 +138,19 @@ def init_db(bind: Optional[Engine] = None) -> None:
             "ADD COLUMN IF NOT EXISTS password_reset_token VARCHAR(255)",
         ):
             conn.execute(text(f"ALTER TABLE public.users {col}"))
+        # Explicit unit of AntennaModel pattern tables ("db" or "field").
+        conn.execute(
+            text(
+                "ALTER TABLE public.antenna_models "
+                "ADD COLUMN IF NOT EXISTS pattern_unit VARCHAR(16) NOT NULL DEFAULT 'db'"
+            )
+        )
+        # Station change stamp read by the in-process station index.
+        conn.execute(
+            text(
+                "ALTER TABLE public.stations "
+                "ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now()"
+            )
+        )
+        for statement in models.STATION_UPDATED_AT_DDL:
+            conn.execute(text(statement))
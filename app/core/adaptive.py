@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from typing import Callable, Tuple
+
+import numpy as np
+
+# Adaptive quadtree evaluation of a scalar field on a regular lat/lon grid.
+#
+# The grid is first evaluated at the corners of coarse blocks. A block whose corner
+# values all sit clearly on one side of the threshold is filled by bilinear
+# interpolation; a block whose values come within ``band`` of the threshold (or that
+# straddles the edge of the study area, where values are NaN) is split into four and
+# its new corners evaluated, level by level, down to single cells. Path evaluations
+# are therefore concentrated along the decision boundary.
+
+Evaluator = Callable[[np.ndarray, np.ndarray], np.ndarray]
+
+
+def _edges(size: int, step: int) -> np.ndarray:
+    return np.unique(np.r_[np.arange(0, size - 1, step), size - 1])
+
+
+def adaptive_grid(
+    evaluate: Evaluator,
+    lats: np.ndarray,
+    lons: np.ndarray,
+    threshold: float,
+    band: float = 3.0,
+    coarse_step: int = 8,
+) -> Tuple[np.ndarray, int]:
+    """
+    Fill the ``len(lats) x len(lons)`` grid, evaluating only where refinement is needed.
+
+    ``evaluate(lat_points, lon_points)`` receives 1-D coordinate arrays and returns one
+    value per point (NaN outside the study area). Returns ``(grid, evaluations)``.
+    """
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    n_rows, n_cols = lats.size, lons.size
+    values = np.full((n_rows, n_cols), np.nan)
+    known = np.zeros((n_rows, n_cols), dtype=bool)
+    evaluations = 0
+
+    def _evaluate(rows: np.ndarray, cols: np.ndarray) -> None:
+        nonlocal evaluations
+        flat = np.unique(rows * n_cols + cols)
+        flat = flat[~known.ravel()[flat]]
+        if flat.size == 0:
+            return
+        r, c = np.divmod(flat, n_cols)
+        values[r, c] = evaluate(lats[r], lons[c])
+        known[r, c] = True
+        evaluations += flat.size
+
+    if n_rows < 2 or n_cols < 2:
+        rows, cols = np.meshgrid(np.arange(n_rows), np.arange(n_cols), indexing="ij")
+        _evaluate(rows.ravel(), cols.ravel())
+        return values, evaluations
+
+    row_edges = _edges(n_rows, max(coarse_step, 1))
+    col_edges = _edges(n_cols, max(coarse_step, 1))
+    r0, c0 = (a.ravel() for a in np.meshgrid(row_edges[:-1], col_edges[:-1], indexing="ij"))
+    r1, c1 = (a.ravel() for a in np.meshgrid(row_edges[1:], col_edges[1:], indexing="ij"))
+
+    while r0.size:
+        _evaluate(np.concatenate([r0, r0, r1, r1]), np.concatenate([c0, c1, c0, c1]))
+        corners = np.stack([values[r0, c0], values[r0, c1], values[r1, c0], values[r1, c1]])
+        missing = np.isnan(corners)
+        partial = missing.any(axis=0) & ~missing.all(axis=0)
+        filled = np.where(missing, threshold, corners)
+        lo = np.where(missing, np.inf, corners).min(axis=0)
+        hi = np.where(missing, -np.inf, corners).max(axis=0)
+        near = (hi >= threshold - band) & (lo <= threshold + band)
+        splittable = (r1 - r0 > 1) | (c1 - c0 > 1)
+        split = splittable & (near | partial)
+
+        done = ~split & ~missing.all(axis=0)
+        _fill_bilinear(values, known, r0[done], r1[done], c0[done], c1[done], filled[:, done])
+
+        rm = (r0 + r1) // 2
+        cm = (c0 + c1) // 2
+        s = split
+        r0, r1, c0, c1 = (
+            np.concatenate(parts)
+            for parts in (
+                (r0[s], r0[s], rm[s], rm[s]),
+                (rm[s], rm[s], r1[s], r1[s]),
+                (c0[s], cm[s], c0[s], cm[s]),
+                (cm[s], c1[s], cm[s], c1[s]),
+            )
+        )
+        keep = (r1 > r0) & (c1 > c0)
+        r0, r1, c0, c1 = r0[keep], r1[keep], c0[keep], c1[keep]
+
+    return values, evaluations
+
+
+def _fill_bilinear(
+    values: np.ndarray,
+    known: np.ndarray,
+    r0: np.ndarray,
+    r1: np.ndarray,
+    c0: np.ndarray,
+    c1: np.ndarray,
+    corners: np.ndarray,
+) -> None:
+    """Interpolate block interiors from their corners (evaluated cells are kept)."""
+    heights = r1 - r0
+    widths = c1 - c0
+    # Blocks of one level share a handful of shapes; fill each shape in one shot.
+    for h, w in set(zip(heights.tolist(), widths.tolist())):
+        idx = np.flatnonzero((heights == h) & (widths == w))
+        fr = np.linspace(0.0, 1.0, h + 1)
+        fc = np.linspace(0.0, 1.0, w + 1)
+        v00, v01, v10, v11 = (corners[k, idx][:, None, None] for k in range(4))
+        top = v00 * (1 - fc)[None, None, :] + v01 * fc[None, None, :]
+        bottom = v10 * (1 - fc)[None, None, :] + v11 * fc[None, None, :]
+        block = top * (1 - fr)[None, :, None] + bottom * fr[None, :, None]
+        rows = (r0[idx][:, None] + np.arange(h + 1)[None, :])[:, :, None]
+        cols = (c0[idx][:, None] + np.arange(w + 1)[None, :])[:, None, :]
+        rows, cols = np.broadcast_arrays(rows, cols)
+        free = ~known[rows, cols]
+        values[rows[free], cols[free]] = block[free]
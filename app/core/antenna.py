@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Antenna radiation patterns as per-cell gain terms.
+#
+# Patterns only scale the field radiated toward each cell, so they are applied on top
+# of the terrain loss rasters: changing ERP, pattern, azimuth or tilt never needs a
+# new terrain pass.
+#
+# Pattern tables come from ``Station.antenna_pattern`` ("horizontal"/"vertical" keys)
+# or, failing that, the station's ``AntennaModel``. A table is either a mapping of
+# angle (degrees) to value or a list of values evenly spaced over 360 degrees. Angles
+# are wrapped to [-180, 180), so 350 and -10 are the same direction (in vertical
+# tables, above the boresight). The unit is declared by the record, never inferred from
+# the values: ``AntennaModel.pattern_unit`` or the "unit" key of the station's own
+# pattern, "field" for relative field and "db" (the default) for dB, negative as
+# relative gain and positive as attenuation. Tables are normalised so that their peak
+# is 0 dB (ERP is quoted at the main lobe).
+
+Table = Tuple[np.ndarray, np.ndarray]
+
+PATTERN_UNITS = ("db", "field")
+
+
+def _table(raw, unit: str = "db", span: float = 360.0) -> Optional[Table]:
+    if isinstance(raw, (list, tuple)) and raw:
+        angles = np.arange(len(raw)) * (span / len(raw))
+        values = raw
+    elif isinstance(raw, dict) and raw:
+        try:
+            angles = np.array([float(key) for key in raw])
+        except (TypeError, ValueError):
+            return None
+        values = list(raw.values())
+    else:
+        return None
+    if unit not in PATTERN_UNITS:
+        return None
+    try:
+        values = np.asarray(values, dtype=float)
+    except (TypeError, ValueError):
+        return None
+
+    if unit == "field":
+        gains = 20.0 * np.log10(np.maximum(values, 1e-3))
+    elif values.max() <= 0.0:
+        gains = values
+    else:
+        gains = -values
+    angles = (angles + 180.0) % 360.0 - 180.0
+    order = np.argsort(angles)
+    return angles[order], gains[order] - gains.max()
+
+
+@dataclass(frozen=True)
+class AntennaPattern:
+    """Relative gain tables of one station, with its azimuth and mechanical tilt."""
+
+    horizontal: Optional[Table] = None
+    vertical: Optional[Table] = None
+    azimuth_deg: float = 0.0
+    tilt_deg: float = 0.0
+    height_m: float = 0.0
+
+    @classmethod
+    def for_station(cls, station) -> "AntennaPattern":
+        raw = getattr(station, "antenna_pattern", None) or {}
+        model = getattr(station, "antenna_model", None)
+        own_unit = raw.get("unit") or "db"
+        model_unit = getattr(model, "pattern_unit", None) or "db"
+        if raw.get("horizontal"):
+            horizontal = _table(raw["horizontal"], own_unit)
+        else:
+            horizontal = _table(model.horizontal_pattern, model_unit) if model is not None else None
+        if raw.get("vertical"):
+            vertical = _table(raw["vertical"], own_unit)
+        else:
+            vertical = _table(model.vertical_pattern, model_unit) if model is not None else None
+        return cls(
+            horizontal=horizontal,
+            vertical=vertical,
+            azimuth_deg=float(getattr(station, "azimuth", None) or 0.0),
+            tilt_deg=float(getattr(station, "mechanical_tilt", None) or 0.0),
+            height_m=float(getattr(station, "antenna_height", None) or 0.0),
+        )
+
+    @property
+    def is_omni(self) -> bool:
+        return self.horizontal is None and self.vertical is None
+
+    def gain_db(self, azimuth_deg, distance_km) -> np.ndarray:
+        """
+        Relative gain (dB, <= 0) toward cells at the given true azimuths and distances.
+
+        The horizontal table is read at the bearing relative to the antenna azimuth;
+        the vertical table at the depression angle below the (tilted) boresight, taken
+        over flat ground from the antenna height.
+        """
+        azimuth_deg = np.asarray(azimuth_deg, dtype=float)
+        gain = np.zeros(azimuth_deg.shape)
+        if self.horizontal is not None:
+            angles, gains = self.horizontal
+            gain += np.interp((azimuth_deg - self.azimuth_deg) % 360.0, angles, gains, period=360.0)
+        if self.vertical is not None:
+            angles, gains = self.vertical
+            distance_m = np.maximum(np.asarray(distance_km, dtype=float) * 1000.0, 1.0)
+            depression = np.degrees(np.arctan2(self.height_m, distance_m))
+            gain += np.interp(depression - self.tilt_deg, angles, gains)
+        return gain
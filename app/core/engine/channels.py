@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.engine.contour import ContourAnalysis, NeighborArrays, channel_offsets
+from app.core.engine.discovery import NeighborDiscovery
+from app.core.engine.p1546 import p1546_curves
+from app.core.engine.protection import RegulatoryStandard
+from app.core.protection_ratios import ProtectionRatios
+from app.core.station_index import StationIndex
+
+# FM: 87.9-107.9 MHz in 200 kHz steps.
+FM_CHANNELS_MHZ = np.round(np.arange(87.9, 107.9 + 1e-9, 0.2), 1)
+
+# Digital TV (6 MHz channels): VHF-High 7-13 and UHF 14-51; channel 37 is
+# reserved for radio astronomy.
+TV_CHANNEL_NUMBERS = np.array([n for n in range(7, 52) if n != 37])
+
+
+def tv_channel_center_mhz(channel_number) -> np.ndarray:
+    channel_number = np.asarray(channel_number)
+    return np.where(channel_number <= 13, 177.0 + 6.0 * (channel_number - 7), 473.0 + 6.0 * (channel_number - 14))
+
+
+@dataclass
+class ChannelOption:
+    frequency_mhz: float
+    channel_number: Optional[int]
+    margin_km: float  # Worst case over neighbours and directions; negative means overlap
+    conflicts: int  # Neighbours whose contours overlap on this channel
+    limiting_station_id: Optional[int]  # Neighbour giving the worst margin
+    tabulated: bool  # Every contour from P.1546 figures; False for the log-slope approximation or derived times
+
+
+def _channel_plan(service_type: str) -> Tuple[np.ndarray, np.ndarray]:
+    if service_type.upper() == "TV":
+        return tv_channel_center_mhz(TV_CHANNEL_NUMBERS), TV_CHANNEL_NUMBERS.astype(float)
+    return FM_CHANNELS_MHZ, np.full(FM_CHANNELS_MHZ.shape, np.nan)
+
+
+def _tabulated(frequency_mhz) -> np.ndarray:
+    # Rp is solved at 50% time and Ri at 1%, in both directions.
+    return p1546_curves.tabulated(frequency_mhz, 50) & p1546_curves.tabulated(frequency_mhz, 1)
+
+
+def _per_target(distances, targets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Inverse P.1546 once per distinct target level instead of once per cell.
+    levels, inverse = np.unique(targets, return_inverse=True)
+    return distances(levels), inverse.reshape(targets.shape)
+
+
+def find_available_channels(
+    session: Session,
+    lat: float,
+    lon: float,
+    erp_kw: float,
+    antenna_height: float,
+    service_type: str = "FM",
+    index: Optional[StationIndex] = None,
+    ratios: Optional[ProtectionRatios] = None,
+) -> List[ChannelOption]:
+    """
+    Rank every channel of the service for a candidate site (best margin first).
+
+    Neighbours within the discovery radius are fetched once over the whole band.
+    Each (channel, neighbour) pair is then screened with the Fail-Fail (Rp + Ri)
+    method in both directions: the candidate protected against the neighbour and
+    the neighbour protected against the candidate. The margin is separation minus
+    Rp + Ri (km); offsets with no tabulated PR do not count. Channels with no
+    regulated neighbour get an infinite margin. ``ratios`` defaults to the tables
+    stored in the database. ``tabulated`` is False on channels whose contours did not
+    all come from P.1546 figures: the log-slope approximation where no figure covers
+    the frequency, or curves derived for a time with no figure (see ``_tabulated``).
+    """
+    ratios = ratios or ProtectionRatios.from_session(session)
+    analysis = ContourAnalysis(ratios)
+    channel_freqs, channel_numbers = _channel_plan(service_type)
+    radius_km, freq_margin = NeighborDiscovery.search_limits(service_type)
+    candidates = NeighborDiscovery(session).find_near(
+        lat, lon, service_type, radius_km,
+        float(channel_freqs.min()) - freq_margin, float(channel_freqs.max()) + freq_margin,
+        index=index,
+    )
+    if not candidates:
+        return [
+            ChannelOption(float(freq), None if np.isnan(number) else int(number), float("inf"), 0, None, bool(covered))
+            for freq, number, covered in zip(channel_freqs, channel_numbers, _tabulated(channel_freqs))
+        ]
+    neighbors = NeighborArrays.from_candidates(candidates)
+
+    # (channel, neighbour) grids
+    offsets = channel_offsets(
+        service_type, channel_freqs[:, None], channel_numbers[:, None],
+        neighbors.frequency_mhz[None, :], neighbors.channel_number[None, :],
+    )
+    pr = RegulatoryStandard.get_required_pr_array(service_type, offsets, ratios)
+    regulated = ~np.isnan(pr)
+    pr = np.where(regulated, pr, 0.0)
+
+    emin_channel = analysis._emin_array(service_type, channel_freqs)
+    emin_neighbor = analysis._emin_array(service_type, neighbors.frequency_mhz)
+
+    # Candidate protected: Rp per channel (50% time), neighbour Ri (1% time).
+    rp_channel = analysis._p1546_distances(erp_kw, antenna_height, channel_freqs, emin_channel, 50)
+    ri_neighbor, level = _per_target(
+        lambda levels: analysis._p1546_distances(
+            neighbors.erp_kw[None, :], neighbors.antenna_height[None, :], neighbors.frequency_mhz[None, :],
+            levels[:, None], 1,
+        ),
+        emin_channel[:, None] - pr,
+    )
+    inbound = rp_channel[:, None] + np.take_along_axis(ri_neighbor, level, axis=0)
+
+    # Neighbour protected: its own Rp, candidate Ri per channel.
+    rp_neighbor = analysis._p1546_distances(
+        neighbors.erp_kw, neighbors.antenna_height, neighbors.frequency_mhz, emin_neighbor, 50
+    )
+    ri_channel, level = _per_target(
+        lambda levels: analysis._p1546_distances(
+            erp_kw, antenna_height, channel_freqs[:, None], levels[None, :], 1
+        ),
+        emin_neighbor[None, :] - pr,
+    )
+    outbound = rp_neighbor[None, :] + np.take_along_axis(ri_channel, level, axis=1)
+
+    margin = np.where(regulated, neighbors.distance_km[None, :] - np.maximum(inbound, outbound), np.inf)
+    worst = np.argmin(margin, axis=1)
+    worst_margin = margin[np.arange(channel_freqs.size), worst]
+    conflicts = (margin < 0).sum(axis=1)
+    tabulated = _tabulated(channel_freqs) & _tabulated(neighbors.frequency_mhz).all()
+
+    options = [
+        ChannelOption(
+            frequency_mhz=float(channel_freqs[c]),
+            channel_number=None if np.isnan(channel_numbers[c]) else int(channel_numbers[c]),
+            margin_km=float(worst_margin[c]),
+            conflicts=int(conflicts[c]),
+            limiting_station_id=candidates[worst[c]].station.id if np.isfinite(worst_margin[c]) else None,
+            tabulated=bool(tabulated[c]),
+        )
+        for c in range(channel_freqs.size)
+    ]
+    return sorted(options, key=lambda option: -option.margin_km)
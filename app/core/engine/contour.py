@@ -1,11 +1,14 @@
 from __future__ import annotations
 
-import math
 from dataclasses import dataclass
-from typing import List
+from typing import List, Sequence
+
+import numpy as np
 
 from app.models import Station
+from app.core.engine.p1546 import contour_distances, p1546_curves
 from app.core.engine.protection import RegulatoryStandard
+from app.core.protection_ratios import DEFAULT_RATIOS, ProtectionRatios
 from app.core.engine.discovery import NeighborCandidate
 
 
@@ -16,12 +19,76 @@ class CriticalNeighbor:
     distance_km: float
 
 
+@dataclass
+class NeighborArrays:
+    """
+    Struct-of-arrays view of neighbour candidates, one entry per neighbour.
+    """
+    frequency_mhz: np.ndarray
+    erp_kw: np.ndarray
+    antenna_height: np.ndarray
+    distance_km: np.ndarray
+    channel_number: np.ndarray  # NaN where unknown
+
+    @classmethod
+    def from_candidates(cls, neighbors: Sequence[NeighborCandidate]) -> "NeighborArrays":
+        return cls(
+            frequency_mhz=np.array([c.station.frequency_mhz for c in neighbors], dtype=float),
+            erp_kw=np.array([c.station.erp_kw for c in neighbors], dtype=float),
+            antenna_height=np.array([c.station.antenna_height for c in neighbors], dtype=float),
+            distance_km=np.array([c.distance_km for c in neighbors], dtype=float),
+            channel_number=np.array([c.station.channel_number for c in neighbors], dtype=float),
+        )
+
+
+@dataclass
+class ContourScreen:
+    """
+    Per-neighbour screening results (arrays aligned with the NeighborArrays input).
+    """
+    offset: np.ndarray
+    protection_ratio_db: np.ndarray  # NaN where unregulated
+    rp_km: float
+    ri_km: np.ndarray
+    overlap_km: np.ndarray  # (Rp + Ri) - distance; positive means overlap
+    critical: np.ndarray
+    rp_tabulated: bool  # False for the log-slope approximation or a derived time curve
+    ri_tabulated: np.ndarray
+
+
+def channel_offsets(
+    station_type: str, frequency_mhz, channel_number, neighbor_frequency_mhz, neighbor_channel_number
+) -> np.ndarray:
+    """
+    PR table offsets between proposals and neighbours (broadcast together).
+
+    FM: frequency difference in kHz. TV: channel difference, estimated from the
+    frequencies (6 MHz channels) unless both channel numbers are known (NaN or 0
+    means unknown).
+    """
+    frequency_mhz = np.asarray(frequency_mhz, dtype=float)
+    neighbor_frequency_mhz = np.asarray(neighbor_frequency_mhz, dtype=float)
+    if station_type == "FM":
+        return np.abs(frequency_mhz - neighbor_frequency_mhz) * 1000.0  # kHz
+    estimated = np.abs(frequency_mhz - neighbor_frequency_mhz) / 6.0
+    channel_number = np.asarray(channel_number, dtype=float)
+    neighbor_channel_number = np.asarray(neighbor_channel_number, dtype=float)
+    known = (
+        np.isfinite(channel_number) & (channel_number != 0)
+        & np.isfinite(neighbor_channel_number) & (neighbor_channel_number != 0)
+    )
+    return np.where(known, np.abs(channel_number - neighbor_channel_number), estimated)
+
+
 class ContourAnalysis:
     
     # E_min constants (dBuV/m)
     EMIN_FM_URBAN = 66.0
     EMIN_TV_UHF = 48.0
     EMIN_TV_VHF_HIGH = 51.0
+
+    def __init__(self, ratios: ProtectionRatios = DEFAULT_RATIOS):
+        self.ratios = ratios
     
     def analyze_contours(
         self, 
@@ -31,8 +98,16 @@ class ContourAnalysis:
         """
         Filters neighbors using the Fail-Fail (Rp + Ri) method.
         """
-        critical = []
-        
+        screen = self.screen(proposal, NeighborArrays.from_candidates(neighbors))
+        return [
+            CriticalNeighbor(neighbors[i].station, -float(screen.overlap_km[i]), neighbors[i].distance_km)
+            for i in np.flatnonzero(screen.critical)
+        ]
+
+    def screen(self, proposal: Station, neighbors: "NeighborArrays") -> "ContourScreen":
+        """
+        Fail-Fail (Rp + Ri) screening of all neighbours at once.
+        """
         # 1. Determine E_min for Proposal
         e_min = self._get_emin(proposal)
         
@@ -43,56 +118,57 @@ class ContourAnalysis:
             field_strength_target=e_min, time_pct=50
         )
         
-        for cand in neighbors:
-            neighbor = cand.station
-            
-            # 3. Determine Protection Ratio
-            # Offset calculation
-            if proposal.station_type == "FM":
-                offset = abs(proposal.frequency_mhz - neighbor.frequency_mhz) * 1000.0  # kHz
-            else:
-                # TV: Channel diff
-                if proposal.channel_number and neighbor.channel_number:
-                    offset = float(abs(proposal.channel_number - neighbor.channel_number))
-                else:
-                    # Fallback: estimate channel diff (6MHz bw)
-                    offset = abs(proposal.frequency_mhz - neighbor.frequency_mhz) / 6.0
-            
-            pr = RegulatoryStandard.get_required_pr(proposal.station_type, offset)
-            
-            if pr == -999.0:
-                continue  # No interference possible (unregulated offset)
-                
-            # 4. Calculate E_int
-            e_int = e_min - pr
-            
-            # 5. Calculate Ri (Interfering Radius) for Neighbor
-            # 1% Time (Interference is rare but bad), 50% Loc
-            ri_km = self._calculate_p1546_distance(
-                neighbor.erp_kw, neighbor.antenna_height, neighbor.frequency_mhz,
-                field_strength_target=e_int, time_pct=1
-            )
-            
-            # 6. Check Distance
-            dist_km = cand.distance_km
-            
-            # If Distance < Rp + Ri, there is a theoretical overlap
-            if dist_km < (rp_km + ri_km):
-                # We store the overlap as a negative margin proxy
-                overlap = (rp_km + ri_km) - dist_km
-                critical.append(CriticalNeighbor(neighbor, -overlap, dist_km))
-                
-        return critical
+        # 3. Determine Protection Ratio
+        offset = channel_offsets(
+            proposal.station_type,
+            proposal.frequency_mhz,
+            proposal.channel_number or np.nan,
+            neighbors.frequency_mhz,
+            neighbors.channel_number,
+        )
+        
+        pr = RegulatoryStandard.get_required_pr_array(proposal.station_type, offset, self.ratios)
+        # No interference possible (unregulated offset)
+        regulated = ~np.isnan(pr)
+        
+        # 4. Calculate E_int
+        e_int = e_min - np.where(regulated, pr, 0.0)
+        
+        # 5. Calculate Ri (Interfering Radius) for Neighbor
+        # 1% Time (Interference is rare but bad), 50% Loc
+        ri_km = self._p1546_distances(
+            neighbors.erp_kw, neighbors.antenna_height, neighbors.frequency_mhz,
+            field_strength_target=e_int, time_pct=1
+        )
+        
+        # 6. Check Distance
+        # If Distance < Rp + Ri, there is a theoretical overlap
+        overlap_km = (rp_km + ri_km) - neighbors.distance_km
+        return ContourScreen(
+            offset=offset,
+            protection_ratio_db=pr,
+            rp_km=rp_km,
+            ri_km=ri_km,
+            overlap_km=overlap_km,
+            critical=regulated & (overlap_km > 0),
+            rp_tabulated=bool(p1546_curves.tabulated(proposal.frequency_mhz, 50)),
+            ri_tabulated=p1546_curves.tabulated(neighbors.frequency_mhz, 1),
+        )
 
     def _get_emin(self, station: Station) -> float:
-        if station.station_type == "FM":
-            return self.EMIN_FM_URBAN
-        elif station.station_type == "TV":
-            if station.frequency_mhz > 300:  # UHF
-                return self.EMIN_TV_UHF
-            else:
-                return self.EMIN_TV_VHF_HIGH
-        return 60.0  # Default
+        return float(self._emin_array(station.station_type, station.frequency_mhz))
+
+    def _emin_array(self, station_type: str, frequency_mhz) -> np.ndarray:
+        """
+        E_min over an array of frequencies of one service.
+        """
+        frequency_mhz = np.asarray(frequency_mhz, dtype=float)
+        if station_type == "FM":
+            return np.full(frequency_mhz.shape, self.EMIN_FM_URBAN)
+        elif station_type == "TV":
+            # UHF above 300 MHz
+            return np.where(frequency_mhz > 300, self.EMIN_TV_UHF, self.EMIN_TV_VHF_HIGH)
+        return np.full(frequency_mhz.shape, 60.0)  # Default
 
     def _calculate_p1546_distance(
         self, erp_kw: float, h_tx: float, freq_mhz: float, 
@@ -100,40 +176,18 @@ class ContourAnalysis:
     ) -> float:
         """
         Inverse P.1546: Find distance where Field Strength == Target.
-        
-        Approximation used:
-        E = Base + P_gain + H_gain + T_gain - k * log10(d)
-        
-        Where:
-        - Base: ~100 dBuV/m @ 1km, 1kW, 150m
-        - k: Propagation slope (35 for interference/far field)
         """
-        # ERP dBk (relative to 1kW)
-        erp_dbk = 10 * math.log10(max(erp_kw, 0.001))
-        
-        base_e = 100.0  # dBuV/m at 1km, 1kW, 150m
-        
-        # Height gain: 20 log(h / 150)
-        h_gain = 20 * math.log10(max(h_tx, 10.0) / 150.0)
-        
-        p_gain = erp_dbk
-        
-        # Time correction (1% time enhances signal by ~10-12dB in P.1546 curves)
-        t_gain = 0.0
-        if time_pct == 1:
-            t_gain = 12.0
-            
-        # Propagation slope k
-        # Free space is 20. P.1546 land path is steeper, ~30-40.
-        k = 35.0
-        
-        constant = base_e + h_gain + p_gain + t_gain
-        
-        # log10(d) = (Constant - Target) / k
-        if constant < field_strength_target:
-            return 0.1  # Target is stronger than max possible at 1km
-            
-        log_d = (constant - field_strength_target) / k
-        d_km = 10 ** log_d
+        return float(self._p1546_distances(erp_kw, h_tx, freq_mhz, field_strength_target, time_pct))
+
+    def _p1546_distances(
+        self, erp_kw, h_tx, freq_mhz,
+        field_strength_target, time_pct: int
+    ) -> np.ndarray:
+        """
+        Inverse P.1546 over arrays of transmitters/targets (broadcast together),
+        from the tabulated land-path curves (50% locations). Frequencies without a
+        tabulated figure keep the log-slope approximation (see ``p1546_curves.covers``).
         
-        return d_km
+        h_tx is used as the effective height h1 (no terrain profile at this stage).
+        """
+        return contour_distances(erp_kw, h_tx, freq_mhz, field_strength_target, time_pct)[0]
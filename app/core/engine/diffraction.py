@@ -2,15 +2,19 @@ from __future__ import annotations
 
 import math
 from dataclasses import dataclass
-from typing import List, Dict
+from typing import Dict, Optional
 
 import numpy as np
-from geopy.distance import geodesic
 
 from app.models import Station
+from app.core import geodesy
+from app.core.diffraction import deygout_loss
+from app.core.parallel import Transmitter, attached_profiles, map_row_bands, profile_meta, resolve_workers
+from app.core.profiles import RadialProfileSet, profile_cache, radials_for
 from app.core.terrain import ElevationProvider
-from app.core.propagation import fspl
+from app.core.propagation import fspl_array
 from app.core.engine.protection import RegulatoryStandard
+from app.core.protection_ratios import DEFAULT_RATIOS, ProtectionRatios
 
 
 @dataclass
@@ -22,34 +26,36 @@ class InterferencePoint:
 
 
 class DeygoutMatrix:
-    def __init__(self, elevation_provider: ElevationProvider):
+    def __init__(self, elevation_provider: ElevationProvider, ratios: ProtectionRatios = DEFAULT_RATIOS):
         self.provider = elevation_provider
+        self.ratios = ratios
 
     def calculate_matrix(
         self,
         proposal: Station,
         interferer: Station,
-        grid_res_km: float = 1.0
+        grid_res_km: float = 1.0,
+        workers: Optional[int] = None,
     ) -> Dict[str, float]:
         """
         Calculates interference matrix using Deygout diffraction.
         Returns summary stats.
+
+        ``workers`` > 1 (default ``INTERFERENCE_WORKERS``) evaluates the grid in row
+        bands on a process pool, with the radial profiles in shared memory.
         """
         # 1. Define Grid (Bounding Box of Proposal's Protected Contour)
         # For simplicity, we use a fixed box around proposal, e.g. 20km
         # In real app, this comes from ContourAnalysis Rp.
         radius_km = 20.0 
         
-        lat_min = proposal.latitude - (radius_km / 111.0)
-        lat_max = proposal.latitude + (radius_km / 111.0)
-        lon_min = proposal.longitude - (radius_km / 111.0)
-        lon_max = proposal.longitude + (radius_km / 111.0)
-        
-        lats = np.arange(lat_min, lat_max, grid_res_km / 111.0)
-        lons = np.arange(lon_min, lon_max, grid_res_km / 111.0)
+        box = geodesy.bbox(proposal.latitude, proposal.longitude, radius_km)
         
-        impacted_points = 0
-        total_points = 0
+        # Square cells of grid_res_km (degree steps taken across the box)
+        lat_step = (box["north"] - box["south"]) * grid_res_km / (2 * radius_km)
+        lon_step = (box["east"] - box["west"]) * grid_res_km / (2 * radius_km)
+        lats = np.arange(box["south"], box["north"], lat_step)
+        lons = np.arange(box["west"], box["east"], lon_step)
         
         # Protection Ratio
         if proposal.station_type == "FM":
@@ -61,118 +67,114 @@ class DeygoutMatrix:
             else:
                 offset = abs(proposal.frequency_mhz - interferer.frequency_mhz) / 6.0
              
-        pr = RegulatoryStandard.get_required_pr(proposal.station_type, offset)
-        if pr == -999.0:
+        pr = float(RegulatoryStandard.get_required_pr_array(proposal.station_type, offset, self.ratios))
+        if np.isnan(pr):
             return {"impacted_area_km2": 0.0, "max_margin": 999.0}
 
-        for lat in lats:
-            for lon in lons:
-                total_points += 1
-                
-                # Signal Wanted (Proposal -> Point)
-                s_wanted = self._calculate_signal(proposal, lat, lon)
-                
-                # Signal Unwanted (Interferer -> Point)
-                s_unwanted = self._calculate_signal(interferer, lat, lon)
-                
-                margin = s_wanted - s_unwanted
-                
-                if margin < pr:
-                    impacted_points += 1
-                    
+        # Radial profiles (100 m steps) from each transmitter, reaching every grid point
+        lat_grid, lon_grid = np.meshgrid(lats, lons, indexing="ij")
+        proposal_reach_km = float(
+            geodesy.distance_km(proposal.latitude, proposal.longitude, lat_grid, lon_grid).max()
+        ) + 0.1
+        interferer_reach_km = float(
+            geodesy.distance_km(interferer.latitude, interferer.longitude, lat_grid, lon_grid).max()
+        ) + 0.1
+        proposal_profiles = profile_cache.get(
+            self.provider, proposal.latitude, proposal.longitude, proposal_reach_km, 0.1,
+            radials_for(proposal_reach_km, grid_res_km)
+        )
+        interferer_profiles = profile_cache.get(
+            self.provider, interferer.latitude, interferer.longitude, interferer_reach_km, 0.1,
+            radials_for(interferer_reach_km, grid_res_km)
+        )
+
+        workers = resolve_workers(workers)
+        if workers > 1:
+            bands = map_row_bands(
+                _margin_band,
+                lats.size,
+                workers,
+                {"proposal": proposal_profiles.heights, "interferer": interferer_profiles.heights},
+                lats, lons,
+                profile_meta(proposal_profiles), Transmitter.from_station(proposal),
+                profile_meta(interferer_profiles), Transmitter.from_station(interferer),
+            )
+            margin = np.concatenate(bands, axis=0)
+        else:
+            s_wanted = self._calculate_signals(proposal, lat_grid.ravel(), lon_grid.ravel(), proposal_profiles)
+            s_unwanted = self._calculate_signals(interferer, lat_grid.ravel(), lon_grid.ravel(), interferer_profiles)
+            margin = s_wanted - s_unwanted
+        impacted_points = int(np.count_nonzero(margin < pr))
+
         area = impacted_points * (grid_res_km ** 2)
         return {"impacted_area_km2": area}
 
-    def _calculate_signal(self, station: Station, lat: float, lon: float) -> float:
-        dist_km = geodesic((station.latitude, station.longitude), (lat, lon)).km
-        if dist_km < 0.1:
-            dist_km = 0.1
-            
+    def _calculate_signal(
+        self, station: Station, lat: float, lon: float, profiles: Optional[RadialProfileSet] = None
+    ) -> float:
+        return float(self._calculate_signals(station, np.array([lat]), np.array([lon]), profiles)[0])
+
+    def _calculate_signals(
+        self, station: Station, lats: np.ndarray, lons: np.ndarray, profiles: Optional[RadialProfileSet] = None
+    ) -> np.ndarray:
+        """Field strength (dBuV/m) at many points: FSPL + recursive Deygout over 100 m profiles."""
+        dist_km = np.maximum(geodesy.distance_km(station.latitude, station.longitude, lats, lons), 0.1)
+
         # Free Space Loss
-        loss_fs = fspl(dist_km, station.frequency_mhz)
-        
+        loss_fs = fspl_array(dist_km, station.frequency_mhz)
+
         # Diffraction Loss (Deygout)
-        loss_diff = 0.0
+        loss_diff = np.zeros(lats.size)
         try:
-            # We need discrete points. 
-            num_points = int(dist_km * 10)  # 100m res
-            if num_points < 5:
-                num_points = 5
-                
-            lats = np.linspace(station.latitude, lat, num_points)
-            lons = np.linspace(station.longitude, lon, num_points)
-            
-            elevs = self.provider.get_elevation_profile(lats, lons)
-            
-            # Calculate diffraction
-            loss_diff = self._deygout_loss(elevs, dist_km, station.frequency_mhz, station.antenna_height, 10.0)  # Rx height 10m
-        except Exception:
-            # Fallback if SRTM fails or other error
-            loss_diff = 0.0
-            
+            if profiles is None or (profiles.radius_km < dist_km.max() and self.provider is not None):
+                profiles = RadialProfileSet.extract(
+                    self.provider, station.latitude, station.longitude, dist_km.max() + 0.1, 0.1
+                )
+            # Without a provider (pool workers), points the profiles do not reach keep
+            # free-space loss. Sorted by distance so each chunk samples its paths at
+            # roughly 100 m.
+            reached = np.flatnonzero(dist_km <= profiles.radius_km)
+            order = reached[np.argsort(dist_km[reached])]
+            for chunk in np.array_split(order, max(1, math.ceil(order.size / 4096))):
+                if chunk.size == 0:
+                    continue
+                num_points = max(5, int(dist_km[chunk].max() * 10))
+                elevs, _ = profiles.paths_to(lats[chunk], lons[chunk], samples=num_points, fill_value=np.nan)
+                loss = deygout_loss(
+                    elevs, dist_km[chunk], station.frequency_mhz, station.antenna_height, 10.0,  # Rx height 10m
+                    k_factor=4.0 / 3.0,
+                )
+                # Paths with missing SRTM keep free-space loss only
+                loss_diff[chunk] = np.where(np.isnan(elevs).any(axis=1), 0.0, loss)
+        except (FileNotFoundError, ValueError):
+            # Fallback if SRTM fails
+            loss_diff[:] = 0.0
+
         total_loss = loss_fs + loss_diff
-        
+
         # E = 106.9 - Loss + ERP_dBk
         erp_dbk = 10 * math.log10(max(station.erp_kw, 0.001))
-        e_field = 106.9 - total_loss + erp_dbk
-        
-        return e_field
+        return 106.9 - total_loss + erp_dbk
 
-    def _deygout_loss(self, elevations: List[int], dist_km: float, freq_mhz: float, h_tx: float, h_rx: float) -> float:
-        """
-        Simplified Knife-Edge Diffraction (Single Peak) for now.
-        Full Deygout is recursive.
-        """
-        # Find max obstruction
-        n = len(elevations)
-        if n < 3:
-            return 0.0
-            
-        # Line of Sight
-        d_step = dist_km / (n - 1)
-        
-        max_v = -999.0
-        
-        for i in range(1, n - 1):
-            d1 = i * d_step
-            d2 = dist_km - d1
-            
-            # LoS height at i (Earth curvature ignored for simplicity in this step, 
-            # but usually h_eff = h + d1*d2/12.75)
-            # Let's add simple earth curvature correction to h_obs
-            
-            # Earth bulge (m) ~= d1(km) * d2(km) * 0.0785 (for k=4/3)
-            # or d^2 / 2R. 
-            # Let's use standard parabolic approx: h = d1*d2 / (2 * k * R)
-            # k=4/3, R=6371 -> 2*1.33*6371 ~= 17000
-            # h_bulge = (d1*d2 * 1000^2) / 17000000 ... wait.
-            # Standard approx: h(m) = 0.078 * d1(km) * d2(km)
-            
-            h_bulge = 0.078 * d1 * d2
-            
-            h_los = h_tx + (h_rx - h_tx) * (d1 / dist_km)
-            
-            # Obstacle height (terrain + bulge)
-            h_obs = elevations[i] + h_bulge
-            
-            # Clearance
-            h = h_obs - h_los  # Positive if blocking
-            
-            # Fresnel parameter v
-            wavelength = 300.0 / freq_mhz  # meters
-            
-            # d1, d2 in km -> convert to m
-            # v = h * sqrt( (2/lambda) * (1/d1 + 1/d2) )
-            if d1 > 0 and d2 > 0:
-                v = h * math.sqrt((2.0 / wavelength) * (1.0 / (d1 * 1000) + 1.0 / (d2 * 1000)))
-                if v > max_v:
-                    max_v = v
-                
-        # Diffraction Loss J(v)
-        if max_v <= -0.7:
-            return 0.0
-        elif max_v <= 0:
-            return 0.0  # Simplification: no loss if clearance > 0.6 Fresnel
-        else:
-            # Lee approximation for knife edge
-            return 6.9 + 20 * math.log10(math.sqrt((max_v - 0.1)**2 + 1) + max_v - 0.1)
+
+def _margin_band(
+    row_start: int,
+    row_stop: int,
+    lats: np.ndarray,
+    lons: np.ndarray,
+    proposal_meta: dict,
+    proposal: Transmitter,
+    interferer_meta: dict,
+    interferer: Transmitter,
+) -> np.ndarray:
+    # Pool task: wanted - unwanted over rows [row_start, row_stop). The profiles are
+    # sized to reach every grid point, so the matrix needs no provider here.
+    matrix = DeygoutMatrix(elevation_provider=None)
+    lat_grid, lon_grid = np.meshgrid(lats[row_start:row_stop], lons, indexing="ij")
+    s_wanted = matrix._calculate_signals(
+        proposal, lat_grid.ravel(), lon_grid.ravel(), attached_profiles(proposal_meta, "proposal")
+    )
+    s_unwanted = matrix._calculate_signals(
+        interferer, lat_grid.ravel(), lon_grid.ravel(), attached_profiles(interferer_meta, "interferer")
+    )
+    return (s_wanted - s_unwanted).reshape(lat_grid.shape)
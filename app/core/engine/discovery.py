@@ -1,13 +1,13 @@
 from __future__ import annotations
 
-import math
 from dataclasses import dataclass
-from typing import List
+from typing import List, Optional, Tuple
 
-from geopy.distance import geodesic
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from app.core import geodesy
+from app.core.station_index import StationIndex, stations_for
 from app.models import Station
 
 
@@ -26,7 +26,8 @@ class NeighborDiscovery:
         self,
         proposal: Station,
         service_type: str = "FM",
-        limit: int = 100
+        limit: int = 100,
+        index: Optional[StationIndex] = None,
     ) -> List[NeighborCandidate]:
         """
         Find relevant stations that could interact with the proposal.
@@ -34,27 +35,65 @@ class NeighborDiscovery:
         Filters:
         1. Spatial: 300km (FM) or 400km (TV)
         2. Spectral: +/- 600kHz (FM) or +/- 1 Channel (TV)
+
+        With ``index`` the filters run in memory (nearest ``limit`` stations) and
+        only the matching rows not already in the session are loaded.
+        """
+        # 1. Define Spatial Radius and spectral margin
+        radius_km, freq_margin = self.search_limits(service_type)
+        min_freq = proposal.frequency_mhz - freq_margin
+        max_freq = proposal.frequency_mhz + freq_margin
+
+        return self.find_near(
+            proposal.latitude, proposal.longitude, service_type, radius_km,
+            min_freq, max_freq, exclude_id=proposal.id, limit=limit, index=index,
+        )
+
+    @staticmethod
+    def search_limits(service_type: str) -> Tuple[float, float]:
+        """
+        Discovery radius (km) and spectral margin (MHz) of a service.
         """
-        # 1. Define Spatial Radius
         if service_type.upper() == "TV":
-            radius_km = 400.0
             # TV Channel bandwidth approx 6MHz. 
             # We assume +/- 1 channel = +/- 6 MHz.
-            freq_margin = 6.0 
-        else:
-            radius_km = 300.0
-            # FM: +/- 600 kHz = 0.6 MHz
-            freq_margin = 0.6
-            
-        min_freq = proposal.frequency_mhz - freq_margin
-        max_freq = proposal.frequency_mhz + freq_margin
+            return 400.0, 6.0
+        # FM: +/- 600 kHz = 0.6 MHz
+        return 300.0, 0.6
+
+    def find_near(
+        self,
+        lat: float,
+        lon: float,
+        service_type: str,
+        radius_km: float,
+        min_freq: float,
+        max_freq: float,
+        exclude_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        index: Optional[StationIndex] = None,
+    ) -> List[NeighborCandidate]:
+        """
+        Stations of ``service_type`` within ``radius_km`` of a point and inside
+        ``[min_freq, max_freq]`` MHz, with distance and azimuth from the point.
+        """
+        if index is not None:
+            hits = index.refresh(self.session).query(
+                lat, lon, service_type, radius_km, min_freq, max_freq, exclude_id=exclude_id, limit=limit,
+            )
+            stations = stations_for(self.session, hits.station_ids)
+            return [
+                NeighborCandidate(stations[station_id], float(dist), float(azimuth))
+                for station_id, dist, azimuth in zip(hits.station_ids.tolist(), hits.distance_km, hits.azimuth_deg)
+                if station_id in stations
+            ]
 
         # 2. Query with Spatial & Spectral filters
         # We cast Geometry to Geography to use meters in ST_DWithin
         # Station.location is assumed to be SRID 4326
         
-        proposal_geom = func.ST_SetSRID(
-            func.ST_MakePoint(proposal.longitude, proposal.latitude), 
+        point_geom = func.ST_SetSRID(
+            func.ST_MakePoint(lon, lat), 
             4326
         )
         
@@ -64,47 +103,27 @@ class NeighborDiscovery:
             Station.frequency_mhz <= max_freq,
             func.ST_DWithin(
                 Station.location.cast(func.Geography),
-                proposal_geom.cast(func.Geography),
+                point_geom.cast(func.Geography),
                 radius_km * 1000  # meters
             )
         )
         
         # Exclude self if existing
-        if proposal.id:
-            query = query.filter(Station.id != proposal.id)
+        if exclude_id:
+            query = query.filter(Station.id != exclude_id)
+        if limit is not None:
+            query = query.limit(limit)
             
-        candidates = []
         # Fetch results
-        neighbors = query.limit(limit).all()
-        
-        for station in neighbors:
-            # Calculate precise distance and azimuth
-            p1 = (proposal.latitude, proposal.longitude)
-            p2 = (station.latitude, station.longitude)
-            dist = geodesic(p1, p2).km
-            
-            azimuth = self._calculate_azimuth(
-                proposal.latitude, proposal.longitude,
-                station.latitude, station.longitude
-            )
-            
-            candidates.append(NeighborCandidate(station, dist, azimuth))
-            
-        return candidates
-
-    def _calculate_azimuth(self, lat1, lon1, lat2, lon2) -> float:
-        """
-        Calculate initial bearing (azimuth) from point A to point B.
-        """
-        lat1_rad = math.radians(lat1)
-        lat2_rad = math.radians(lat2)
-        d_lon = math.radians(lon2 - lon1)
-
-        y = math.sin(d_lon) * math.cos(lat2_rad)
-        x = math.cos(lat1_rad) * math.sin(lat2_rad) - \
-            math.sin(lat1_rad) * math.cos(lat2_rad) * math.cos(d_lon)
-            
-        bearing_rad = math.atan2(y, x)
-        bearing_deg = math.degrees(bearing_rad)
+        neighbors = query.all()
         
-        return (bearing_deg + 360) % 360
+        # Precise distance and azimuth for all neighbours at once
+        azimuths, distances = geodesy.inverse(
+            lat, lon,
+            [station.latitude for station in neighbors],
+            [station.longitude for station in neighbors],
+        )
+        return [
+            NeighborCandidate(station, float(dist), float(azimuth))
+            for station, dist, azimuth in zip(neighbors, distances, azimuths)
+        ]
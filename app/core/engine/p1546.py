@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.engine.p1546_tables import FIGURE_HEIGHTS_M, FIGURES
+
+# Tabulated ITU-R P.1546 land-path field strengths and their vectorized inverse.
+#
+# Curves E(d) for 1 kW ERP are precomputed per (nominal frequency, percentage time,
+# nominal height h1), capped at the free-space field and made monotone in distance.
+# A query interpolates them as P.1546 does: linearly in log(h1) (Step 8.1), in
+# log(f) between nominal frequencies (eq. 14) and in Qi(t) between nominal times
+# (eq. 16). Inversion finds the first tabulated distance whose field falls below the
+# target and interpolates in log(d) inside that interval, so thousands of contour
+# distances cost a few array passes.
+
+NOMINAL_TIMES = (1, 10, 50)
+
+# Percentage times with no tabulated figure are derived from the 50% figure of the
+# same band by a constant time gain (the one the contour screen used before it had
+# tables), still capped at free space.
+DERIVED_TIME_GAIN_DB = {1: 12.0}
+
+MIN_DISTANCE_KM = 0.1
+
+# A query frequency is covered when it lies between the tabulated nominal frequencies,
+# widened by this factor on each side: a lone figure only stands for its own broadcast
+# band (the 100 MHz figure for Band II), not for VHF-High or UHF television.
+FREQUENCY_SPAN = 1.25
+
+# Uncovered frequencies fall back to the log-slope approximation the contour screen
+# used before it had tables: E = base + ERP + 20 log(h1 / 150) + time gain - k log(d).
+APPROXIMATION_BASE_DBUV = 100.0
+APPROXIMATION_SLOPE = 35.0
+
+
+def qi(x) -> np.ndarray:
+    """Inverse complementary cumulative normal distribution (P.1546 Annex 5, Par 15)."""
+    x = np.asarray(x, dtype=float)
+    z = np.where(x <= 0.5, x, 1.0 - x)
+    t = np.sqrt(-2.0 * np.log(z))
+    c = ((0.010328 * t + 0.802853) * t + 2.515517) / (((0.001308 * t + 0.189269) * t + 1.432788) * t + 1.0)
+    return np.where(x <= 0.5, t - c, -(t - c))
+
+
+def free_space_field(distance_km) -> np.ndarray:
+    """Free-space field strength for 1 kW ERP (dB(uV/m)), the P.1546 land-path maximum."""
+    return 106.9 - 20.0 * np.log10(np.asarray(distance_km, dtype=float))
+
+
+def _bracket(grid: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Lower/upper indices of the grid interval holding each value (edge intervals outside)."""
+    if grid.size == 1:
+        zeros = np.zeros(values.shape, dtype=int)
+        return zeros, zeros
+    upper = np.clip(np.searchsorted(grid, values), 1, grid.size - 1)
+    return upper - 1, upper
+
+
+def _weights(grid: np.ndarray, values: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+    span = grid[upper] - grid[lower]
+    return np.divide(values - grid[lower], span, out=np.zeros(values.shape), where=span != 0)
+
+
+def _lerp(low: np.ndarray, high: np.ndarray, weight: np.ndarray) -> np.ndarray:
+    return low + (high - low) * weight[:, None]
+
+
+class P1546Curves:
+    """Precomputed P.1546 E(d) curves with vectorized forward and inverse lookups."""
+
+    def __init__(
+        self,
+        figures: Dict[Tuple[int, int], Sequence[Sequence[float]]] = FIGURES,
+        heights_m: Sequence[float] = FIGURE_HEIGHTS_M,
+        derived_time_gain_db: Optional[Dict[int, float]] = None,
+    ) -> None:
+        derived_time_gain_db = DERIVED_TIME_GAIN_DB if derived_time_gain_db is None else derived_time_gain_db
+        tables = {key: np.asarray(rows, dtype=float) for key, rows in figures.items()}
+        first = next(iter(tables.values()))
+        self.distances_km = first[:, 0]
+        if any(not np.array_equal(table[:, 0], self.distances_km) for table in tables.values()):
+            raise ValueError("P.1546 figures must share their distance rows")
+
+        self.frequencies_mhz = np.array(sorted({freq for freq, _ in tables}), dtype=float)
+        # Times with a figure in every band; the others are derived by a time gain.
+        self.figure_times_pct = np.array(
+            sorted(t for t in {t for _, t in tables} if all((int(f), t) in tables for f in self.frequencies_mhz)),
+            dtype=float,
+        )
+        self.times_pct = np.array(
+            sorted({t for _, t in tables} | {t for t in derived_time_gain_db if t in NOMINAL_TIMES}), dtype=float
+        )
+        self.heights_m = np.asarray(heights_m, dtype=float)
+        self._log_d = np.log10(self.distances_km)
+        self._log_f = np.log10(self.frequencies_mhz)
+        self._log_h = np.log10(self.heights_m)
+        self._q_t = qi(self.times_pct / 100.0)
+
+        # curves[band, time, height, distance]
+        e_max = free_space_field(self.distances_km)
+        self.curves = np.empty((self.frequencies_mhz.size, self.times_pct.size, self.heights_m.size, self._log_d.size))
+        for b, freq in enumerate(self.frequencies_mhz):
+            for t, time_pct in enumerate(self.times_pct):
+                key = (int(freq), int(time_pct))
+                if key in tables:
+                    field = tables[key][:, 1:].T
+                elif (int(freq), 50) in tables and int(time_pct) in derived_time_gain_db:
+                    field = tables[(int(freq), 50)][:, 1:].T + derived_time_gain_db[int(time_pct)]
+                else:
+                    raise ValueError(f"No P.1546 figure for {freq:g} MHz, {time_pct:g}% time")
+                self.curves[b, t] = np.minimum.accumulate(np.minimum(field, e_max), axis=1)
+
+    def covers(self, freq_mhz) -> np.ndarray:
+        """Whether the tabulated figures stand for each frequency (see ``FREQUENCY_SPAN``)."""
+        freq_mhz = np.asarray(freq_mhz, dtype=float)
+        return (freq_mhz >= self.frequencies_mhz[0] / FREQUENCY_SPAN) & (
+            freq_mhz <= self.frequencies_mhz[-1] * FREQUENCY_SPAN
+        )
+
+    def tabulated(self, freq_mhz, time_pct) -> np.ndarray:
+        """
+        Whether results come from P.1546 figures alone: the frequency is covered and the
+        time lies within the figures' times (not derived by ``DERIVED_TIME_GAIN_DB``).
+        """
+        time_pct = np.asarray(time_pct, dtype=float)
+        within = (
+            (time_pct >= self.figure_times_pct[0]) & (time_pct <= self.figure_times_pct[-1])
+            if self.figure_times_pct.size
+            else np.zeros(time_pct.shape, dtype=bool)
+        )
+        return self.covers(freq_mhz) & within
+
+    def curves_for(self, height_m, freq_mhz, time_pct) -> np.ndarray:
+        """
+        E(d) at ``distances_km`` for 1 kW ERP, one row per (broadcast) query.
+
+        Heights are clamped to the tabulated 10-1200 m and times to 1-50%; frequencies
+        between the tabulated bands interpolate in log f, and a ValueError is raised for
+        frequencies the figures do not cover.
+        """
+        height_m, freq_mhz, time_pct = (
+            np.ravel(a).astype(float) for a in np.broadcast_arrays(height_m, freq_mhz, time_pct)
+        )
+        outside = freq_mhz[~self.covers(freq_mhz)]
+        if outside.size:
+            tabulated = ", ".join(f"{freq:g}" for freq in self.frequencies_mhz)
+            raise ValueError(f"No P.1546 figure covers {outside[0]:g} MHz (tabulated: {tabulated} MHz)")
+        log_h = np.log10(np.clip(height_m, self.heights_m[0], self.heights_m[-1]))
+        log_f = np.log10(freq_mhz)
+        q_t = qi(np.clip(time_pct, self.times_pct[0], self.times_pct[-1]) / 100.0)
+
+        h_lo, h_hi = _bracket(self._log_h, log_h)
+        f_lo, f_hi = _bracket(self._log_f, log_f)
+        # Qi decreases with time: bracket on -Qi.
+        t_lo, t_hi = _bracket(-self._q_t, -q_t)
+        w_h = _weights(self._log_h, log_h, h_lo, h_hi)
+        w_f = _weights(self._log_f, log_f, f_lo, f_hi)
+        w_t = _weights(-self._q_t, -q_t, t_lo, t_hi)
+
+        def at_band(band: np.ndarray) -> np.ndarray:
+            def at_time(time: np.ndarray) -> np.ndarray:
+                return _lerp(self.curves[band, time, h_lo], self.curves[band, time, h_hi], w_h)
+
+            low = at_time(t_lo)
+            return low if np.array_equal(t_lo, t_hi) else _lerp(low, at_time(t_hi), w_t)
+
+        field = at_band(f_lo)
+        if not np.array_equal(f_lo, f_hi):
+            field = _lerp(field, at_band(f_hi), w_f)
+            field = np.minimum.accumulate(np.minimum(field, free_space_field(self.distances_km)), axis=1)
+        return field
+
+    def field_strength(self, erp_kw, height_m, freq_mhz, distance_km, time_pct) -> np.ndarray:
+        """Field strength (dB(uV/m)) at ``distance_km`` (interpolated in log d)."""
+        erp_kw, height_m, freq_mhz, distance_km, time_pct = np.broadcast_arrays(
+            erp_kw, height_m, freq_mhz, distance_km, time_pct
+        )
+        field = self.curves_for(height_m, freq_mhz, time_pct)
+        log_d = np.log10(np.clip(np.ravel(distance_km).astype(float), self.distances_km[0], self.distances_km[-1]))
+        lower, upper = _bracket(self._log_d, log_d)
+        rows = np.arange(log_d.size)
+        weight = _weights(self._log_d, log_d, lower, upper)
+        e_1kw = field[rows, lower] + (field[rows, upper] - field[rows, lower]) * weight
+        erp_dbk = 10.0 * np.log10(np.maximum(np.ravel(erp_kw).astype(float), 0.001))
+        return (e_1kw + erp_dbk).reshape(distance_km.shape)
+
+    def distance_for(self, erp_kw, height_m, freq_mhz, field_strength_target, time_pct) -> np.ndarray:
+        """
+        Distance (km) at which the field falls to ``field_strength_target``.
+
+        Targets stronger than the field at 1 km extrapolate the first interval's slope
+        (down to ``MIN_DISTANCE_KM``); targets never reached return the last tabulated
+        distance.
+        """
+        erp_kw, height_m, freq_mhz, target, time_pct = np.broadcast_arrays(
+            erp_kw, height_m, freq_mhz, field_strength_target, time_pct
+        )
+        shape = target.shape
+        erp_dbk = 10.0 * np.log10(np.maximum(np.ravel(erp_kw).astype(float), 0.001))
+        # Shift the target instead of every curve.
+        level = np.ravel(target).astype(float) - erp_dbk
+        field = self.curves_for(height_m, freq_mhz, time_pct)
+
+        below = field <= level[:, None]
+        reached = below.any(axis=1)
+        upper = np.where(reached, np.argmax(below, axis=1), self._log_d.size - 1)
+        upper = np.maximum(upper, 1)
+        lower = upper - 1
+        rows = np.arange(level.size)
+        e_lower, e_upper = field[rows, lower], field[rows, upper]
+        drop = e_lower - e_upper
+        fraction = np.divide(e_lower - level, drop, out=np.ones(level.shape), where=drop > 0)
+        log_d = self._log_d[lower] + fraction * (self._log_d[upper] - self._log_d[lower])
+        log_d = np.where(reached, log_d, self._log_d[-1])
+        return np.maximum(10.0 ** log_d, MIN_DISTANCE_KM).reshape(shape)
+
+
+p1546_curves = P1546Curves()
+
+
+def approximate_distance(erp_kw, height_m, field_strength_target, time_pct) -> np.ndarray:
+    """
+    Distance (km) from the log-slope approximation (frequency independent).
+
+    Targets stronger than the field at 1 km give ``MIN_DISTANCE_KM``.
+    """
+    erp_dbk = 10.0 * np.log10(np.maximum(np.asarray(erp_kw, dtype=float), 0.001))
+    h_gain = 20.0 * np.log10(np.maximum(np.asarray(height_m, dtype=float), 10.0) / 150.0)
+    t_gain = np.where(np.asarray(time_pct) == 1, DERIVED_TIME_GAIN_DB[1], 0.0)
+    constant = APPROXIMATION_BASE_DBUV + erp_dbk + h_gain + t_gain
+    log_d = (constant - np.asarray(field_strength_target, dtype=float)) / APPROXIMATION_SLOPE
+    return np.where(constant < field_strength_target, MIN_DISTANCE_KM, 10.0 ** log_d)
+
+
+def contour_distances(
+    erp_kw, height_m, freq_mhz, field_strength_target, time_pct, curves: P1546Curves = p1546_curves
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Contour distances (km) and whether each came from P.1546 figures alone.
+
+    Frequencies the figures cover are solved with ``curves.distance_for``; the rest
+    keep the log-slope approximation (``approximate_distance``). Solved distances at
+    times with no figure use derived curves and are not flagged (``curves.tabulated``).
+    """
+    erp_kw, height_m, freq_mhz, target, time_pct = np.broadcast_arrays(
+        erp_kw, height_m, freq_mhz, field_strength_target, time_pct
+    )
+    covered = curves.covers(freq_mhz)
+    distances = approximate_distance(erp_kw, height_m, target, time_pct).astype(float)
+    if covered.any():
+        distances[covered] = curves.distance_for(
+            erp_kw[covered], height_m[covered], freq_mhz[covered], target[covered], time_pct[covered]
+        )
+    return distances, curves.tabulated(freq_mhz, time_pct)
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+# ITU-R P.1546 tabulated field strengths (dB(uV/m) for 1 kW ERP), land paths.
+#
+# Keyed by (nominal frequency MHz, percentage time). Each figure is a tuple of rows
+# ``(distance_km, E at each of FIGURE_HEIGHTS_M)``; the free-space limit column of the
+# source tables is omitted (it is recomputed exactly). Figure 1 is taken from the
+# P.1546 tables bundled with examples/app_core/p1546.py (its duplicated 550 km row
+# dropped); add further figures here as they are tabulated.
+
+FIGURE_HEIGHTS_M = (10, 20, 37.5, 75, 150, 300, 600, 1200)
+
+FIGURES = {
+    # Figure 1: 100 MHz, land, 50% time.
+    (100, 50): (
+        (1, 89.9759, 92.1812, 94.6355, 97.3845, 100.3181, 103.1205, 105.2426, 106.3566),
+        (2, 80.2751, 83.0908, 86.0014, 89.2076, 92.6742, 96.1197, 98.8577, 100.2846),
+        (3, 74.1662, 77.5296, 80.8234, 84.3504, 88.1427, 91.9686, 95.0958, 96.7306),
+        (4, 69.5184, 73.3548, 77.0149, 80.8312, 84.885, 88.9934, 92.4125, 94.2077),
+        (5, 65.6994, 69.9206, 73.9248, 78.0214, 82.3137, 86.6601, 90.3203, 92.2498),
+        (6, 62.4359, 66.9578, 71.2723, 75.6407, 80.1635, 84.7271, 88.6005, 90.6489),
+        (7, 59.5803, 64.3322, 68.9161, 73.5423, 78.2915, 83.0633, 87.1352, 89.294),
+        (8, 57.0412, 61.9673, 66.7783, 71.6424, 76.6127, 81.5891, 85.8531, 88.1186),
+        (9, 54.756, 59.814, 64.8127, 69.8903, 75.0733, 80.2524, 84.7074, 87.0797),
+        (10, 52.6796, 57.8377, 62.9896, 68.2548, 73.6382, 79.0175, 83.6656, 86.1477),
+        (11, 50.7782, 56.0126, 61.2886, 66.7156, 72.2842, 77.8593, 82.704, 85.3015),
+        (12, 49.0255, 54.3183, 59.6945, 65.2592, 70.9957, 76.7598, 81.8047, 84.5251),
+        (13, 47.4007, 52.7385, 58.1954, 63.8762, 69.7625, 75.7062, 80.9539, 83.8065),
+        (14, 45.8873, 51.2596, 56.7816, 62.5595, 68.5777, 74.6895, 80.141, 83.1361),
+        (15, 44.4715, 49.8704, 55.4448, 61.3035, 67.4365, 73.7034, 79.3576, 82.5061),
+        (16, 43.1423, 48.5613, 54.1779, 60.1035, 66.3356, 72.7438, 78.5971, 81.9102),
+        (17, 41.8902, 47.3243, 52.9746, 58.9555, 65.2725, 71.8079, 77.8546, 81.3432),
+        (18, 40.7074, 46.1523, 51.8294, 57.8559, 64.2452, 70.894, 77.1264, 80.8006),
+        (19, 39.5871, 45.0395, 50.7377, 56.8014, 63.2518, 70.0011, 76.4098, 80.2786),
+        (20, 38.5237, 43.9806, 49.695, 55.7889, 62.291, 69.1285, 75.7029, 79.7742),
+        (25, 33.9069, 39.3532, 45.097, 51.2676, 57.9231, 65.0574, 72.2902, 77.4302),
+        (30, 30.1811, 35.5753, 41.2901, 47.4593, 54.1611, 61.4361, 69.0821, 75.247),
+        (35, 27.1022, 32.4093, 38.0527, 44.1712, 50.8594, 58.1943, 66.0991, 73.1376),
+        (40, 24.5178, 29.7039, 35.239, 41.2678, 47.9017, 55.2511, 63.3319, 71.0823),
+        (45, 22.3242, 27.3561, 32.7481, 38.6526, 45.199, 52.5325, 60.7465, 69.0829),
+        (50, 20.4457, 25.2917, 30.5082, 36.2563, 42.6853, 49.9783, 58.3013, 67.139),
+        (55, 18.8242, 23.456, 28.4679, 34.0304, 40.3142, 47.5432, 55.9575, 65.2431),
+        (60, 17.4138, 21.8079, 26.5907, 31.9423, 38.0553, 45.1964, 53.6839, 63.3818),
+        (65, 16.1775, 20.3164, 24.8512, 29.9716, 35.891, 42.9195, 51.4583, 61.5403),
+        (70, 15.0848, 18.9575, 23.232, 28.1062, 33.813, 40.7044, 49.2674, 59.7052),
+        (75, 14.1104, 17.7128, 21.721, 26.3401, 31.8196, 38.5503, 47.1059, 57.8662),
+        (80, 13.2334, 16.5674, 20.3094, 24.6703, 29.9126, 36.4612, 44.9742, 56.017),
+        (85, 12.4361, 15.5089, 18.9902, 23.0948, 28.0952, 34.4436, 42.8775, 54.1554),
+        (90, 11.7041, 14.5267, 17.757, 21.612, 26.3701, 32.5044, 40.8233, 52.2826),
+        (95, 11.0249, 13.6116, 16.6037, 20.2192, 24.7389, 30.6498, 38.8202, 50.4029),
+        (100, 10.3885, 12.7552, 15.5241, 18.9127, 23.2014, 28.8839, 36.8766, 48.5226),
+        (110, 9.2115, 11.1888, 13.56, 16.5389, 20.3971, 25.6248, 33.1954, 44.7914),
+        (120, 8.121, 9.775, 11.8136, 14.4442, 17.9235, 22.7202, 29.8173, 41.1534),
+        (130, 7.0818, 8.4718, 10.2372, 12.578, 15.733, 20.1389, 26.7509, 37.666),
+        (140, 6.0704, 7.2464, 8.7898, 10.8924, 13.7749, 17.8372, 23.9815, 34.3703),
+        (150, 5.0717, 6.0747, 7.4382, 9.3465, 12.0024, 15.7687, 21.4807, 31.2885),
+        (160, 4.0764, 4.9392, 6.157, 7.9069, 10.3756, 13.8901, 19.2138, 28.4266),
+        (170, 3.0791, 3.8278, 4.9273, 6.5481, 8.8623, 12.1644, 17.1458, 25.7785),
+        (180, 2.0772, 2.7325, 3.7355, 5.2507, 7.4373, 10.5609, 15.2444, 23.3302),
+        (190, 1.0699, 1.6483, 2.5723, 4.0007, 6.0818, 9.0554, 13.4815, 21.0635),
+        (200, 0.0578, 0.5723, 1.4312, 2.7879, 4.7814, 7.629, 11.8338, 18.9592),
+        (225, -2.4856, -2.0889, -1.3489, -0.1229, 1.7093, 4.3216, 8.101, 14.2872),
+        (250, -5.0264, -4.7076, -4.0446, -2.9035, -1.1768, 1.2793, 4.7672, 10.2631),
+        (275, -7.539, -7.2732, -6.6619, -5.5778, -3.922, -1.5725, 1.7131, 6.7063),
+        (300, -10.0034, -9.7747, -9.1991, -8.1543, -6.5478, -4.2726, -1.1303, 3.4955),
+        (325, -12.408, -12.204, -11.661, -10.703, -9.063, -6.83, -3.39, 0.56),
+        (350, -14.746, -14.554, -14.046, -13.156, -11.48, -9.26, -5.5, -2.2),
+        (375, -17.01, -16.82, -16.35, -15.52, -13.81, -11.58, -7.49, -4.8),
+        (400, -19.2, -19.02, -18.58, -17.8, -16.06, -13.82, -9.38, -7.3),
+        (425, -21.33, -21.15, -20.75, -20.01, -18.24, -15.98, -11.19, -9.7),
+        (450, -23.39, -23.22, -22.85, -22.16, -20.36, -18.08, -12.93, -12.0),
+        (475, -25.39, -25.23, -24.89, -24.25, -22.43, -20.13, -14.6, -14.2),
+        (500, -27.34, -27.18, -26.87, -26.28, -24.45, -22.13, -16.2, -16.3),
+        (525, -29.23, -29.08, -28.8, -28.26, -26.43, -24.08, -17.74, -18.3),
+        (550, -31.08, -30.94, -30.68, -30.19, -28.37, -25.99, -19.22, -20.2),
+        (575, -32.88, -32.75, -32.53, -32.08, -30.27, -27.86, -20.65, -22.1),
+        (600, -34.64, -34.52, -34.33, -33.92, -32.13, -29.69, -22.03, -23.9),
+        (625, -36.36, -36.25, -36.09, -35.72, -33.96, -31.49, -23.36, -25.6),
+        (650, -38.04, -37.94, -37.81, -37.48, -35.75, -33.26, -24.65, -27.3),
+        (675, -39.68, -39.59, -39.49, -39.2, -37.51, -34.99, -25.9, -28.9),
+        (700, -41.29, -41.21, -41.13, -40.88, -39.23, -36.69, -27.11, -30.5),
+        (725, -42.86, -42.79, -42.73, -42.52, -40.92, -38.36, -28.28, -32.0),
+        (750, -44.4, -44.34, -44.29, -44.13, -42.58, -40.0, -29.42, -33.5),
+        (775, -45.91, -45.86, -45.82, -45.7, -44.21, -41.61, -30.53, -34.9),
+        (800, -47.39, -47.35, -47.32, -47.24, -45.81, -43.19, -31.61, -36.3),
+        (825, -48.84, -48.81, -48.79, -48.74, -47.39, -44.75, -32.66, -37.6),
+        (850, -50.27, -50.24, -50.23, -50.21, -48.94, -46.28, -33.69, -38.9),
+        (875, -51.67, -51.65, -51.64, -51.64, -50.47, -47.79, -34.69, -40.2),
+        (900, -53.05, -53.04, -53.03, -53.04, -51.97, -49.27, -35.67, -41.4),
+        (925, -54.41, -54.4, -54.4, -54.42, -53.45, -50.73, -36.63, -42.6),
+        (950, -55.75, -55.75, -55.75, -55.78, -54.91, -52.17, -37.57, -43.8),
+        (975, -57.07, -57.07, -57.08, -57.12, -56.35, -53.59, -38.49, -45.0),
+        (1000, -58.37, -58.38, -58.39, -58.44, -57.77, -54.99, -39.4, -46.1),
+    ),
+}
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from typing import Dict, Tuple
+
+import numpy as np
+from pyproj import Geod
+
+# Array geodesy shared by the engines.
+#
+# Inverse (azimuth + distance), forward (destination) and bounding-box solves over
+# NumPy arrays, broadcast together and returned in the broadcast shape. The default
+# solves WGS84 geodesics with pyproj's vectorized ``Geod``; ``spherical=True`` uses
+# great circles on the mean Earth sphere instead (haversine), a few times faster and
+# within ~0.5% of the ellipsoid, for screening where that is good enough. Azimuths
+# are degrees clockwise from north in [0, 360); distances are km.
+
+EARTH_RADIUS_KM = 6371.0088
+
+geod = Geod(ellps="WGS84")
+
+
+def _geod_args(*arrays: np.ndarray) -> list:
+    # pyproj tries a scalar fast path first, which coerces size-1 arrays with a NumPy
+    # deprecation warning; lists skip straight to the array path.
+    return [a.tolist() if a.size == 1 else a for a in arrays]
+
+
+def _broadcast(*values) -> Tuple[Tuple[int, ...], list]:
+    arrays = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in values))
+    return arrays[0].shape, [np.ravel(a) for a in arrays]
+
+
+def inverse(lat1, lon1, lat2, lon2, spherical: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """Forward azimuth (degrees) and distance (km) from point 1 to point 2."""
+    shape, (lat1, lon1, lat2, lon2) = _broadcast(lat1, lon1, lat2, lon2)
+    if lat1.size == 0:
+        return np.empty(shape), np.empty(shape)
+    if spherical:
+        phi1, phi2 = np.radians(lat1), np.radians(lat2)
+        d_lambda = np.radians(lon2 - lon1)
+        h = np.sin((phi2 - phi1) / 2.0) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(d_lambda / 2.0) ** 2
+        distance_km = 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+        azimuth = np.degrees(
+            np.arctan2(
+                np.sin(d_lambda) * np.cos(phi2),
+                np.cos(phi1) * np.sin(phi2) - np.sin(phi1) * np.cos(phi2) * np.cos(d_lambda),
+            )
+        )
+    else:
+        azimuth, _, dist_m = geod.inv(*_geod_args(lon1, lat1, lon2, lat2))
+        azimuth = np.asarray(azimuth, dtype=float)
+        distance_km = np.asarray(dist_m, dtype=float) / 1000.0
+    return (azimuth % 360.0).reshape(shape), distance_km.reshape(shape)
+
+
+def distance_km(lat1, lon1, lat2, lon2, spherical: bool = False) -> np.ndarray:
+    return inverse(lat1, lon1, lat2, lon2, spherical)[1]
+
+
+def destination(lat, lon, azimuth_deg, distance_km, spherical: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """Latitude and longitude reached from each point along ``azimuth_deg`` for ``distance_km``."""
+    shape, (lat, lon, azimuth_deg, distance_km) = _broadcast(lat, lon, azimuth_deg, distance_km)
+    if lat.size == 0:
+        return np.empty(shape), np.empty(shape)
+    if spherical:
+        phi1, lambda1 = np.radians(lat), np.radians(lon)
+        theta = np.radians(azimuth_deg)
+        delta = distance_km / EARTH_RADIUS_KM
+        phi2 = np.arcsin(
+            np.clip(np.sin(phi1) * np.cos(delta) + np.cos(phi1) * np.sin(delta) * np.cos(theta), -1.0, 1.0)
+        )
+        lambda2 = lambda1 + np.arctan2(
+            np.sin(theta) * np.sin(delta) * np.cos(phi1), np.cos(delta) - np.sin(phi1) * np.sin(phi2)
+        )
+        lats = np.degrees(phi2)
+        lons = (np.degrees(lambda2) + 180.0) % 360.0 - 180.0
+    else:
+        lons, lats, _ = geod.fwd(*_geod_args(lon, lat, azimuth_deg, distance_km * 1000.0))
+        lats, lons = np.asarray(lats, dtype=float), np.asarray(lons, dtype=float)
+    return lats.reshape(shape), lons.reshape(shape)
+
+
+def bbox(lat: float, lon: float, radius_km: float, spherical: bool = False) -> Dict[str, float]:
+    """South/west/north/east box around the circle of ``radius_km`` (four destination solves)."""
+    lats, lons = destination(lat, lon, [0.0, 90.0, 180.0, 270.0], radius_km, spherical)
+    return {"south": float(lats[2]), "west": float(lons[3]), "north": float(lats[0]), "east": float(lons[1])}
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+from app.config import AppConfig
+from app.core.propagation import OUTPUT_DIR
+
+# Persistent store of per-link terrain loss rasters.
+#
+# An entry is the excess path loss (dB over free space) from one transmitter site to
+# every cell of one study grid. It does not depend on ERP or antenna pattern, so any
+# later study of the same site/height/band over the same grid is a raster add: free
+# space is recomputed exactly per cell and the stored term subtracted. Cells are NaN
+# where not evaluated (outside the study radius, or pruned) and +inf where terrain is
+# missing along the path. Entries are ``<key>.npy``; the file mtime records last use
+# for LRU eviction.
+
+# Frequency band width: sites reuse a raster within +-1% of the band centre.
+# Diffraction scales with sqrt(frequency), so the reuse error stays well below 0.1 dB.
+BAND_RATIO = 1.02
+
+
+def frequency_band(freq_mhz: float) -> int:
+    """Index of the logarithmic frequency band containing ``freq_mhz``."""
+    return int(round(math.log(freq_mhz) / math.log(BAND_RATIO)))
+
+
+def quantize(values: np.ndarray, dtype) -> np.ndarray:
+    """Round ``values`` through ``dtype`` (float64 result), as storing them would."""
+    return np.asarray(values).astype(dtype).astype(np.float64)
+
+
+def loss_key(
+    site_lat: float,
+    site_lon: float,
+    antenna_height_m: float,
+    frequency_mhz: float,
+    grid_lat: float,
+    grid_lon: float,
+    radius_km: float,
+    grid_size: int,
+    model: str,
+    terrain_version: str,
+) -> str:
+    """Stable SHA-256 of the inputs that determine a loss raster."""
+    inputs = {
+        "site": [round(float(site_lat), 7), round(float(site_lon), 7)],
+        "antenna_height_m": round(float(antenna_height_m), 2),
+        "band": frequency_band(frequency_mhz),
+        "grid": [round(float(grid_lat), 7), round(float(grid_lon), 7), round(float(radius_km), 6), int(grid_size)],
+        "model": model,
+        "terrain": terrain_version,
+    }
+    payload = json.dumps(inputs, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class LossStore:
+    """Size-bounded LRU of loss rasters under ``root``, stored as ``dtype`` arrays."""
+
+    def __init__(self, root: str | Path, max_bytes: int, dtype=np.float16) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.dtype = np.dtype(dtype)
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.npy"
+
+    def quantize(self, values: np.ndarray) -> np.ndarray:
+        """Round ``values`` as storage would, so fresh and stored runs agree exactly."""
+        return quantize(values, self.dtype)
+
+    def get(self, key: str, shape: Optional[tuple] = None) -> Optional[np.ndarray]:
+        """Return the stored raster (float64) and mark it used; None if absent or mis-shaped."""
+        path = self._path(key)
+        try:
+            values = np.load(path)
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+        if shape is not None and values.shape != tuple(shape):
+            return None
+        os.utime(path)
+        return values.astype(np.float64)
+
+    def put(self, key: str, values: np.ndarray) -> None:
+        """Write ``values`` atomically, then evict down to ``max_bytes``."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self._path(key).with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as handle:
+            np.save(handle, np.asarray(values).astype(self.dtype))
+        os.replace(tmp, self._path(key))
+        self.evict(keep=key)
+
+    def evict(self, keep: Optional[str] = None) -> List[str]:
+        """Drop least recently used rasters until the store fits; returns evicted keys."""
+        if not self.root.is_dir():
+            return []
+        entries = []
+        total = 0
+        for path in self.root.glob("*.npy"):
+            stat = path.stat()
+            entries.append((stat.st_mtime_ns, path.stem, stat.st_size))
+            total += stat.st_size
+        evicted: List[str] = []
+        for _, key, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            self._path(key).unlink(missing_ok=True)
+            total -= size
+            evicted.append(key)
+        return evicted
+
+
+loss_store = LossStore(OUTPUT_DIR / "losses", AppConfig().LOSS_STORE_MAX_MB * 1024 * 1024)
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import AppConfig
+from app.core.profiles import RadialProfileSet
+
+# Row-band parallelism for grid studies.
+#
+# The grid is cut into fixed bands of rows (independent of the worker count, so
+# results do not depend on it) and each band is evaluated in a process pool. Large
+# arrays (terrain profiles) are published once in shared memory and attached by the
+# workers at start-up; only small per-band arguments travel through pickling. Bands
+# are merged in row order, whatever order they finish in.
+
+BAND_ROWS = 16
+
+# Shared array descriptor: (shared memory block name, shape, dtype string).
+SharedSpec = Tuple[str, Tuple[int, ...], str]
+
+_attached: Dict[str, np.ndarray] = {}
+_blocks: List[shared_memory.SharedMemory] = []
+
+
+@dataclass(frozen=True)
+class Transmitter:
+    """Picklable snapshot of the Station fields read by the field-strength kernels."""
+
+    id: Optional[int]
+    latitude: float
+    longitude: float
+    frequency_mhz: float
+    erp_kw: float
+    antenna_height: float
+
+    @property
+    def antenna_height_m(self) -> float:
+        return self.antenna_height
+
+    @classmethod
+    def from_station(cls, station) -> "Transmitter":
+        return cls(
+            id=station.id,
+            latitude=station.latitude,
+            longitude=station.longitude,
+            frequency_mhz=station.frequency_mhz,
+            erp_kw=station.erp_kw,
+            antenna_height=station.antenna_height,
+        )
+
+
+def resolve_workers(workers: Optional[int]) -> int:
+    """Worker count to use: explicit value, else ``INTERFERENCE_WORKERS`` (1 = serial)."""
+    if workers is None:
+        workers = AppConfig().INTERFERENCE_WORKERS
+    return max(int(workers), 1)
+
+
+def row_bands(n_rows: int, band_rows: int = BAND_ROWS) -> List[Tuple[int, int]]:
+    return [(start, min(start + band_rows, n_rows)) for start in range(0, n_rows, band_rows)]
+
+
+def profile_meta(profiles: RadialProfileSet) -> dict:
+    """Everything but the heights, to rebuild ``profiles`` around a shared array."""
+    return {
+        "lat": profiles.lat,
+        "lon": profiles.lon,
+        "radius_km": profiles.radius_km,
+        "step_km": profiles.step_km,
+        "azimuths_deg": profiles.azimuths_deg,
+        "distances_km": profiles.distances_km,
+    }
+
+
+def attached_profiles(meta: dict, name: str) -> RadialProfileSet:
+    """Rebuild a profile set in a worker from its metadata and the shared heights."""
+    return RadialProfileSet(heights=_attached[name], **meta)
+
+
+def attached_array(name: str) -> Optional[np.ndarray]:
+    """A shared array in a worker (read-only), or None if it was not published."""
+    return _attached.get(name)
+
+
+@contextmanager
+def shared_arrays(arrays: Dict[str, np.ndarray]) -> Iterator[Dict[str, SharedSpec]]:
+    """Copy ``arrays`` into shared memory blocks, unlinked when the block exits."""
+    blocks = []
+    specs: Dict[str, SharedSpec] = {}
+    try:
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            blocks.append(block)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            specs[name] = (block.name, array.shape, array.dtype.str)
+        yield specs
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def _attach(specs: Dict[str, SharedSpec], tracked: bool = True) -> None:
+    # Pool initializer: map the shared blocks read-only for the life of the worker.
+    # Billiard workers do not share the owner's stdlib resource tracker; their own
+    # would unlink the blocks when they exit, so they attach untracked.
+    for name, (block_name, shape, dtype) in specs.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        if not tracked:
+            resource_tracker.unregister(block._name, "shared_memory")
+        _blocks.append(block)
+        view = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        view.flags.writeable = False
+        _attached[name] = view
+
+
+def _context(task: Callable[..., Any], processes: Any = multiprocessing):
+    # A fork server forks workers from a clean, long-lived process that has already
+    # imported the task's module, so start-up is cheap and nothing of the caller (DB
+    # connections, threads, held locks) is inherited. Spawn is the portable fallback.
+    # ``processes`` is ``multiprocessing`` or billiard, which share this API.
+    if "forkserver" not in processes.get_all_start_methods():
+        return processes.get_context("spawn")
+    context = processes.get_context("forkserver")
+    context.set_forkserver_preload(["numpy", task.__module__])
+    return context
+
+
+def _daemonic() -> bool:
+    # Celery prefork workers are billiard daemons, which the stdlib does not see, so
+    # ask billiard too when it is around.
+    if multiprocessing.current_process().daemon:
+        return True
+    try:
+        from billiard.process import current_process as billiard_process
+    except ImportError:
+        return False
+    return bool(billiard_process().daemon)
+
+
+def _daemon_context(task: Callable[..., Any]):
+    # The stdlib refuses to start children from a daemonic process; billiard, the
+    # process library Celery's prefork pool is built on, does not. None without it.
+    try:
+        import billiard
+    except ImportError:
+        return None
+    return _context(task, billiard)
+
+
+@contextmanager
+def _in_process(arrays: Dict[str, np.ndarray]) -> Iterator[None]:
+    # Serial fallback: expose ``arrays`` to the task the way a pool worker sees them.
+    previous = {name: _attached[name] for name in arrays if name in _attached}
+    for name, array in arrays.items():
+        view = np.asarray(array).view()
+        view.flags.writeable = False
+        _attached[name] = view
+    try:
+        yield
+    finally:
+        for name in arrays:
+            _attached.pop(name, None)
+        _attached.update(previous)
+
+
+def map_row_bands(
+    task: Callable[..., Any],
+    n_rows: int,
+    workers: int,
+    shared: Dict[str, np.ndarray],
+    *args: Any,
+    band_rows: int = BAND_ROWS,
+) -> List[Any]:
+    """
+    Run ``task(row_start, row_stop, *args)`` for every row band in a process pool.
+
+    ``task`` must be a module-level function; inside it, ``shared`` arrays are reached
+    through ``attached_profiles`` or ``attached_array``. Results come back in band order.
+    In a daemonic process (e.g. a Celery prefork worker) the pool is billiard's, which
+    may be started from a daemon; without billiard the bands run serially there.
+    """
+    bands = row_bands(n_rows, band_rows)
+    workers = min(workers, max(len(bands), 1))
+    context = _daemon_context(task) if workers > 1 and _daemonic() else None
+    if context is not None:
+        with shared_arrays(shared) as specs:
+            pool = context.Pool(processes=workers, initializer=_attach, initargs=(specs, False))
+            try:
+                results = [pool.apply_async(task, (start, stop, *args)) for start, stop in bands]
+                return [result.get() for result in results]
+            finally:
+                pool.terminate()
+                pool.join()
+    if workers <= 1 or _daemonic():
+        with _in_process(shared):
+            return [task(start, stop, *args) for start, stop in bands]
+    with shared_arrays(shared) as specs:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=_context(task),
+            initializer=_attach,
+            initargs=(specs,),
+        ) as pool:
+            futures = [pool.submit(task, start, stop, *args) for start, stop in bands]
+            return [future.result() for future in futures]
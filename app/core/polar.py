@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import numpy as np
+
+from app.core.diffraction import knife_edge_loss
+from app.core import geodesy
+from app.core.profiles import RadialProfileSet
+from app.core.propagation import fspl_array
+
+# Polar evaluation: path loss is computed once along each radial at terrain resolution
+# and then resampled onto the Cartesian grid, so work scales with radials x samples
+# rather than cells x profile length.
+#
+# Diffraction uses a single knife edge at the transmitter's radio horizon along the
+# radial: the running maximum of the elevation slope seen from the antenna gives the
+# dominant obstacle for every downstream sample in one cumulative pass.
+
+EFFECTIVE_EARTH_RADIUS_KM = 6371.0 * 4.0 / 3.0
+POLAR_STEP_KM = 0.09  # ~3 arc-second SRTM sample spacing
+
+
+def horizon_diffraction_loss(
+    profiles: RadialProfileSet, freq_mhz: float, tx_height_m: float, rx_height_m: float = 10.0
+) -> np.ndarray:
+    """
+    Knife-edge loss (dB) at the radio horizon for every radial sample.
+
+    Returns an array shaped like ``profiles.heights``; samples whose terrain is missing
+    (NaN) get 0 dB, i.e. free space.
+    """
+    d_km = profiles.distances_km
+    n_samples = d_km.size
+    # Terrain relative to the site's tangent plane (4/3 earth curvature drop).
+    drop_m = (d_km**2) * 1000.0 / (2.0 * EFFECTIVE_EARTH_RADIUS_KM)
+    ground = profiles.heights.astype(np.float64) - drop_m[None, :]
+    tx_abs = ground[:, :1] + tx_height_m
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = (ground - tx_abs) / d_km[None, :]
+    slope[:, 0] = -np.inf
+    slope = np.where(np.isnan(slope), -np.inf, slope)
+
+    # Cumulative horizon: running max slope and the index where it was reached.
+    running = np.maximum.accumulate(slope, axis=1)
+    sample_idx = np.broadcast_to(np.arange(n_samples), slope.shape)
+    horizon_idx = np.maximum.accumulate(np.where(slope >= running, sample_idx, 0), axis=1)
+    # Obstacle for a receiver at sample j is the horizon over samples 1..j-1.
+    obstacle = np.zeros_like(horizon_idx)
+    obstacle[:, 1:] = horizon_idx[:, :-1]
+
+    d1_km = d_km[obstacle]
+    d2_km = d_km[None, :] - d1_km
+    rx_abs = ground + rx_height_m
+    obstacle_h = np.take_along_axis(ground, obstacle, axis=1)
+    wavelength = 300.0 / freq_mhz
+    with np.errstate(divide="ignore", invalid="ignore"):
+        los_h = tx_abs + (rx_abs - tx_abs) * (d1_km / d_km[None, :])
+        clearance = obstacle_h - los_h
+        v = clearance * np.sqrt((2.0 / wavelength) * (1.0 / (d1_km * 1000.0) + 1.0 / (d2_km * 1000.0)))
+    v = np.where((obstacle > 0) & (d2_km > 0), v, -np.inf)
+
+    return knife_edge_loss(v)
+
+
+def _polar_coords(profiles: RadialProfileSet, lats: np.ndarray, lons: np.ndarray):
+    return geodesy.inverse(profiles.lat, profiles.lon, np.ravel(lats), np.ravel(lons))
+
+
+def _resample(profiles: RadialProfileSet, values: np.ndarray, az: np.ndarray, dist_km: np.ndarray) -> np.ndarray:
+    n_radials, n_samples = values.shape
+    fa = (az % 360.0) / (360.0 / n_radials)
+    a0 = np.floor(fa).astype(np.intp)
+    wa = fa - a0
+    a0 %= n_radials
+    a1 = (a0 + 1) % n_radials
+
+    fd = dist_km / profiles.step_km
+    d0 = np.clip(np.floor(fd).astype(np.intp), 0, max(n_samples - 2, 0))
+    d1 = np.minimum(d0 + 1, n_samples - 1)
+    wd = np.clip(fd - d0, 0.0, 1.0)
+
+    near = values[a0, d0] * (1 - wa) + values[a1, d0] * wa
+    far = values[a0, d1] * (1 - wa) + values[a1, d1] * wa
+    out = near * (1 - wd) + far * wd
+    out[dist_km > profiles.radius_km + 1e-9] = np.nan
+    return out
+
+
+def polar_to_grid(profiles: RadialProfileSet, values: np.ndarray, lats, lons) -> np.ndarray:
+    """
+    Bilinearly resample a (radials x samples) array onto lat/lon points.
+
+    Interpolation wraps around in azimuth; points beyond the radial length are NaN.
+    """
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    az, dist_km = _polar_coords(profiles, lats, lons)
+    return _resample(profiles, values, az, dist_km).reshape(lats.shape)
+
+
+def polar_path_loss(
+    profiles: RadialProfileSet, freq_mhz: float, tx_height_m: float, lats, lons, rx_height_m: float = 10.0
+) -> np.ndarray:
+    """
+    Path loss (dB) at lat/lon points: exact FSPL plus the resampled horizon diffraction.
+
+    Only the diffraction term is interpolated, so the FSPL singularity near the site is
+    not smeared across cells. Points beyond the radial length are NaN.
+    """
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    az, dist_km = _polar_coords(profiles, lats, lons)
+    diffraction = horizon_diffraction_loss(profiles, freq_mhz, tx_height_m, rx_height_m)
+    loss = fspl_array(dist_km, freq_mhz) + _resample(profiles, diffraction, az, dist_km)
+    return loss.reshape(lats.shape)
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import math
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import rasterio
+from geoalchemy2.shape import to_shape
+from rasterio.features import rasterize
+from rasterio.transform import from_origin
+from rasterio.windows import Window
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.config import AppConfig
+from app.models import VectorFeature
+
+# Population raster for impacted-population queries.
+#
+# Census sectors (``VectorFeature`` with a ``population`` property) are spread over a
+# ~100 m geographic grid by area weighting: each sector is rasterized on a
+# ``SUPERSAMPLE`` x finer grid and its count split over the cells in proportion to
+# the sub-cells it covers, so every sector's total is preserved. Band 1 holds
+# population, band 2 households (float32). Queries are then a masked sum over the
+# cells of a study raster instead of a JSONB cast per sector.
+
+RESOLUTION_M = 100
+SUPERSAMPLE = 4
+METERS_PER_DEGREE = 111_320.0
+STRIP_ROWS = 256
+
+# (geometry, population, households) as fed to the rasterizer.
+Sector = Tuple[object, float, float]
+
+
+def _count(value) -> float:
+    try:
+        count = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return count if math.isfinite(count) and count > 0 else 0.0
+
+
+def rasterize_population(
+    sectors: Iterable[Sector],
+    bounds: Tuple[float, float, float, float],
+    out_path: str | Path,
+    resolution_m: float = RESOLUTION_M,
+    supersample: int = SUPERSAMPLE,
+) -> Path:
+    """
+    Write the area-weighted population raster of ``sectors`` over ``bounds``
+    (west, south, east, north) to ``out_path``.
+
+    Cells are square in metres at the centre latitude. Counts accumulate in a disk
+    backed array, so national extents do not need to fit in memory.
+    """
+    west, south, east, north = bounds
+    mid_lat = math.radians((south + north) / 2.0)
+    step_lat = resolution_m / METERS_PER_DEGREE
+    step_lon = resolution_m / (METERS_PER_DEGREE * max(math.cos(mid_lat), 0.01))
+    height = max(1, math.ceil((north - south) / step_lat))
+    width = max(1, math.ceil((east - west) / step_lon))
+
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    scratch = out_path.with_suffix(".accumulate.npy")
+    counts = np.lib.format.open_memmap(scratch, mode="w+", dtype=np.float32, shape=(2, height, width))
+    try:
+        for geom, population, households in sectors:
+            if population <= 0 and households <= 0:
+                continue
+            min_x, min_y, max_x, max_y = geom.bounds
+            r0 = min(max(math.floor((north - max_y) / step_lat), 0), height - 1)
+            r1 = min(max(math.ceil((north - min_y) / step_lat), r0 + 1), height)
+            c0 = min(max(math.floor((min_x - west) / step_lon), 0), width - 1)
+            c1 = min(max(math.ceil((max_x - west) / step_lon), c0 + 1), width)
+            rows, cols = r1 - r0, c1 - c0
+            fine = rasterize(
+                [(geom, 1)],
+                out_shape=(rows * supersample, cols * supersample),
+                transform=from_origin(
+                    west + c0 * step_lon, north - r0 * step_lat, step_lon / supersample, step_lat / supersample
+                ),
+                fill=0,
+                dtype="uint8",
+            )
+            covered = fine.reshape(rows, supersample, cols, supersample).sum(axis=(1, 3), dtype=np.float64)
+            total = covered.sum()
+            if total == 0:
+                # Sector smaller than a sub-cell: all of it goes to the cell holding it.
+                point = geom.representative_point()
+                row = min(max(int((north - point.y) // step_lat), 0), height - 1)
+                col = min(max(int((point.x - west) // step_lon), 0), width - 1)
+                counts[:, row, col] += (population, households)
+                continue
+            share = covered / total
+            counts[0, r0:r1, c0:c1] += (share * population).astype(np.float32)
+            counts[1, r0:r1, c0:c1] += (share * households).astype(np.float32)
+
+        profile = {
+            "driver": "GTiff",
+            "width": width,
+            "height": height,
+            "count": 2,
+            "dtype": "float32",
+            "crs": "EPSG:4326",
+            "transform": from_origin(west, north, step_lon, step_lat),
+            "tiled": True,
+            "blockxsize": 256,
+            "blockysize": 256,
+            "compress": "deflate",
+            "predictor": 3,
+            "BIGTIFF": "IF_SAFER",
+        }
+        with rasterio.open(out_path, "w", **profile) as dst:
+            for start in range(0, height, STRIP_ROWS):
+                stop = min(start + STRIP_ROWS, height)
+                dst.write(np.asarray(counts[:, start:stop]), window=Window(0, start, width, stop - start))
+    finally:
+        del counts
+        scratch.unlink(missing_ok=True)
+    return out_path
+
+
+def build_population_raster(
+    session: Session, out_path: str | Path, resolution_m: float = RESOLUTION_M, supersample: int = SUPERSAMPLE
+) -> Path:
+    """Rasterize every ``VectorFeature`` carrying a ``population`` property (see ``rasterize_population``)."""
+    has_population = VectorFeature.properties.has_key("population")
+    extent = func.ST_Extent(VectorFeature.geom)
+    west, south, east, north = session.execute(
+        select(func.ST_XMin(extent), func.ST_YMin(extent), func.ST_XMax(extent), func.ST_YMax(extent)).where(
+            has_population
+        )
+    ).one()
+    if west is None:
+        raise ValueError("No vector features with a population property")
+
+    rows = session.execute(
+        select(VectorFeature.geom, VectorFeature.properties).where(has_population).execution_options(yield_per=1000)
+    )
+    sectors = (
+        (to_shape(geom), _count(properties.get("population")), _count(properties.get("households")))
+        for geom, properties in rows
+    )
+    return rasterize_population(sectors, (west, south, east, north), out_path, resolution_m, supersample)
+
+
+class PopulationRaster:
+    """Reader for a raster written by ``rasterize_population``."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+
+    @classmethod
+    def default(cls) -> Optional["PopulationRaster"]:
+        """The configured ``POPULATION_RASTER``, or None until it has been built."""
+        path = Path(AppConfig().POPULATION_RASTER)
+        return cls(path) if path.is_file() else None
+
+    def sum_where(self, mask: np.ndarray, bbox: Dict[str, float]) -> Tuple[int, int]:
+        """
+        Population and households of the cells where ``mask`` holds.
+
+        ``mask`` is a south-up engine grid sampled at ``np.linspace`` over ``bbox`` (as
+        passed to ``write_raster``); each population cell takes its nearest sample.
+        """
+        mask = np.asarray(mask, dtype=bool)
+        with rasterio.open(self.path) as src:
+            inverse = ~src.transform
+            col_w, row_n = inverse * (bbox["west"], bbox["north"])
+            col_e, row_s = inverse * (bbox["east"], bbox["south"])
+            r0, r1 = max(math.floor(row_n), 0), min(math.ceil(row_s), src.height)
+            c0, c1 = max(math.floor(col_w), 0), min(math.ceil(col_e), src.width)
+            if r0 >= r1 or c0 >= c1:
+                return 0, 0
+            window = Window(c0, r0, c1 - c0, r1 - r0)
+            counts = src.read([1, 2], window=window)
+            transform = src.window_transform(window)
+
+        cell_lats = transform.f + (np.arange(counts.shape[1]) + 0.5) * transform.e
+        cell_lons = transform.c + (np.arange(counts.shape[2]) + 0.5) * transform.a
+        n_lat, n_lon = mask.shape
+        rows = np.rint((cell_lats - bbox["south"]) / (bbox["north"] - bbox["south"]) * (n_lat - 1)).astype(int)
+        cols = np.rint((cell_lons - bbox["west"]) / (bbox["east"] - bbox["west"]) * (n_lon - 1)).astype(int)
+        row_ok = (rows >= 0) & (rows < n_lat)
+        col_ok = (cols >= 0) & (cols < n_lon)
+        selected = mask[np.ix_(rows[row_ok], cols[col_ok])]
+        population = counts[0][np.ix_(row_ok, col_ok)][selected].sum(dtype=np.float64)
+        households = counts[1][np.ix_(row_ok, col_ok)][selected].sum(dtype=np.float64)
+        return int(round(population)), int(round(households))
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import math
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+from app.config import AppConfig
+from app.core import geodesy
+from app.core.terrain import ElevationProvider, TerrainMosaic
+
+
+@dataclass
+class RadialProfileSet:
+    """
+    Terrain along N radials x M samples from a transmitter site.
+
+    ``heights[i, j]`` is the ground elevation at ``azimuths_deg[i]`` and
+    ``distances_km[j]`` (NaN where terrain is missing). Radials start at the site
+    (distance 0) and are sampled every ``step_km`` out to ``radius_km``.
+    """
+
+    lat: float
+    lon: float
+    radius_km: float
+    step_km: float
+    azimuths_deg: np.ndarray
+    distances_km: np.ndarray
+    heights: np.ndarray
+
+    @classmethod
+    def extract(
+        cls,
+        terrain: ElevationProvider | TerrainMosaic,
+        lat: float,
+        lon: float,
+        radius_km: float,
+        step_km: float = 0.1,
+        n_radials: int = 360,
+    ) -> "RadialProfileSet":
+        """Sample every radial in one vectorized pass (one geodesic solve, one terrain read)."""
+        if radius_km <= 0 or step_km <= 0 or n_radials < 1:
+            raise ValueError("radius_km, step_km and n_radials must be positive.")
+        n_samples = int(math.ceil(radius_km / step_km)) + 1
+        distances_km = np.arange(n_samples, dtype=float) * step_km
+        azimuths_deg = np.arange(n_radials, dtype=float) * (360.0 / n_radials)
+
+        az_grid, dist_grid = np.meshgrid(azimuths_deg, distances_km, indexing="ij")
+        lats, lons = geodesy.destination(lat, lon, az_grid, dist_grid)
+
+        if hasattr(terrain, "mosaic"):
+            terrain = terrain.mosaic(lats.min(), lons.min(), lats.max(), lons.max(), spacing_m=step_km * 1000.0)
+        heights = np.asarray(terrain.sample(lats, lons, fill_value=np.nan), dtype=np.float32)
+        return cls(
+            lat=lat,
+            lon=lon,
+            radius_km=float(distances_km[-1]),
+            step_km=step_km,
+            azimuths_deg=azimuths_deg,
+            distances_km=distances_km,
+            heights=heights,
+        )
+
+    @property
+    def site_elevation(self) -> float:
+        return float(np.nanmean(self.heights[:, 0]))
+
+    def paths_to(self, lats, lons, samples: int = 16, fill_value: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Terrain from the site to each target point, resampled to ``samples`` points.
+
+        Each target is linearly interpolated along distance on the two radials that
+        bracket its azimuth, then between them by azimuth (a target on a radial uses
+        that radial alone). Returns ``(heights (K, samples), distance_km (K,))``.
+        Missing terrain raises ``FileNotFoundError`` unless ``fill_value`` is given.
+        """
+        lats = np.atleast_1d(np.asarray(lats, dtype=float))
+        lons = np.atleast_1d(np.asarray(lons, dtype=float))
+        az, dist_km = geodesy.inverse(self.lat, self.lon, lats, lons)
+        if np.any(dist_km > self.radius_km + 1e-6):
+            raise ValueError("Target lies beyond the extracted radial length.")
+
+        n_radials = self.azimuths_deg.size
+        turn = np.mod(az, 360.0) / (360.0 / n_radials)
+        first = np.floor(turn).astype(np.intp)
+        between = (turn - first).astype(np.float32)[:, None]
+        first %= n_radials
+        second = (first + 1) % n_radials
+        position = np.linspace(0.0, 1.0, samples)[None, :] * (dist_km[:, None] / self.step_km)
+        lower = np.minimum(np.floor(position).astype(np.intp), self.distances_km.size - 1)
+        upper = np.minimum(lower + 1, self.distances_km.size - 1)
+        frac = (position - lower).astype(np.float32)
+
+        def along(radial: np.ndarray, targets) -> np.ndarray:
+            rows = self.heights[radial[targets]]
+            h_lower = np.take_along_axis(rows, lower[targets], axis=1)
+            h_upper = np.take_along_axis(rows, upper[targets], axis=1)
+            return h_lower * (1 - frac[targets]) + h_upper * frac[targets]
+
+        heights = along(first, slice(None))
+        off_radial = between[:, 0] > 0
+        if off_radial.any():
+            heights[off_radial] += (along(second, off_radial) - heights[off_radial]) * between[off_radial]
+
+        missing = np.isnan(heights)
+        if missing.any():
+            if fill_value is None:
+                raise FileNotFoundError("Terrain unavailable along some profiles.")
+            heights[missing] = fill_value
+        return heights, dist_km
+
+    def relief_to(self, lats, lons) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Lowest and highest ground any profile to each target can be built from.
+
+        Covers every sample of the two radials bracketing the target's azimuth out to
+        its distance. Returns ``(low, high, distance_km)``; NaN where all of that
+        terrain is missing.
+        """
+        lats = np.atleast_1d(np.asarray(lats, dtype=float))
+        lons = np.atleast_1d(np.asarray(lons, dtype=float))
+        az, dist_km = geodesy.inverse(self.lat, self.lon, lats, lons)
+        n_radials = self.azimuths_deg.size
+        first = np.floor(az / (360.0 / n_radials)).astype(np.intp) % n_radials
+        second = (first + 1) % n_radials
+        reach = np.clip(np.ceil(dist_km / self.step_km - 1e-9).astype(np.intp), 0, self.distances_km.size - 1)
+        with np.errstate(invalid="ignore"):
+            highest = np.fmax.accumulate(self.heights, axis=1)
+            lowest = np.fmin.accumulate(self.heights, axis=1)
+        high = np.fmax(highest[first, reach], highest[second, reach])
+        low = np.fmin(lowest[first, reach], lowest[second, reach])
+        return low.astype(float), high.astype(float), dist_km
+
+    def haat(self, inner_km: float = 3.0, outer_km: float = 15.0, tower_height_m: float = 0.0) -> np.ndarray:
+        """Height above average terrain per radial (site ground + tower - mean ground 3-15 km)."""
+        band = (self.distances_km >= inner_km) & (self.distances_km <= outer_km)
+        if not band.any():
+            raise ValueError("Radials do not reach the averaging band.")
+        avg_ground = np.nanmean(self.heights[:, band], axis=1)
+        return (self.site_elevation + tower_height_m) - avg_ground
+
+
+def radials_for(radius_km: float, spacing_km: float) -> int:
+    """Radial count (multiple of 360, capped at 3600) keeping arc spacing near ``spacing_km``."""
+    needed = math.ceil(2 * math.pi * radius_km / max(spacing_km, 1e-3) / 360.0) * 360
+    return int(min(max(needed, 360), 3600))
+
+
+class RadialProfileCache:
+    """
+    LRU of profile sets keyed by (terrain version, site, radius, step, radials),
+    bounded by the total size of the cached heights.
+
+    Only ``ElevationProvider`` terrain is cached: ad-hoc mosaics and test doubles have
+    no stable identity to key on. Keying on ``version`` means replaced tiles or a
+    rebuilt store are never served from an older extraction.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None) -> None:
+        if max_bytes is None:
+            max_bytes = AppConfig().PROFILE_CACHE_MAX_MB * 1024 * 1024
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries: OrderedDict = OrderedDict()
+
+    def get(
+        self,
+        terrain: ElevationProvider | TerrainMosaic,
+        lat: float,
+        lon: float,
+        radius_km: float,
+        step_km: float = 0.1,
+        n_radials: int = 360,
+    ) -> RadialProfileSet:
+        # Round the radius up to whole steps so nearby requests share an entry.
+        radius_km = math.ceil(radius_km / step_km - 1e-9) * step_km
+        if not isinstance(terrain, ElevationProvider):
+            return RadialProfileSet.extract(terrain, lat, lon, radius_km, step_km, n_radials)
+        key = (terrain.version, round(lat, 6), round(lon, 6), round(radius_km, 6), step_km, n_radials)
+        profiles = self._entries.get(key)
+        if profiles is None:
+            profiles = RadialProfileSet.extract(terrain, lat, lon, radius_km, step_km, n_radials)
+            self._entries[key] = profiles
+            self.nbytes += profiles.heights.nbytes
+            # The newest entry stays even when it alone exceeds the bound.
+            while self.nbytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= evicted.heights.nbytes
+        else:
+            self._entries.move_to_end(key)
+        return profiles
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.nbytes = 0
+
+
+profile_cache = RadialProfileCache()
@@ -5,16 +5,16 @@ from contextlib import contextmanager
 from pathlib import Path
 from typing import Dict, Optional
 
-import matplotlib
-
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
 import numpy as np
 from geoalchemy2.shape import to_shape
-from geopy.distance import geodesic
 from sqlalchemy.orm import Session
 
 from app.config import get_session
+from app.core.adaptive import Evaluator, adaptive_grid
+from app.core.antenna import AntennaPattern
+from app.core import geodesy
+from app.core.profiles import profile_cache, radials_for
+from app.core.rasters import render_png, write_raster
 from app.core.terrain import ElevationProvider
 from app.models import Station
 
@@ -23,6 +23,14 @@ OUTPUT_DIR = BASE_DIR / "outputs"
 OUTPUT_DIR.mkdir(exist_ok=True)
 
 
+# Default overlay style for field-strength rasters (stored with the artifact).
+COVERAGE_STYLE = {"cmap": "inferno", "alpha": 0.7}
+
+# Propagation model identifiers per coverage mode; bump when a model's output changes so
+# cached results computed with the old physics are not reused.
+COVERAGE_MODELS = {"grid": "fspl-gradient/2", "polar": "fspl-horizon-knife-edge/2"}
+
+
 @contextmanager
 def _session_scope(session: Optional[Session] = None):
     if session is not None:
@@ -39,6 +47,12 @@ def fspl(distance_km: float, freq_mhz: float) -> float:
     return 32.44 + 20 * math.log10(distance_km) + 20 * math.log10(freq_mhz)
 
 
+def fspl_array(distance_km: np.ndarray, freq_mhz: float) -> np.ndarray:
+    """Vectorized ``fspl`` over an array of distances."""
+    distance_km = np.where(distance_km <= 0, 0.001, distance_km)
+    return 32.44 + 20 * np.log10(distance_km) + 20 * math.log10(freq_mhz)
+
+
 def erp_kw_to_dbm(erp_kw: float) -> float:
     # ERP is provided in kW; convert to dBm for link budget math.
     watts = erp_kw * 1000.0
@@ -51,8 +65,33 @@ def calculate_coverage(
     grid_size: int = 100,
     session: Optional[Session] = None,
     elevation_provider: Optional[ElevationProvider] = None,
+    render: bool = True,
+    mode: str = "grid",
+    n_radials: Optional[int] = None,
+    adaptive: bool = False,
+    e_min_dbuv: Optional[float] = None,
+    band_db: float = 3.0,
 ) -> Dict:
-    """Compute coverage heatmap and return path + bounding box; designed for Celery tasks."""
+    """
+    Compute the coverage field raster and return its path + bounding box; designed for Celery tasks.
+
+    The float32 field (dBuV/m) is written as a GeoTIFF. With ``render`` the PNG overlay is
+    produced as well; tasks skip it and let the API render lazily.
+
+    ``mode="grid"`` evaluates FSPL + terrain gradient per cell. ``mode="polar"`` evaluates
+    FSPL + horizon knife-edge diffraction along ``n_radials`` radials at terrain resolution
+    (default: enough radials to match the cell size) and resamples onto the same grid.
+
+    With ``adaptive`` the grid is refined as a quadtree: only cells whose field is within
+    ``band_db`` of ``e_min_dbuv`` (default: the service's protected field strength) are
+    evaluated at full resolution; the rest are interpolated from coarser cells.
+
+    With real terrain, the terrain loss over free space is kept in ``loss_store``; a run
+    whose site, height, band and grid match a stored raster only recomputes free space
+    (``evaluations`` is then 0).
+    """
+    if mode not in COVERAGE_MODELS:
+        raise ValueError(f"Unknown coverage mode: {mode}")
     provider = elevation_provider or ElevationProvider()
     with _session_scope(session) as db:
         station = db.get(Station, station_id)
@@ -64,47 +103,125 @@ def calculate_coverage(
 
     delta_lat = radius_km / 111.0
     delta_lon = radius_km / (111.0 * max(math.cos(math.radians(center_lat)), 0.01))
-
-    lats = np.linspace(center_lat - delta_lat, center_lat + delta_lat, grid_size)
-    lons = np.linspace(center_lon - delta_lon, center_lon + delta_lon, grid_size)
-    field_strength = np.full((grid_size, grid_size), np.nan)
-
-    tx_dbm = erp_kw_to_dbm(station.erp_kw)
-    for i, lat in enumerate(lats):
-        for j, lon in enumerate(lons):
-            dist_km = geodesic((center_lat, center_lon), (lat, lon)).km
-            if dist_km > radius_km:
-                continue
-            try:
-                elevs = provider.get_elevation_profile([center_lat, lat], [center_lon, lon])
-                gradient_loss = max(0.0, (elevs[1] - elevs[0]) / max(dist_km * 1000.0, 1.0))
-            except FileNotFoundError:
-                gradient_loss = 0.0
-            path_loss = fspl(dist_km, station.frequency_mhz) + gradient_loss
-            rx_dbm = tx_dbm - path_loss
-            e_field = rx_dbm + 20 * math.log10(station.frequency_mhz) + 77.2
-            field_strength[i, j] = e_field
-
-    masked = np.ma.array(field_strength, mask=np.isnan(field_strength))
-    plt.figure(figsize=(6, 6))
-    cmap = plt.cm.inferno
-    cmap.set_bad(alpha=0.0)  # transparent where outside radius
-    plt.imshow(
-        masked,
-        extent=(lons.min(), lons.max(), lats.min(), lats.max()),
-        origin="lower",
-        cmap=cmap,
-        alpha=0.7,
-    )
-    plt.axis("off")
-    output_path = OUTPUT_DIR / f"coverage_station_{station_id}.png"
-    plt.savefig(output_path, bbox_inches="tight", pad_inches=0, transparent=True)
-    plt.close()
-
     bbox = {
         "north": center_lat + delta_lat,
         "south": center_lat - delta_lat,
         "east": center_lon + delta_lon,
         "west": center_lon - delta_lon,
     }
-    return {"image_path": str(output_path), "bbox": bbox}
+
+    lats = np.linspace(center_lat - delta_lat, center_lat + delta_lat, grid_size)
+    lons = np.linspace(center_lon - delta_lon, center_lon + delta_lon, grid_size)
+    cell_m = (2.0 * radius_km * 1000.0) / max(grid_size - 1, 1)
+
+    if mode == "polar":
+        n_radials = n_radials or radials_for(radius_km, cell_m / 1000.0)
+    erp_dbm = erp_kw_to_dbm(station.erp_kw)
+    pattern = AntennaPattern.for_station(station)
+
+    # Terrain is only read when a loss term is actually needed (a stored raster covers
+    # the whole grid, so ERP/pattern/rotation changes are array adjustments on it).
+    excess_evaluator: list = []
+
+    def excess_at(lat_points: np.ndarray, lon_points: np.ndarray) -> np.ndarray:
+        if not excess_evaluator:
+            if mode == "polar":
+                excess_evaluator.append(_polar_excess(station, provider, center_lat, center_lon, radius_km, n_radials))
+            else:
+                excess_evaluator.append(_grid_excess(provider, center_lat, center_lon, radius_km, cell_m, bbox))
+        return excess_evaluator[0](lat_points, lon_points)
+
+    def field_at(lat_points: np.ndarray, lon_points: np.ndarray, excess: Optional[np.ndarray] = None) -> np.ndarray:
+        azimuth, dist_km = _bearings(center_lat, center_lon, lat_points, lon_points)
+        if excess is None:
+            excess = excess_at(lat_points, lon_points)
+        path_loss = fspl_array(dist_km, station.frequency_mhz) + excess
+        e_field = erp_dbm + pattern.gain_db(azimuth, dist_km) - path_loss + 20 * math.log10(station.frequency_mhz) + 77.2
+        return np.where(dist_km <= radius_km, e_field, np.nan)
+
+    # Terrain loss rasters are kept per site/height/band and grid (real terrain only:
+    # test doubles have no version to key on).
+    store = store_key = stored = None
+    if isinstance(provider, ElevationProvider):
+        # Imported here: the store builds on this module.
+        from app.core.loss_store import loss_key, loss_store
+
+        model = COVERAGE_MODELS[mode] + (f"/radials={n_radials}" if mode == "polar" else "")
+        store = loss_store
+        store_key = loss_key(
+            center_lat, center_lon, station.antenna_height_m, station.frequency_mhz,
+            center_lat, center_lon, radius_km, grid_size, model, provider.version,
+        )
+        stored = store.get(store_key, (grid_size, grid_size))
+
+    lat_grid, lon_grid = np.meshgrid(lats, lons, indexing="ij")
+    if stored is not None:
+        field_strength = field_at(lat_grid, lon_grid, stored)
+        evaluations = 0
+    elif adaptive:
+        if e_min_dbuv is None:
+            # Imported here: app.regulatory builds on this module.
+            from app.regulatory.contours import protected_field_strength
+
+            e_min_dbuv = protected_field_strength(station.service_type)
+        field_strength, evaluations = adaptive_grid(field_at, lats, lons, threshold=e_min_dbuv, band=band_db)
+    else:
+        excess = excess_at(lat_grid, lon_grid)
+        if store is not None:
+            excess = store.quantize(excess)
+            store.put(store_key, excess)
+        field_strength = field_at(lat_grid, lon_grid, excess)
+        evaluations = field_strength.size
+
+    raster_path = write_raster(OUTPUT_DIR / f"coverage_station_{station_id}.tif", field_strength, bbox)
+    result = {
+        "raster_path": str(raster_path),
+        "bbox": bbox,
+        "style": dict(COVERAGE_STYLE),
+        "evaluations": int(evaluations),
+    }
+    if render:
+        result["image_path"] = str(render_png(raster_path, **COVERAGE_STYLE))
+    return result
+
+
+def _bearings(center_lat: float, center_lon: float, lats: np.ndarray, lons: np.ndarray):
+    """Forward azimuths (degrees) and distances (km) from the centre to each point."""
+    return geodesy.inverse(center_lat, center_lon, lats, lons)
+
+
+def _distances_km(center_lat: float, center_lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    return _bearings(center_lat, center_lon, lats, lons)[1]
+
+
+def _grid_excess(provider, center_lat: float, center_lon: float, radius_km: float, cell_m: float, bbox: Dict) -> Evaluator:
+    # One seamless terrain window for the whole grid; cells on missing tiles get no terrain loss.
+    terrain = provider.mosaic(bbox["south"], bbox["west"], bbox["north"], bbox["east"], spacing_m=cell_m)
+    center_elev = float(terrain.sample([center_lat], [center_lon], fill_value=np.nan)[0])
+
+    def excess_at(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        dist_km = _distances_km(center_lat, center_lon, lats, lons)
+        grid_elev = terrain.sample(lats, lons, fill_value=np.nan)
+
+        # Terrain gradient term: rise toward the cell per metre of path (0 where terrain is missing).
+        rise_m = grid_elev - center_elev
+        gradient_loss = np.where(np.isnan(rise_m), 0.0, np.maximum(0.0, rise_m / np.maximum(dist_km * 1000.0, 1.0)))
+        return np.where(dist_km <= radius_km, gradient_loss, np.nan)
+
+    return excess_at
+
+
+def _polar_excess(
+    station: Station, provider, center_lat: float, center_lon: float, radius_km: float, n_radials: int
+) -> Evaluator:
+    # Imported here: app.core.polar builds on this module's link-budget helpers.
+    from app.core.polar import POLAR_STEP_KM, horizon_diffraction_loss, polar_to_grid
+
+    profiles = profile_cache.get(provider, center_lat, center_lon, radius_km + POLAR_STEP_KM, POLAR_STEP_KM, n_radials)
+    diffraction = horizon_diffraction_loss(profiles, station.frequency_mhz, station.antenna_height_m)
+
+    def excess_at(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        excess = polar_to_grid(profiles, diffraction, lats, lons)
+        return np.where(_distances_km(center_lat, center_lon, lats, lons) <= radius_km, excess, np.nan)
+
+    return excess_at
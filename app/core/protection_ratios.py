@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import ProtectionRatio
+
+# Protection-ratio tables shared by the engine and regulatory stacks.
+#
+# Rows (service, offset, PR dB) come from ``protection_ratios`` (seeded like
+# ``RegulatoryClass``), falling back per service to the Anatel defaults below. Offsets
+# are kHz for FM and channels for TV. Each service compiles to sorted offset/ratio
+# arrays looked up with ``searchsorted``; a table holding no negative offsets is
+# symmetric (looked up on |offset|). ``version`` hashes the rows, so results derived
+# from a set of tables can be cached against it.
+
+DEFAULT_ROWS: Tuple[Tuple[str, float, float], ...] = (
+    # FM (Res. 67 / Act 112), offset in kHz
+    ("FM", 0.0, 45.0),  # Co-channel
+    ("FM", 200.0, 6.0),  # 1st Adj
+    ("FM", 400.0, -20.0),  # 2nd Adj
+    ("FM", 600.0, -40.0),  # 3rd Adj
+    # Digital TV (Act 932), offset in channels
+    ("TV", 0.0, 23.0),  # Co-channel
+    ("TV", -1.0, -28.0),  # Lower Adj
+    ("TV", 1.0, -27.0),  # Upper Adj
+)
+
+
+def _normalized(rows: Iterable[Tuple[str, float, float]]) -> Tuple[Tuple[str, float, float], ...]:
+    return tuple(sorted((service.upper(), float(offset), float(pr)) for service, offset, pr in rows))
+
+
+def _version(rows: Tuple[Tuple[str, float, float], ...]) -> str:
+    return hashlib.sha1(repr(rows).encode()).hexdigest()[:12]
+
+
+@dataclass(frozen=True)
+class PRTable:
+    """One service's ratios as sorted arrays."""
+
+    offsets: np.ndarray
+    ratios: np.ndarray
+
+    @property
+    def symmetric(self) -> bool:
+        return bool(self.offsets[0] >= 0)
+
+    def scaled(self, factor: float) -> "PRTable":
+        """The same table with offsets in other units (e.g. TV channels to MHz)."""
+        return PRTable(self.offsets * factor, self.ratios)
+
+    def _fold(self, offsets) -> np.ndarray:
+        offsets = np.asarray(offsets, dtype=float)
+        return np.abs(offsets) if self.symmetric else offsets
+
+    def exact(self, offsets) -> np.ndarray:
+        """Ratios at exactly tabulated offsets; NaN elsewhere."""
+        offsets = self._fold(offsets)
+        index = np.minimum(np.searchsorted(self.offsets, offsets), self.offsets.size - 1)
+        return np.where(self.offsets[index] == offsets, self.ratios[index], np.nan)
+
+    def nearest(self, offsets, tolerance: float) -> np.ndarray:
+        """Ratio of the nearest offset (the lower one on ties) within ``tolerance``; NaN elsewhere."""
+        offsets = self._fold(offsets)
+        upper = np.minimum(np.searchsorted(self.offsets, offsets), self.offsets.size - 1)
+        lower = np.maximum(upper - 1, 0)
+        nearest = np.where(offsets - self.offsets[lower] <= self.offsets[upper] - offsets, lower, upper)
+        within = np.abs(self.offsets[nearest] - offsets) <= tolerance
+        return np.where(within, self.ratios[nearest], np.nan)
+
+
+class ProtectionRatios:
+    """Compiled protection-ratio tables, one per service."""
+
+    def __init__(self, rows: Iterable[Tuple[str, float, float]]) -> None:
+        rows = _normalized(rows)
+        grouped: Dict[str, list] = {}
+        for service, offset, pr in rows:
+            grouped.setdefault(service, []).append((offset, pr))
+        self.tables: Dict[str, PRTable] = {
+            service: PRTable(np.array([o for o, _ in pairs]), np.array([p for _, p in pairs]))
+            for service, pairs in grouped.items()
+        }
+        self.rows = tuple(rows)
+        self.version = _version(self.rows)
+
+    @classmethod
+    def defaults(cls) -> "ProtectionRatios":
+        return cls(DEFAULT_ROWS)
+
+    @classmethod
+    def from_session(cls, session: Session) -> "ProtectionRatios":
+        """Tables from ``protection_ratios``; services with no rows keep the defaults."""
+        stored = session.execute(
+            select(ProtectionRatio.service_type, ProtectionRatio.offset, ProtectionRatio.protection_ratio_db)
+        ).all()
+        services = {service.upper() for service, _, _ in stored}
+        rows = _normalized([*stored, *(row for row in DEFAULT_ROWS if row[0] not in services)])
+        # Unchanged tables come back as the same instance, so results cached on it hold.
+        version = _version(rows)
+        if version not in _compiled:
+            _compiled[version] = cls(rows)
+        return _compiled[version]
+
+    def table(self, service_type: str) -> PRTable:
+        try:
+            return self.tables[service_type.upper()]
+        except KeyError:
+            raise ValueError(f"Unknown service type: {service_type}") from None
+
+
+DEFAULT_RATIOS = ProtectionRatios.defaults()
+
+_compiled: Dict[str, ProtectionRatios] = {DEFAULT_RATIOS.version: DEFAULT_RATIOS}
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import rasterio
+from rasterio.transform import from_origin
+
+from app.config import AppConfig
+
+# Simulation results are persisted as float32 GeoTIFFs (the numeric field/margin
+# raster plus its geotransform). PNG overlays are a presentation concern: they are
+# rendered on demand from the raster and cached per style under ``renders/``, next to
+# the raster. Renders of a raster are dropped when it is rewritten, and each
+# ``renders/`` directory is an LRU bounded by ``RENDER_CACHE_MAX_MB`` (file mtime
+# records last use).
+
+# Styles a client may ask for: colormaps from this list, alpha in steps of
+# ALPHA_STEP and levels (dB) in steps of LEVEL_STEP within +-MAX_LEVEL, so the number
+# of distinct renders per raster stays small.
+RENDER_CMAPS = ("inferno", "magma", "plasma", "viridis", "cividis", "Reds", "Blues", "Greens", "RdYlGn", "RdBu")
+ALPHA_STEP = 0.05
+LEVEL_STEP = 0.5
+MAX_LEVEL = 300.0
+
+
+def write_raster(path: str | Path, data: np.ndarray, bbox: Dict[str, float]) -> Path:
+    """
+    Write a south-up engine grid (row 0 = southernmost latitude) as a north-up GeoTIFF.
+
+    Engine grids are ``np.linspace`` samples whose first and last values lie on the
+    bbox, so the bbox holds the centres of the corner pixels and the raster extends
+    half a cell beyond it. NaN marks cells outside the study area.
+    """
+    path = Path(path)
+    drop_renders(path)
+    grid = np.flipud(np.asarray(data, dtype=np.float32))
+    height, width = grid.shape
+    dx = (bbox["east"] - bbox["west"]) / max(width - 1, 1)
+    dy = (bbox["north"] - bbox["south"]) / max(height - 1, 1)
+    transform = from_origin(bbox["west"] - dx / 2, bbox["north"] + dy / 2, dx, dy)
+    with rasterio.open(
+        path,
+        "w",
+        driver="GTiff",
+        width=width,
+        height=height,
+        count=1,
+        dtype="float32",
+        nodata=np.nan,
+        crs="EPSG:4326",
+        transform=transform,
+        compress="deflate",
+    ) as dst:
+        dst.write(grid, 1)
+    return path
+
+
+def read_raster(path: str | Path) -> Tuple[np.ndarray, Dict[str, float]]:
+    """Return the north-up float32 grid and its bbox (centres of the corner pixels, as written)."""
+    with rasterio.open(path) as src:
+        data = src.read(1).astype(np.float32)
+        bounds = src.bounds
+        half_x, half_y = src.res[0] / 2, src.res[1] / 2
+    bbox = {
+        "north": bounds.top - half_y,
+        "south": bounds.bottom + half_y,
+        "east": bounds.right - half_x,
+        "west": bounds.left + half_x,
+    }
+    return data, bbox
+
+
+def render_style(
+    cmap: str = "inferno",
+    alpha: float = 0.7,
+    vmin: Optional[float] = None,
+    vmax: Optional[float] = None,
+    mask_below: Optional[float] = None,
+    mask_above: Optional[float] = None,
+) -> Dict:
+    """
+    Validated overlay style: ``cmap`` from ``RENDER_CMAPS``, alpha in [0, 1] and levels
+    within ``MAX_LEVEL``, rounded to ``ALPHA_STEP``/``LEVEL_STEP``. Raises ValueError.
+    """
+    if cmap not in RENDER_CMAPS:
+        raise ValueError(f"Unknown colormap: {cmap}")
+    alpha = float(alpha)
+    if not 0.0 <= alpha <= 1.0:
+        raise ValueError("alpha must be between 0 and 1")
+    style = {"cmap": cmap, "alpha": round(round(alpha / ALPHA_STEP) * ALPHA_STEP, 2)}
+    for name, value in (("vmin", vmin), ("vmax", vmax), ("mask_below", mask_below), ("mask_above", mask_above)):
+        if value is not None:
+            value = float(value)
+            if not (math.isfinite(value) and abs(value) <= MAX_LEVEL):
+                raise ValueError(f"{name} must be within +-{MAX_LEVEL:g}")
+            value = round(value / LEVEL_STEP) * LEVEL_STEP
+        style[name] = value
+    return style
+
+
+def _render_dir(raster_path: Path) -> Path:
+    return raster_path.parent / "renders"
+
+
+def drop_renders(raster_path: str | Path) -> None:
+    """Delete every cached render of ``raster_path`` (when it is rewritten or removed)."""
+    raster_path = Path(raster_path)
+    for render in _render_dir(raster_path).glob(f"{raster_path.stem}_*.png"):
+        render.unlink(missing_ok=True)
+
+
+def evict_renders(render_dir: str | Path, max_bytes: int, keep: Optional[Path] = None) -> List[Path]:
+    """Drop least recently used renders until ``render_dir`` fits; returns evicted paths."""
+    render_dir = Path(render_dir)
+    if not render_dir.is_dir():
+        return []
+    entries = []
+    total = 0
+    for path in render_dir.glob("*.png"):
+        stat = path.stat()
+        entries.append((stat.st_mtime_ns, path, stat.st_size))
+        total += stat.st_size
+    evicted: List[Path] = []
+    for _, path, size in sorted(entries):
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        path.unlink(missing_ok=True)
+        total -= size
+        evicted.append(path)
+    return evicted
+
+
+def render_png(
+    raster_path: str | Path,
+    cmap: str = "inferno",
+    alpha: float = 0.7,
+    vmin: Optional[float] = None,
+    vmax: Optional[float] = None,
+    mask_below: Optional[float] = None,
+    mask_above: Optional[float] = None,
+) -> Path:
+    """
+    Render a transparent PNG overlay for a raster, reusing a cached render when the
+    raster and style are unchanged. Cells outside ``[mask_below, mask_above]`` are
+    left transparent, so re-thresholding never reruns the physics. The style goes
+    through ``render_style`` first (ValueError when it is not allowed).
+    """
+    raster_path = Path(raster_path)
+    stat = raster_path.stat()
+    style = render_style(cmap, alpha, vmin, vmax, mask_below, mask_above)
+    digest = hashlib.sha1(
+        json.dumps([str(raster_path.resolve()), stat.st_mtime_ns, stat.st_size, style], sort_keys=True).encode()
+    ).hexdigest()[:12]
+    render_dir = _render_dir(raster_path)
+    output_path = render_dir / f"{raster_path.stem}_{digest}.png"
+    if output_path.exists():
+        os.utime(output_path)
+        return output_path
+    cmap, alpha = style["cmap"], style["alpha"]
+    vmin, vmax, mask_below, mask_above = (style[key] for key in ("vmin", "vmax", "mask_below", "mask_above"))
+
+    # Matplotlib is only needed here; keep it out of the compute path and worker imports.
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    data, bbox = read_raster(raster_path)
+    hidden = np.isnan(data)
+    if mask_below is not None:
+        hidden |= data < mask_below
+    if mask_above is not None:
+        hidden |= data > mask_above
+    colormap = plt.get_cmap(cmap).copy()
+    colormap.set_bad(alpha=0.0)
+
+    render_dir.mkdir(parents=True, exist_ok=True)
+    plt.figure(figsize=(6, 6))
+    plt.imshow(
+        np.ma.array(data, mask=hidden),
+        extent=(bbox["west"], bbox["east"], bbox["south"], bbox["north"]),
+        origin="upper",
+        cmap=colormap,
+        alpha=alpha,
+        vmin=vmin,
+        vmax=vmax,
+    )
+    plt.axis("off")
+    plt.savefig(output_path, bbox_inches="tight", pad_inches=0, transparent=True)
+    plt.close()
+    evict_renders(render_dir, AppConfig().RENDER_CACHE_MAX_MB * 1024 * 1024, keep=output_path)
+    return output_path
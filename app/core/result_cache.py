@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from geoalchemy2.shape import to_shape
+
+from app.config import AppConfig
+from app.core.antenna import AntennaPattern
+from app.core.propagation import COVERAGE_MODELS, OUTPUT_DIR
+from app.core.rasters import drop_renders
+from app.core.terrain import ElevationProvider
+from app.models import Station
+
+# Content-addressed store of finished coverage rasters. Entries are keyed by a hash of
+# every physical input, so identical requests reuse one GeoTIFF no matter which station
+# row or simulation asked for it. Each entry is ``<key>.tif`` plus a ``<key>.json``
+# sidecar (bbox/style); the sidecar mtime records last use for LRU eviction.
+# Simulations never point into the cache: they get their own hard link to the raster
+# (``checkout``), so evicting an entry leaves every recorded result in place.
+
+# Keys built on the request path re-stat the terrain files at most this often.
+TERRAIN_VERSION_TTL_S = 60.0
+
+_terrain_version: Optional[Tuple[float, str]] = None
+
+
+def _rounded(value: Optional[float], digits: int = 6) -> Optional[float]:
+    return None if value is None else round(float(value), digits)
+
+
+def _pattern_tables(pattern: AntennaPattern) -> Dict[str, Optional[List[List[float]]]]:
+    # The tables the station resolves to (its own or its AntennaModel's), so editing a
+    # model's pattern changes the key of every station using it.
+    return {
+        name: None if table is None else [np.round(column, 6).tolist() for column in table]
+        for name, table in (("horizontal", pattern.horizontal), ("vertical", pattern.vertical))
+    }
+
+
+def coverage_cache_key(
+    station: Station,
+    radius_km: float,
+    grid_size: int,
+    model: str,
+    terrain_version: str,
+) -> str:
+    """Stable SHA-256 of the inputs that determine a coverage raster."""
+    if station.location is not None:
+        point = to_shape(station.location)
+        lat, lon = point.y, point.x
+    else:
+        lat, lon = station.latitude, station.longitude
+    inputs = {
+        "lat": _rounded(lat, 7),
+        "lon": _rounded(lon, 7),
+        "frequency_mhz": _rounded(station.frequency_mhz),
+        "erp_kw": _rounded(station.erp_kw),
+        "antenna_height_m": _rounded(station.antenna_height_m, 3),
+        "antenna_pattern": _pattern_tables(AntennaPattern.for_station(station)),
+        "azimuth": _rounded(station.azimuth, 3),
+        "mechanical_tilt": _rounded(station.mechanical_tilt, 3),
+        "radius_km": _rounded(radius_km),
+        "grid_size": int(grid_size),
+        "model": model,
+        "terrain": terrain_version,
+    }
+    payload = json.dumps(inputs, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def coverage_key_for(
+    station: Station,
+    radius_km: float,
+    grid_size: int = 100,
+    mode: str = "grid",
+    provider: Optional[ElevationProvider] = None,
+) -> str:
+    """Cache key for ``calculate_coverage`` with the same arguments."""
+    version = provider.version if provider is not None else default_terrain_version()
+    return coverage_cache_key(station, radius_km, grid_size, COVERAGE_MODELS[mode], version)
+
+
+def default_terrain_version() -> str:
+    """Version of the default terrain, memoized for ``TERRAIN_VERSION_TTL_S`` seconds."""
+    global _terrain_version
+    now = time.monotonic()
+    if _terrain_version is None or now - _terrain_version[0] >= TERRAIN_VERSION_TTL_S:
+        _terrain_version = (now, ElevationProvider().version)
+    return _terrain_version[1]
+
+
+class ResultCache:
+    """Size-bounded LRU of result rasters under ``root``."""
+
+    def __init__(self, root: str | Path, max_bytes: int) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+
+    def _raster(self, key: str) -> Path:
+        return self.root / f"{key}.tif"
+
+    def _sidecar(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return ``{"raster_path", "bbox", "style"}`` for a cached result and mark it used."""
+        sidecar = self._sidecar(key)
+        raster = self._raster(key)
+        try:
+            meta = json.loads(sidecar.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if not raster.exists():
+            return None
+        os.utime(sidecar)
+        return {"raster_path": str(raster), "bbox": meta["bbox"], "style": meta.get("style")}
+
+    def put(self, key: str, raster_path: str | Path, bbox: Dict[str, float], style: Optional[Dict] = None) -> Dict:
+        """Move a freshly written raster into the cache, then evict down to ``max_bytes``."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        target = self._raster(key)
+        if Path(raster_path).resolve() != target.resolve():
+            shutil.move(str(raster_path), target)
+        tmp = self._sidecar(key).with_suffix(".json.tmp")
+        tmp.write_text(json.dumps({"bbox": bbox, "style": style}))
+        os.replace(tmp, self._sidecar(key))
+        self.evict(keep=key)
+        return {"raster_path": str(target), "bbox": bbox, "style": style}
+
+    def checkout(self, result: Dict, target: str | Path) -> Dict:
+        """
+        ``result`` with its raster at ``target``, a hard link (or copy) of the cached
+        file that outlives its eviction. Results from outside the cache pass through.
+        """
+        raster = Path(result["raster_path"]).resolve()
+        if raster.parent != self.root.resolve():
+            return result
+        target = Path(target)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(".tif.tmp")
+        tmp.unlink(missing_ok=True)
+        try:
+            os.link(raster, tmp)
+        except OSError:
+            shutil.copyfile(raster, tmp)
+        drop_renders(target)
+        os.replace(tmp, target)
+        return {**result, "raster_path": str(target)}
+
+    def _entry_files(self, key: str) -> List[Path]:
+        files = [self._raster(key), self._sidecar(key)]
+        # Overlays rendered from the raster by render_png.
+        files.extend((self.root / "renders").glob(f"{key}_*.png"))
+        return files
+
+    def evict(self, keep: Optional[str] = None) -> List[str]:
+        """Drop least recently used entries until the cache fits; returns evicted keys."""
+        if not self.root.is_dir():
+            return []
+        entries = []
+        total = 0
+        for sidecar in self.root.glob("*.json"):
+            key = sidecar.stem
+            size = sum(path.stat().st_size for path in self._entry_files(key) if path.exists())
+            entries.append((sidecar.stat().st_mtime_ns, key, size))
+            total += size
+        evicted: List[str] = []
+        for _, key, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            for path in self._entry_files(key):
+                path.unlink(missing_ok=True)
+            total -= size
+            evicted.append(key)
+        return evicted
+
+
+coverage_cache = ResultCache(OUTPUT_DIR / "cache", AppConfig().RESULT_CACHE_MAX_MB * 1024 * 1024)
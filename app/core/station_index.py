@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.spatial import cKDTree
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.config import AppConfig
+from app.core import geodesy
+from app.models import Station
+
+# In-process station index for neighbour discovery.
+#
+# Stations are held as unit vectors in KD-trees, one per (service, frequency bin), so
+# a radius + spectral-window query only visits the trees whose bins overlap the window
+# and never touches the database. Great-circle radii become chord lengths on the unit
+# sphere; the sphere is searched with a small slack and the hits are then measured on
+# WGS84 (as PostGIS does on geography), so results match ``ST_DWithin`` exactly.
+#
+# One index lives per worker process (``station_index``). It reloads when the station
+# version (row count, highest id, latest ``updated_at``) changes, checked at most every
+# ``STATION_INDEX_REFRESH_S`` seconds. ``updated_at`` is stamped by a database trigger,
+# so bulk statements and SQL imports that bypass the ORM move the version too.
+
+# WGS84 geodesics stay well within 1% of great circles on the mean sphere.
+SPHERE_SLACK = 1.01
+FREQUENCY_BIN_MHZ = 2.0
+
+Version = Tuple[object, ...]
+
+
+def unit_vectors(lat_deg, lon_deg) -> np.ndarray:
+    """Earth-centred unit vectors (n, 3) of the given points."""
+    lat = np.radians(np.ravel(np.asarray(lat_deg, dtype=float)))
+    lon = np.radians(np.ravel(np.asarray(lon_deg, dtype=float)))
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+
+def chord_length(distance_km: float) -> float:
+    """Unit-sphere chord subtending a great-circle distance."""
+    return 2.0 * math.sin(min(distance_km / geodesy.EARTH_RADIUS_KM, math.pi) / 2.0)
+
+
+def _frequency_bin(freq_mhz: float) -> int:
+    return math.floor(freq_mhz / FREQUENCY_BIN_MHZ)
+
+
+@dataclass(frozen=True)
+class NeighborHits:
+    """Index query result, nearest first."""
+
+    station_ids: np.ndarray
+    distance_km: np.ndarray
+    azimuth_deg: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.station_ids.size)
+
+
+class _Partition:
+    """Stations of one service within one frequency bin."""
+
+    def __init__(self, ids: np.ndarray, lats: np.ndarray, lons: np.ndarray, freqs: np.ndarray) -> None:
+        self.ids = ids
+        self.lats = lats
+        self.lons = lons
+        self.freqs = freqs
+        self.tree = cKDTree(unit_vectors(lats, lons))
+
+
+class StationIndex:
+    """Radius + spectral-window station lookups served from memory."""
+
+    def __init__(self, refresh_s: Optional[float] = None) -> None:
+        self.refresh_s = AppConfig().STATION_INDEX_REFRESH_S if refresh_s is None else refresh_s
+        self.version: Optional[Version] = None
+        self.size = 0
+        self._partitions: Dict[Tuple[str, int], _Partition] = {}
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def load(
+        self,
+        station_ids: Sequence[int],
+        services: Sequence[str],
+        lats: Sequence[float],
+        lons: Sequence[float],
+        freqs: Sequence[float],
+        version: Optional[Version] = None,
+    ) -> "StationIndex":
+        """Replace the indexed stations (parallel sequences)."""
+        ids = np.asarray(station_ids, dtype=np.int64)
+        services = np.asarray(services, dtype=object)
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        freqs = np.asarray(freqs, dtype=float)
+        bins = np.floor(freqs / FREQUENCY_BIN_MHZ).astype(np.int64)
+
+        partitions: Dict[Tuple[str, int], _Partition] = {}
+        for service in set(services.tolist()):
+            in_service = services == service
+            for freq_bin in np.unique(bins[in_service]):
+                sel = in_service & (bins == freq_bin)
+                partitions[(service, int(freq_bin))] = _Partition(ids[sel], lats[sel], lons[sel], freqs[sel])
+
+        self._partitions = partitions
+        self.size = int(ids.size)
+        self.version = version
+        return self
+
+    @staticmethod
+    def station_version(session: Session) -> Version:
+        """Cheap stamp that changes whenever stations are added, edited or removed."""
+        return tuple(
+            session.execute(select(func.count(Station.id), func.max(Station.id), func.max(Station.updated_at))).one()
+        )
+
+    def refresh(self, session: Session, force: bool = False) -> "StationIndex":
+        """Reload from the database if the station version moved (throttled by ``refresh_s``)."""
+        now = time.monotonic()
+        if not force and self.version is not None and now - self._checked_at < self.refresh_s:
+            return self
+        with self._lock:
+            version = self.station_version(session)
+            self._checked_at = now
+            if force or version != self.version:
+                rows = session.execute(
+                    select(
+                        Station.id,
+                        Station.station_type,
+                        func.ST_Y(Station.location),
+                        func.ST_X(Station.location),
+                        Station.frequency_mhz,
+                    ).where(Station.location.isnot(None))
+                ).all()
+                columns = list(zip(*rows)) if rows else [()] * 5
+                self.load(*columns, version=version)
+        return self
+
+    def query(
+        self,
+        lat: float,
+        lon: float,
+        service: str,
+        radius_km: float,
+        freq_min: float,
+        freq_max: float,
+        exclude_id: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> NeighborHits:
+        """Stations of ``service`` within ``radius_km`` (WGS84) and ``[freq_min, freq_max]`` MHz."""
+        target = unit_vectors(lat, lon)[0]
+        chord = chord_length(radius_km * SPHERE_SLACK)
+        ids, lats, lons = [], [], []
+        for freq_bin in range(_frequency_bin(freq_min), _frequency_bin(freq_max) + 1):
+            part = self._partitions.get((service, freq_bin))
+            if part is None:
+                continue
+            found = np.asarray(part.tree.query_ball_point(target, chord), dtype=np.int64)
+            found = found[(part.freqs[found] >= freq_min) & (part.freqs[found] <= freq_max)]
+            ids.append(part.ids[found])
+            lats.append(part.lats[found])
+            lons.append(part.lons[found])
+
+        empty = NeighborHits(np.empty(0, dtype=np.int64), np.empty(0), np.empty(0))
+        if not ids:
+            return empty
+        ids, lats, lons = (np.concatenate(parts) for parts in (ids, lats, lons))
+        if exclude_id is not None:
+            keep = ids != exclude_id
+            ids, lats, lons = ids[keep], lats[keep], lons[keep]
+        if ids.size == 0:
+            return empty
+
+        azimuth, distance_km = geodesy.inverse(lat, lon, lats, lons)
+        within = np.flatnonzero(distance_km <= radius_km)
+        order = within[np.argsort(distance_km[within], kind="stable")]
+        if limit is not None:
+            order = order[:limit]
+        return NeighborHits(ids[order], distance_km[order], azimuth[order])
+
+
+def stations_for(session: Session, station_ids: Iterable[int]) -> Dict[int, Station]:
+    """ORM stations for index hits; rows already in the session cost no query."""
+    found: Dict[int, Station] = {}
+    missing = []
+    for station_id in station_ids:
+        station = session.identity_map.get(Session.identity_key(Station, int(station_id)))
+        if station is not None:
+            found[int(station_id)] = station
+        else:
+            missing.append(int(station_id))
+    if missing:
+        for station in session.execute(select(Station).where(Station.id.in_(missing))).scalars():
+            found[station.id] = station
+    return found
+
+
+station_index = StationIndex()
@@ -1,20 +1,174 @@
 from __future__ import annotations
 
+import hashlib
 import math
+import re
+from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
-from typing import Iterable, List
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import numpy as np
 
 # HGT tiles are 1x1 degree grids stored as big-endian 16-bit integers.
 # We infer side length to allow small mocked tiles in tests.
 
+_HGT_NAME = re.compile(r"^([NS])(\d{2})([EW])(\d{3})\.hgt$", re.IGNORECASE)
+
+
+def hgt_tile_name(lat_base: int, lon_base: int) -> str:
+    lat_prefix = "N" if lat_base >= 0 else "S"
+    lon_prefix = "E" if lon_base >= 0 else "W"
+    return f"{lat_prefix}{abs(lat_base):02d}{lon_prefix}{abs(lon_base):03d}.hgt"
+
+
+class HgtTileStore:
+    """
+    Directory of HGT tiles served as read-only memory maps.
+
+    Tiles are mapped instead of read, so every gunicorn/Celery process shares the
+    OS page cache rather than holding a private copy of each tile. The directory is
+    listed once into an index keyed by the tile's south-west corner.
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+        self._index: Optional[Dict[Tuple[int, int], Path]] = None
+
+    @property
+    def index(self) -> Dict[Tuple[int, int], Path]:
+        if self._index is None:
+            self.refresh()
+        return self._index  # type: ignore[return-value]
+
+    def refresh(self) -> None:
+        """Re-scan the directory (call after tiles are added or removed)."""
+        index: Dict[Tuple[int, int], Path] = {}
+        if self.root.is_dir():
+            for path in self.root.iterdir():
+                match = _HGT_NAME.match(path.name)
+                if not match:
+                    continue
+                lat = int(match.group(2)) * (1 if match.group(1).upper() == "N" else -1)
+                lon = int(match.group(4)) * (1 if match.group(3).upper() == "E" else -1)
+                index[(lat, lon)] = path
+        self._index = index
+
+    def path_for(self, lat_base: int, lon_base: int) -> Path:
+        path = self.index.get((lat_base, lon_base))
+        if path is None:
+            raise FileNotFoundError(f"SRTM tile not found: {self.root / hgt_tile_name(lat_base, lon_base)}")
+        return path
+
+    def open(self, path: str | Path) -> np.ndarray:
+        path = Path(path)
+        count = path.stat().st_size // 2
+        side = int(math.sqrt(count))
+        if side == 0 or side * side != count:
+            raise ValueError(f"Invalid HGT file size for {path}")
+        return np.memmap(path, dtype=">i2", mode="r", shape=(side, side))
+
+
+@dataclass
+class TerrainMosaic:
+    """
+    Contiguous float32 elevation window assembled from neighbouring tiles.
+
+    ``data[0, 0]`` is the north-west sample; rows run south and columns east in
+    steps of ``step`` degrees. Cells on missing tiles hold NaN.
+    """
+
+    data: np.ndarray
+    north: float
+    west: float
+    step: float
+
+    @property
+    def south(self) -> float:
+        return self.north - (self.data.shape[0] - 1) * self.step
+
+    @property
+    def east(self) -> float:
+        return self.west + (self.data.shape[1] - 1) * self.step
+
+    def sample(self, lats, lons, fill_value: Optional[float] = None) -> np.ndarray:
+        """
+        Bilinear elevation at arrays of coordinates (float32, same shape as input).
+
+        Mirrors ``ElevationProvider.sample``: points on missing terrain or outside the
+        window raise ``FileNotFoundError`` unless ``fill_value`` is given.
+        """
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        if lats.shape != lons.shape:
+            raise ValueError("lats and lons must have the same shape.")
+
+        rows_max, cols_max = self.data.shape[0] - 1, self.data.shape[1] - 1
+        r = (self.north - lats) / self.step
+        c = (lons - self.west) / self.step
+        # Small tolerance so points exactly on the window edge are not lost to rounding.
+        inside = (r >= -1e-6) & (r <= rows_max + 1e-6) & (c >= -1e-6) & (c <= cols_max + 1e-6)
+        r = np.clip(r, 0.0, rows_max)
+        c = np.clip(c, 0.0, cols_max)
+        r0 = np.minimum(np.floor(r).astype(np.intp), max(rows_max - 1, 0))
+        c0 = np.minimum(np.floor(c).astype(np.intp), max(cols_max - 1, 0))
+        r1 = np.minimum(r0 + 1, rows_max)
+        c1 = np.minimum(c0 + 1, cols_max)
+        fr = (r - r0).astype(np.float32)
+        fc = (c - c0).astype(np.float32)
+
+        top = self.data[r0, c0] * (1 - fc) + self.data[r0, c1] * fc
+        bottom = self.data[r1, c0] * (1 - fc) + self.data[r1, c1] * fc
+        out = (top * (1 - fr) + bottom * fr).astype(np.float32)
+        out[~inside] = np.nan
+
+        missing = np.isnan(out)
+        if missing.any():
+            if fill_value is None:
+                raise FileNotFoundError("Terrain unavailable for some requested points.")
+            out[missing] = fill_value
+        return out
+
 
 class ElevationProvider:
-    def __init__(self, srtm_root: str | Path = "SRTM", cache_size: int = 8) -> None:
+    def __init__(
+        self,
+        srtm_root: str | Path = "SRTM",
+        cache_size: int = 64,
+        store_root: Optional[str | Path] = None,
+    ) -> None:
         self.srtm_root = Path(srtm_root)
+        self.tiles = HgtTileStore(self.srtm_root)
+        # Cached entries are memory maps, so the cache bounds open mappings rather than RAM.
         self._load_tile = lru_cache(maxsize=cache_size)(self._load_tile)  # type: ignore
+        # Multi-resolution store built by `flask terrain build-store` (defaults to <srtm_root>/store).
+        store_root = Path(store_root) if store_root is not None else self.srtm_root / "store"
+        self.store = None
+        if store_root.is_dir():
+            from app.core.terrain_store import TerrainStore
+
+            store = TerrainStore(store_root)
+            self.store = store if store.levels else None
+        self._version: Optional[str] = None
+
+    @property
+    def version(self) -> str:
+        """
+        Short fingerprint of the terrain files in use (names, sizes, mtimes).
+
+        Computed once per provider. Results derived from terrain can be keyed on it:
+        replacing or adding a tile, or rebuilding the store, yields a new version.
+        """
+        if self._version is None:
+            files = list(self.tiles.index.values())
+            if self.store is not None:
+                files.extend(self.store.levels.values())
+            digest = hashlib.sha1()
+            for path in sorted(files):
+                stat = path.stat()
+                digest.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+            self._version = digest.hexdigest()[:16]
+        return self._version
 
     def get_elevation_profile(self, lat_list: Iterable[float], lon_list: Iterable[float]) -> List[int]:
         """Return elevations for paired lists of lat/lon coordinates."""
@@ -22,7 +176,105 @@ class ElevationProvider:
         lons = list(lon_list)
         if len(lats) != len(lons):
             raise ValueError("lat_list and lon_list must have the same length.")
-        return [self._point_elevation(lat, lon) for lat, lon in zip(lats, lons)]
+        return self.sample(lats, lons).tolist()
+
+    def sample(self, lats, lons, fill_value: Optional[float] = None) -> np.ndarray:
+        """
+        Vectorized elevation lookup for arrays of coordinates of any (matching) shape.
+
+        Points are grouped by tile so each tile is loaded and indexed once. Returns an
+        int16 array; when ``fill_value`` is given, points on missing tiles receive it
+        (float32 output) instead of raising ``FileNotFoundError``.
+        """
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        if lats.shape != lons.shape:
+            raise ValueError("lats and lons must have the same shape.")
+
+        flat_lat = lats.ravel()
+        flat_lon = lons.ravel()
+        dtype = np.int16 if fill_value is None else np.float32
+        out = np.empty(flat_lat.size, dtype=dtype)
+        if flat_lat.size == 0:
+            return out.reshape(lats.shape)
+
+        lat_base = np.floor(flat_lat).astype(np.int64)
+        lon_base = np.floor(flat_lon).astype(np.int64)
+        tiles, inverse = np.unique(np.stack([lat_base, lon_base], axis=1), axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+        order = np.argsort(inverse, kind="stable")
+        bounds = np.cumsum(np.bincount(inverse, minlength=len(tiles)))
+
+        start = 0
+        for (tile_lat, tile_lon), stop in zip(tiles, bounds):
+            idx = order[start:stop]
+            start = stop
+            try:
+                tile_path, _, _ = self._tile_info(int(tile_lat), int(tile_lon))
+            except FileNotFoundError:
+                if fill_value is None:
+                    raise
+                out[idx] = fill_value
+                continue
+            data = self._load_tile(str(tile_path))
+            size = data.shape[0]
+            rows = np.rint((tile_lat + 1 - flat_lat[idx]) * (size - 1)).astype(np.intp)
+            cols = np.rint((flat_lon[idx] - tile_lon) * (size - 1)).astype(np.intp)
+            out[idx] = data[rows, cols]
+        return out.reshape(lats.shape)
+
+    def mosaic(
+        self, south: float, west: float, north: float, east: float, spacing_m: Optional[float] = None
+    ) -> TerrainMosaic:
+        """
+        Assemble a seamless float32 window covering the bbox from all overlapping tiles.
+
+        Neighbouring HGT tiles share their edge rows/columns, so tiles are placed on a
+        common grid and only the intersecting slice of each (memory-mapped) tile is read.
+        The window is padded by one sample so bilinear lookups at the bbox edge work.
+
+        When a terrain store is present, the window is read from its coarsest level that
+        still meets ``spacing_m`` (the caller's sample spacing) instead of the raw tiles.
+        """
+        if north < south or east < west:
+            raise ValueError("Invalid bbox: north/east must not be below south/west.")
+        if self.store is not None:
+            return self.store.mosaic(south, west, north, east, spacing_m=spacing_m)
+        lat_lo, lon_lo = math.floor(south), math.floor(west)
+        lat_hi = max(lat_lo, math.ceil(north) - 1)
+        lon_hi = max(lon_lo, math.ceil(east) - 1)
+        present = {
+            key: path
+            for key, path in self.tiles.index.items()
+            if lat_lo <= key[0] <= lat_hi and lon_lo <= key[1] <= lon_hi
+        }
+
+        sides = {self._load_tile(str(path)).shape[0] for path in present.values()}
+        if len(sides) > 1:
+            raise ValueError(f"Mixed tile resolutions in bbox: {sorted(sides)}")
+        per_degree = (sides.pop() - 1) if sides else 1
+        step = 1.0 / per_degree
+
+        # Global grid indices, origin at the north-west corner of the tile block.
+        origin_lat, origin_lon = lat_hi + 1, lon_lo
+        r0 = max(0, math.floor((origin_lat - north) * per_degree) - 1)
+        r1 = min((lat_hi - lat_lo + 1) * per_degree, math.ceil((origin_lat - south) * per_degree) + 1)
+        c0 = max(0, math.floor((west - origin_lon) * per_degree) - 1)
+        c1 = min((lon_hi - lon_lo + 1) * per_degree, math.ceil((east - origin_lon) * per_degree) + 1)
+
+        data = np.full((r1 - r0 + 1, c1 - c0 + 1), np.nan, dtype=np.float32)
+        for (tile_lat, tile_lon), path in present.items():
+            tile = self._load_tile(str(path))
+            tile_r0 = (origin_lat - (tile_lat + 1)) * per_degree
+            tile_c0 = (tile_lon - origin_lon) * per_degree
+            top, bottom = max(r0, tile_r0), min(r1, tile_r0 + per_degree)
+            left, right = max(c0, tile_c0), min(c1, tile_c0 + per_degree)
+            if top > bottom or left > right:
+                continue
+            data[top - r0 : bottom - r0 + 1, left - c0 : right - c0 + 1] = tile[
+                top - tile_r0 : bottom - tile_r0 + 1, left - tile_c0 : right - tile_c0 + 1
+            ]
+        return TerrainMosaic(data=data, north=origin_lat - r0 * step, west=origin_lon + c0 * step, step=step)
 
     def _point_elevation(self, lat: float, lon: float) -> int:
         tile_path, lat_base, lon_base = self._tile_info(lat, lon)
@@ -38,19 +290,7 @@ class ElevationProvider:
     def _tile_info(self, lat: float, lon: float) -> tuple[Path, int, int]:
         lat_base = math.floor(lat)
         lon_base = math.floor(lon)
-        lat_prefix = "N" if lat_base >= 0 else "S"
-        lon_prefix = "E" if lon_base >= 0 else "W"
-        tile_name = f"{lat_prefix}{abs(lat_base):02d}{lon_prefix}{abs(lon_base):03d}.hgt"
-        tile_path = self.srtm_root / tile_name
-        if not tile_path.exists():
-            raise FileNotFoundError(f"SRTM tile not found: {tile_path}")
-        return tile_path, lat_base, lon_base
+        return self.tiles.path_for(lat_base, lon_base), lat_base, lon_base
 
     def _load_tile(self, tile_path: str) -> np.ndarray:
-        path = Path(tile_path)
-        data = np.fromfile(path, dtype=">i2")
-        side = int(math.sqrt(data.size))
-        if side * side != data.size:
-            raise ValueError(f"Invalid HGT file size for {path}")
-        return data.reshape((side, side))
-
+        return self.tiles.open(tile_path)
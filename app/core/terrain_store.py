@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import math
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import rasterio
+from rasterio.transform import from_origin
+from rasterio.windows import Window
+
+from app.core.terrain import HgtTileStore, TerrainMosaic
+
+# Multi-resolution terrain store: one tiled, DEFLATE-compressed GeoTIFF per level
+# (``dem_<arcsec>s.tif``), all on the HGT sample grid so tile edges stay exact.
+# Coarse levels are block averages of the native level: each coarse pixel is the mean
+# of the native samples under its footprint (voids excluded), centred on a native
+# sample so every level stays aligned with the integer-degree tile corners. Levels are
+# written in block-aligned strips, so each compressed block is written exactly once.
+
+DEFAULT_LEVELS_ARCSEC = (3, 9, 30)
+BLOCK = 256  # GeoTIFF tile side; every level is written in whole blocks
+OVERVIEW_COLS = 4 * BLOCK
+NODATA = -32768
+METERS_PER_ARCSEC = 30.87  # latitude arc; longitude spacing only shrinks toward the poles
+
+_LEVEL_NAME = re.compile(r"^dem_(\d+)s\.tif$")
+
+
+def _level_path(store_root: Path, arcsec: int) -> Path:
+    return store_root / f"dem_{arcsec}s.tif"
+
+
+def build_terrain_store(
+    srtm_root: str | Path,
+    store_root: str | Path,
+    levels_arcsec: Iterable[int] = DEFAULT_LEVELS_ARCSEC,
+) -> Dict[int, Path]:
+    """
+    Convert a directory of HGT tiles into the multi-resolution GeoTIFF store.
+
+    The native resolution is always written, plus every requested level that is a
+    whole multiple of it. Returns ``{arcsec: path}`` for the written levels.
+    """
+    tiles = HgtTileStore(srtm_root)
+    if not tiles.index:
+        raise FileNotFoundError(f"No HGT tiles found in {tiles.root}")
+
+    sides = {tiles.open(path).shape[0] for path in tiles.index.values()}
+    if len(sides) > 1:
+        raise ValueError(f"Mixed tile resolutions in {tiles.root}: {sorted(sides)}")
+    native_per_degree = sides.pop() - 1
+    if 3600 % native_per_degree:
+        raise ValueError(f"Unsupported HGT sample count per degree: {native_per_degree}")
+    native_arcsec = 3600 // native_per_degree
+
+    levels = {native_arcsec}
+    levels.update(int(a) for a in levels_arcsec if int(a) > native_arcsec and int(a) % native_arcsec == 0)
+
+    lat_lo = min(lat for lat, _ in tiles.index)
+    lat_hi = max(lat for lat, _ in tiles.index)
+    lon_lo = min(lon for _, lon in tiles.index)
+    lon_hi = max(lon for _, lon in tiles.index)
+
+    store_root = Path(store_root)
+    store_root.mkdir(parents=True, exist_ok=True)
+    n_lat, n_lon = lat_hi - lat_lo + 1, lon_hi - lon_lo + 1
+    written: Dict[int, Path] = {}
+    for arcsec in sorted(levels):
+        factor = arcsec // native_arcsec
+        per_degree = 3600 // arcsec
+        step = 1.0 / per_degree
+        profile = {
+            "driver": "GTiff",
+            "width": n_lon * per_degree + 1,
+            "height": n_lat * per_degree + 1,
+            "count": 1,
+            "dtype": "int16",
+            "nodata": NODATA,
+            "crs": "EPSG:4326",
+            # Pixel centres sit on the HGT sample points.
+            "transform": from_origin(lon_lo - step / 2, lat_hi + 1 + step / 2, step, step),
+            "tiled": True,
+            "blockxsize": BLOCK,
+            "blockysize": BLOCK,
+            "compress": "deflate",
+            "predictor": 2,
+            "BIGTIFF": "IF_SAFER",
+        }
+        path = _level_path(store_root, arcsec)
+        with rasterio.open(path, "w", **profile) as dst:
+            if factor == 1:
+                for row in range(0, dst.height, BLOCK):
+                    strip = _native_rows(tiles, lat_hi, lon_lo, n_lat, n_lon, per_degree, row, dst.height)
+                    dst.write(strip, 1, window=Window(0, row, dst.width, strip.shape[0]))
+            else:
+                with rasterio.open(written[native_arcsec]) as native:
+                    for row in range(0, dst.height, BLOCK):
+                        for col in range(0, dst.width, OVERVIEW_COLS):
+                            window = Window(
+                                col, row, min(OVERVIEW_COLS, dst.width - col), min(BLOCK, dst.height - row)
+                            )
+                            dst.write(_averaged(native, factor, window), 1, window=window)
+        written[arcsec] = path
+    return written
+
+
+def _native_rows(
+    tiles: HgtTileStore, lat_hi: int, lon_lo: int, n_lat: int, n_lon: int, per_degree: int, row: int, height: int
+) -> np.ndarray:
+    """Rows ``[row, row + BLOCK)`` of the native level, cut from the HGT tiles (NODATA where missing)."""
+    rows = np.arange(row, min(row + BLOCK, height))
+    # Sample k of the level is row k % per_degree of tile k // per_degree; the last
+    # sample is the bottom edge row of the last tile.
+    tile_rows, in_tile = np.divmod(rows, per_degree)
+    last = tile_rows == n_lat
+    tile_rows[last], in_tile[last] = n_lat - 1, per_degree
+    strip = np.full((rows.size, n_lon * per_degree + 1), NODATA, dtype=np.int16)
+    for tile_row in np.unique(tile_rows):
+        selected = tile_rows == tile_row
+        for tile_col in range(n_lon):
+            key = (lat_hi - int(tile_row), lon_lo + tile_col)
+            if key not in tiles.index:
+                continue
+            data = tiles.open(tiles.index[key])[in_tile[selected]]
+            col = tile_col * per_degree
+            strip[selected, col:col + data.shape[1]] = data
+    return strip
+
+
+def _box_weights(factor: int) -> np.ndarray:
+    # Native samples under one coarse pixel (``factor`` samples wide, centred on a
+    # native sample): a half-weight sample at each edge when the width is even.
+    half = factor // 2
+    weights = np.ones(2 * half + 1)
+    if factor % 2 == 0:
+        weights[[0, -1]] = 0.5
+    return weights
+
+
+def _averaged(native, factor: int, window: Window) -> np.ndarray:
+    """Coarse ``window`` of a level ``factor`` times the native spacing, by block averaging."""
+    weights = _box_weights(factor)
+    half = weights.size // 2
+    r0, c0 = window.row_off * factor - half, window.col_off * factor - half
+    n_rows, n_cols = (window.height - 1) * factor + weights.size, (window.width - 1) * factor + weights.size
+    # Read the native footprint, padding beyond the raster with NODATA.
+    read_r0, read_c0 = max(r0, 0), max(c0, 0)
+    read_r1, read_c1 = min(r0 + n_rows, native.height), min(c0 + n_cols, native.width)
+    raw = np.full((n_rows, n_cols), NODATA, dtype=np.int16)
+    raw[read_r0 - r0:read_r1 - r0, read_c0 - c0:read_c1 - c0] = native.read(
+        1, window=Window(read_c0, read_r0, read_c1 - read_c0, read_r1 - read_r0)
+    )
+
+    # Separable weighted mean over valid samples: sum(w * h) / sum(w), voids excluded.
+    valid = (raw != NODATA).astype(float)
+    totals = np.where(raw != NODATA, raw, 0).astype(float)
+    for axis in (0, 1):
+        size = window.height if axis == 0 else window.width
+        picks = [np.arange(size) * factor + offset for offset in range(weights.size)]
+        valid = sum(w * np.take(valid, idx, axis=axis) for w, idx in zip(weights, picks))
+        totals = sum(w * np.take(totals, idx, axis=axis) for w, idx in zip(weights, picks))
+    out = np.full(valid.shape, NODATA, dtype=np.int16)
+    covered = valid > 0
+    out[covered] = np.rint(totals[covered] / valid[covered])
+    return out
+
+
+class TerrainStore:
+    """Reader for a store written by ``build_terrain_store``."""
+
+    def __init__(self, store_root: str | Path) -> None:
+        self.root = Path(store_root)
+        self.levels: Dict[int, Path] = {}
+        if self.root.is_dir():
+            for path in self.root.iterdir():
+                match = _LEVEL_NAME.match(path.name)
+                if match:
+                    self.levels[int(match.group(1))] = path
+
+    def select_level(self, spacing_m: Optional[float]) -> int:
+        """Coarsest level whose sample spacing still meets ``spacing_m`` (finest if None)."""
+        if not self.levels:
+            raise FileNotFoundError(f"No terrain store levels in {self.root}")
+        finest = min(self.levels)
+        if spacing_m is None:
+            return finest
+        usable = [arcsec for arcsec in self.levels if arcsec * METERS_PER_ARCSEC <= spacing_m]
+        return max(usable) if usable else finest
+
+    def mosaic(
+        self, south: float, west: float, north: float, east: float, spacing_m: Optional[float] = None
+    ) -> TerrainMosaic:
+        """Read the bbox window (padded by one sample) from the selected level."""
+        arcsec = self.select_level(spacing_m)
+        with rasterio.open(self.levels[arcsec]) as src:
+            step = src.transform.a
+            top = src.transform.f - step / 2
+            left = src.transform.c + step / 2
+            r0 = max(0, math.floor((top - north) / step) - 1)
+            r1 = min(src.height - 1, math.ceil((top - south) / step) + 1)
+            c0 = max(0, math.floor((west - left) / step) - 1)
+            c1 = min(src.width - 1, math.ceil((east - left) / step) + 1)
+            if r0 > r1 or c0 > c1:
+                raise FileNotFoundError("Requested bbox lies outside the terrain store.")
+            raw = src.read(1, window=Window(c0, r0, c1 - c0 + 1, r1 - r0 + 1))
+        data = raw.astype(np.float32)
+        data[raw == NODATA] = np.nan
+        return TerrainMosaic(data=data, north=top - r0 * step, west=left + c0 * step, step=step)
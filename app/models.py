@@ -8,7 +8,7 @@ from argon2 import PasswordHasher, Type
 from argon2.exceptions import VerifyMismatchError, VerificationError
 from flask_login import UserMixin
 from geoalchemy2 import Geometry
-from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Index, Integer, String, Text, func
+from sqlalchemy import DDL, Boolean, DateTime, Float, ForeignKey, Index, Integer, String, Text, UniqueConstraint, event, func
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.mutable import MutableDict
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -86,6 +86,23 @@ class RegulatoryClass(Base):
             return False
 
 
+class ProtectionRatio(Base):
+    __tablename__ = "protection_ratios"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    service_type: Mapped[str] = mapped_column(String(50), nullable=False) # 'FM', 'TV'
+    offset: Mapped[float] = mapped_column(Float, nullable=False) # kHz (FM) or channels (TV)
+    protection_ratio_db: Mapped[float] = mapped_column(Float, nullable=False)
+    reference: Mapped[Optional[str]] = mapped_column(String(100)) # e.g. 'Res. 67'
+
+    __table_args__ = (
+        UniqueConstraint("service_type", "offset", name="uq_protection_ratios_offset"),
+    )
+
+    def __repr__(self):
+        return f"<ProtectionRatio {self.service_type} {self.offset:g}: {self.protection_ratio_db:g} dB>"
+
+
 class Project(Base):
     """Logical study/network grouping stations and simulations."""
 
@@ -124,6 +141,8 @@ class AntennaModel(Base):
     gain_dbi: Mapped[Optional[float]] = mapped_column(Float)
     horizontal_pattern: Mapped[Dict] = mapped_column(MutableDict.as_mutable(JSONB), nullable=False)
     vertical_pattern: Mapped[Optional[Dict]] = mapped_column(MutableDict.as_mutable(JSONB))
+    # "db" (attenuation or relative gain) or "field" (relative field, 0..1).
+    pattern_unit: Mapped[str] = mapped_column(String(16), default="db", server_default="db", nullable=False)
 
     def __repr__(self) -> str:  # pragma: no cover - representational
         return f"<AntennaModel {self.name}>"
@@ -158,6 +177,12 @@ class Station(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
 
     project: Mapped[Project] = relationship(back_populates="stations")
     antenna_model: Mapped[Optional[AntennaModel]] = relationship()
@@ -183,6 +208,46 @@ class Station(Base):
         self.antenna_height = value
 
 
+# ``onupdate`` only covers ORM flushes; this trigger also stamps bulk ``update()``
+# statements and SQL imports, so the station index version always moves. The wall
+# clock (not the transaction start) keeps a late commit from stamping an older time.
+STATION_UPDATED_AT_DDL = (
+    "CREATE OR REPLACE FUNCTION public.stations_touch_updated_at() RETURNS trigger AS $$ "
+    "BEGIN NEW.updated_at := clock_timestamp(); RETURN NEW; END $$ LANGUAGE plpgsql",
+    "DROP TRIGGER IF EXISTS stations_touch_updated_at ON public.stations",
+    "CREATE TRIGGER stations_touch_updated_at BEFORE UPDATE ON public.stations "
+    "FOR EACH ROW EXECUTE FUNCTION public.stations_touch_updated_at()",
+)
+for _statement in STATION_UPDATED_AT_DDL:
+    event.listen(Station.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+
+
+class StationConflict(Base):
+    """Contour overlap found by the viability sweep: station A protected, station B interfering."""
+
+    __tablename__ = "station_conflicts"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    service_type: Mapped[str] = mapped_column(String(20), nullable=False)
+    station_a_id: Mapped[int] = mapped_column(ForeignKey("stations.id", ondelete="CASCADE"), nullable=False)
+    station_b_id: Mapped[int] = mapped_column(ForeignKey("stations.id", ondelete="CASCADE"), nullable=False)
+    distance_km: Mapped[float] = mapped_column(Float, nullable=False)
+    freq_offset: Mapped[float] = mapped_column(Float, nullable=False)  # kHz (FM) or MHz (TV)
+    protection_ratio_db: Mapped[float] = mapped_column(Float, nullable=False)
+    overlap_km: Mapped[float] = mapped_column(Float, nullable=False)
+    computed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    __table_args__ = (
+        UniqueConstraint("station_a_id", "station_b_id", name="uq_station_conflicts_pair"),
+        Index("idx_station_conflicts_b", "station_b_id"),
+    )
+
+    def __repr__(self) -> str:  # pragma: no cover - representational
+        return f"<StationConflict {self.station_a_id}<-{self.station_b_id} {self.overlap_km:.1f} km>"
+
+
 class VectorLayer(Base):
     """Catalog of GIS layers."""
 
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-import math
-from typing import List
+from dataclasses import dataclass
+from typing import List, NamedTuple, Sequence, Tuple
+
+import numpy as np
 
-from app.core.propagation import erp_kw_to_dbm, fspl
 from app.models import Station
 from app.regulatory.regulatory import RegulatoryStandard
 from app.regulatory.search import NeighborCandidate
@@ -23,13 +24,88 @@ def calculate_contour_radius(
     erp_kw: float, antenna_height_m: float, field_strength_dbuv: float, freq_mhz: float
 ) -> float:
     """Approximate contour radius (km) using an FSPL back-solve as a fast check."""
-    prx_dbm = field_strength_dbuv - 20 * math.log10(freq_mhz) - 77.2
-    tx_dbm = erp_kw_to_dbm(erp_kw)
+    return float(contour_radii(erp_kw, antenna_height_m, field_strength_dbuv, freq_mhz))
+
+
+def contour_radii(erp_kw, antenna_height_m, field_strength_dbuv, freq_mhz) -> np.ndarray:
+    """``calculate_contour_radius`` over arrays (broadcast together)."""
+    freq_mhz = np.asarray(freq_mhz, dtype=float)
+    prx_dbm = field_strength_dbuv - 20 * np.log10(freq_mhz) - 77.2
+    # ERP in kW -> dBm, as erp_kw_to_dbm.
+    tx_dbm = 10 * np.log10(np.asarray(erp_kw, dtype=float) * 1e6)
     path_loss = tx_dbm - prx_dbm
     # Invert FSPL to distance.
-    distance_km = 10 ** ((path_loss - 32.44 - 20 * math.log10(freq_mhz)) / 20)
+    distance_km = 10 ** ((path_loss - 32.44 - 20 * np.log10(freq_mhz)) / 20)
     # Bias by antenna height: more height, slightly larger reach.
-    return max(distance_km * (1 + antenna_height_m / 1000.0), 0.1)
+    return np.maximum(distance_km * (1 + np.asarray(antenna_height_m, dtype=float) / 1000.0), 0.1)
+
+
+@dataclass
+class NeighborArrays:
+    """Neighbour fields as parallel arrays (struct of arrays), one entry per neighbour."""
+
+    frequency_mhz: np.ndarray
+    erp_kw: np.ndarray
+    antenna_height_m: np.ndarray
+    distance_km: np.ndarray
+
+    @classmethod
+    def from_candidates(cls, neighbors: Sequence[NeighborCandidate]) -> "NeighborArrays":
+        return cls(
+            frequency_mhz=np.array([n.station.frequency_mhz for n in neighbors], dtype=float),
+            erp_kw=np.array([n.station.erp_kw for n in neighbors], dtype=float),
+            antenna_height_m=np.array([n.station.antenna_height_m for n in neighbors], dtype=float),
+            distance_km=np.array([n.distance_km for n in neighbors], dtype=float),
+        )
+
+
+class ContourScreen(NamedTuple):
+    """Screening results, aligned with the ``NeighborArrays`` they came from."""
+
+    freq_offset: np.ndarray
+    protection_ratio_db: np.ndarray  # NaN where the offset has no tabulated ratio
+    protected_radius_km: float
+    interferer_radius_km: np.ndarray
+    overlap_km: np.ndarray  # Rp + Ri - separation; positive where the contours overlap
+    critical: np.ndarray
+
+
+def screen_contours(proposal: Station, neighbors: NeighborArrays, standard: RegulatoryStandard) -> ContourScreen:
+    """Rp + Ri against separation for every neighbour at once; untabulated offsets never flag."""
+    e_min = protected_field_strength(proposal.service_type)
+    rp = calculate_contour_radius(proposal.erp_kw, proposal.antenna_height_m, e_min, proposal.frequency_mhz)
+
+    offsets = _freq_offsets(proposal, neighbors.frequency_mhz)
+    pr = standard.get_required_pr_array(proposal.service_type, offsets)
+    ri = contour_radii(neighbors.erp_kw, neighbors.antenna_height_m, e_min - pr, neighbors.frequency_mhz)
+    overlap = rp + ri - neighbors.distance_km
+    return ContourScreen(offsets, pr, rp, ri, overlap, overlap > 0)
+
+
+def screen_pairs(
+    service_type: str,
+    frequency_mhz: np.ndarray,
+    erp_kw: np.ndarray,
+    antenna_height_m: np.ndarray,
+    victim: np.ndarray,
+    interferer: np.ndarray,
+    distance_km: np.ndarray,
+    standard: RegulatoryStandard,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    ``screen_contours`` over station pairs: (freq_offset, protection_ratio_db, overlap_km).
+
+    Station fields are per-station arrays; ``victim``/``interferer`` index into them,
+    one entry per pair. Overlap is NaN where the offset has no tabulated ratio.
+    """
+    e_min = protected_field_strength(service_type)
+    offsets = frequency_mhz[interferer] - frequency_mhz[victim]
+    if service_type.upper() == "FM":
+        offsets = offsets * 1000.0  # kHz
+    pr = standard.get_required_pr_array(service_type, offsets)
+    rp = contour_radii(erp_kw[victim], antenna_height_m[victim], e_min, frequency_mhz[victim])
+    ri = contour_radii(erp_kw[interferer], antenna_height_m[interferer], e_min - pr, frequency_mhz[interferer])
+    return offsets, pr, rp + ri - distance_km
 
 
 def analyze_contours(
@@ -38,31 +114,25 @@ def analyze_contours(
     standard: RegulatoryStandard,
 ) -> List[dict]:
     """Flag neighbors where Rp + Ri exceeds separation (fail-fast filter)."""
-    e_min = protected_field_strength(proposal.service_type)
-    rp = calculate_contour_radius(proposal.erp_kw, proposal.antenna_height_m, e_min, proposal.frequency_mhz)
+    screen = screen_contours(proposal, NeighborArrays.from_candidates(neighbors), standard)
+    untabulated = np.flatnonzero(np.isnan(screen.protection_ratio_db))
+    if untabulated.size:
+        # Same error as the scalar lookup.
+        standard.get_required_pr(proposal.service_type, float(screen.freq_offset[untabulated[0]]))
 
     critical = []
-    for neighbor in neighbors:
-        offset = _freq_offset(proposal, neighbor.station)
-        pr = standard.get_required_pr(proposal.service_type, offset)
-        e_int = e_min - pr
-        ri = calculate_contour_radius(
-            neighbor.station.erp_kw,
-            neighbor.station.antenna_height_m,
-            e_int,
-            neighbor.station.frequency_mhz,
+    for i in np.flatnonzero(screen.critical):
+        neighbor = neighbors[i]
+        critical.append(
+            {
+                "neighbor_station_id": neighbor.station.id,
+                "distance_km": neighbor.distance_km,
+                "azimuth_deg": neighbor.azimuth_deg,
+                "protection_ratio_db": float(screen.protection_ratio_db[i]),
+                "protected_radius_km": screen.protected_radius_km,
+                "interferer_radius_km": float(screen.interferer_radius_km[i]),
+            }
         )
-        if neighbor.distance_km < (rp + ri):
-            critical.append(
-                {
-                    "neighbor_station_id": neighbor.station.id,
-                    "distance_km": neighbor.distance_km,
-                    "azimuth_deg": neighbor.azimuth_deg,
-                    "protection_ratio_db": pr,
-                    "protected_radius_km": rp,
-                    "interferer_radius_km": ri,
-                }
-            )
     return critical
 
 
@@ -70,3 +140,10 @@ def _freq_offset(proposal: Station, neighbor: Station) -> float:
     if proposal.service_type.upper() == "FM":
         return (neighbor.frequency_mhz - proposal.frequency_mhz) * 1000.0  # kHz
     return neighbor.frequency_mhz - proposal.frequency_mhz  # MHz channel spacing
+
+
+def _freq_offsets(proposal: Station, frequency_mhz: np.ndarray) -> np.ndarray:
+    """``_freq_offset`` for an array of neighbour frequencies."""
+    if proposal.service_type.upper() == "FM":
+        return (frequency_mhz - proposal.frequency_mhz) * 1000.0  # kHz
+    return frequency_mhz - proposal.frequency_mhz  # MHz channel spacing
@@ -1,21 +1,35 @@
 from __future__ import annotations
 
 import math
+from dataclasses import dataclass
+from functools import cached_property, partial
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterable, NamedTuple, Optional
 
-import matplotlib
-
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
 import numpy as np
 from geoalchemy2.shape import to_shape
-from geopy.distance import geodesic
 from sqlalchemy import cast, func, select
 from sqlalchemy.types import Integer
 from sqlalchemy.orm import Session
 
-from app.core.propagation import erp_kw_to_dbm, fspl
+from app.core import geodesy
+from app.core.adaptive import adaptive_grid
+from app.core.antenna import AntennaPattern
+from app.core.diffraction import knife_edge_loss, multi_edge_loss
+from app.core.parallel import (
+    Transmitter,
+    attached_array,
+    attached_profiles,
+    map_row_bands,
+    profile_meta,
+    resolve_workers,
+)
+from app.core.loss_store import loss_key, loss_store, quantize
+from app.core.polar import horizon_diffraction_loss, polar_to_grid
+from app.core.population import PopulationRaster
+from app.core.propagation import erp_kw_to_dbm, fspl_array
+from app.core.rasters import render_png, write_raster
+from app.core.profiles import RadialProfileSet, profile_cache, radials_for
 from app.core.terrain import ElevationProvider
 from app.models import Station, VectorFeature
 from app.regulatory.contours import _freq_offset
@@ -25,64 +39,351 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 OUTPUT_DIR = BASE_DIR / "outputs"
 OUTPUT_DIR.mkdir(exist_ok=True)
 
+# Default overlay style for margin rasters (stored with the artifact).
+MARGIN_STYLE = {"cmap": "Reds", "alpha": 0.6}
 
-def knife_edge_loss(v: float) -> float:
-    if v < -0.7:
-        return 0.0
-    return 6.9 + 20 * math.log10(math.sqrt((v - 0.1) ** 2 + 1) + v - 0.1)
+# Grid side caps: uniform grids evaluate every cell; adaptive grids only refine near
+# margin 0, so they can go down to the requested resolution over much larger areas.
+MAX_GRID = 200
+MAX_ADAPTIVE_GRID = 2000
 
+# Per-link terrain models, part of the loss store key; bump when their output changes.
+INTERFERENCE_MODELS = {"grid": "multi-edge-3/rx1.5/2", "polar": "horizon-knife-edge/rx1.5/1"}
 
-def deygout_loss(heights: list[float], tx_height_m: float, rx_height_m: float, freq_mhz: float, distance_m: float) -> float:
-    if len(heights) < 3 or distance_m <= 0:
-        return 0.0
-    n = len(heights)
-    step = distance_m / (n - 1)
-    wavelength = 300.0 / freq_mhz
+# Grid-mode path model: knife edges summed over profiles of PATH_SAMPLES points to a
+# receiver RX_HEIGHT_M above ground.
+PATH_SAMPLES = 16
+PATH_EDGES = 3
+RX_HEIGHT_M = 1.5
 
-    positions = [i * step for i in range(n)]
-    baseline = [
-        tx_height_m + (rx_height_m - tx_height_m) * (pos / distance_m) for pos in positions
-    ]
 
-    v_values: list[float] = []
-    for i in range(1, n - 1):
-        d1 = positions[i]
-        d2 = distance_m - d1
-        h_clearance = heights[i] - baseline[i]
-        if d1 <= 0 or d2 <= 0:
-            continue
-        v = h_clearance * math.sqrt((2 / wavelength) * ((1 / d1) + (1 / d2)))
-        v_values.append(v)
-
-    if not v_values:
-        return 0.0
-    v_values.sort(reverse=True)
-    loss = 0.0
-    for v in v_values[:3]:
-        loss += knife_edge_loss(v)
-    return loss
-
-
-def _sample_profile(provider: ElevationProvider, lat1: float, lon1: float, lat2: float, lon2: float, samples: int = 16) -> list[int]:
-    lats = np.linspace(lat1, lat2, samples)
-    lons = np.linspace(lon1, lon2, samples)
-    return provider.get_elevation_profile(lats, lons)
-
-
-def _link_loss(provider: ElevationProvider, station: Station, lat: float, lon: float) -> tuple[float, float]:
-    shape = to_shape(station.location)
-    dist_km = geodesic((shape.y, shape.x), (lat, lon)).km
-    profile = _sample_profile(provider, shape.y, shape.x, lat, lon)
-    distance_m = dist_km * 1000.0
-    tx_ground = profile[0]
-    rx_ground = profile[-1]
-    profile[0] = tx_ground + station.antenna_height_m
-    profile[-1] = rx_ground + 1.5  # nominal receive height
-    diff_loss = deygout_loss(profile, profile[0], profile[-1], station.frequency_mhz, distance_m)
-    total_loss = fspl(max(dist_km, 0.001), station.frequency_mhz) + diff_loss
-    rx_dbm = erp_kw_to_dbm(station.erp_kw) - total_loss
-    e_field = rx_dbm + 20 * math.log10(station.frequency_mhz) + 77.2
-    return dist_km, e_field
+@dataclass
+class _Link:
+    """
+    One transmitter of a study: its site, field parameters and antenna pattern.
+
+    Radial terrain profiles are only loaded (``load``) the first time a loss has to be
+    computed from terrain, so links fully covered by ``loss_store`` never read terrain.
+    """
+
+    station: Station | Transmitter
+    lat: float
+    lon: float
+    pattern: AntennaPattern
+    load: Callable[[], RadialProfileSet]
+
+    @cached_property
+    def profiles(self) -> RadialProfileSet:
+        return self.load()
+
+
+def _link(station: Station, lat: float, lon: float, load: Callable[[], RadialProfileSet]) -> _Link:
+    return _Link(station, lat, lon, AntennaPattern.for_station(station), load)
+
+
+def _free_field(station: Station, dist_km: np.ndarray) -> np.ndarray:
+    rx_dbm = erp_kw_to_dbm(station.erp_kw) - fspl_array(np.maximum(dist_km, 0.001), station.frequency_mhz)
+    return rx_dbm + 20 * math.log10(station.frequency_mhz) + 77.2
+
+
+def _free_field_at(link: _Link, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Free-space field from the link's site through its pattern: an upper bound on the field with terrain."""
+    azimuth, dist_km = geodesy.inverse(link.lat, link.lon, lats, lons)
+    return _free_field(link.station, dist_km) + link.pattern.gain_db(azimuth, dist_km)
+
+
+def _excess_loss(
+    profiles: RadialProfileSet, station: Station, lats: np.ndarray, lons: np.ndarray, mode: str
+) -> np.ndarray:
+    """
+    Terrain loss over free space (dB) for each point; +inf where terrain is missing.
+
+    Grid mode takes the 3-edge loss over 16-sample profiles off the station's radials;
+    polar mode resamples the horizon knife-edge loss computed along the radials.
+    """
+    if mode == "polar":
+        diffraction = horizon_diffraction_loss(
+            profiles, station.frequency_mhz, station.antenna_height_m, rx_height_m=RX_HEIGHT_M
+        )
+        return polar_to_grid(profiles, diffraction, lats, lons)
+    heights, dist_km = profiles.paths_to(lats, lons, samples=PATH_SAMPLES, fill_value=np.nan)
+    diff_loss = multi_edge_loss(
+        heights, dist_km, station.frequency_mhz, station.antenna_height_m, RX_HEIGHT_M, edges=PATH_EDGES
+    )
+    return np.where(np.isnan(heights).any(axis=1), np.inf, diff_loss)
+
+
+def _excess_ceiling(
+    profiles: RadialProfileSet, station: Station, lats: np.ndarray, lons: np.ndarray, mode: str
+) -> np.ndarray:
+    """
+    Upper bound on ``_excess_loss`` from the radial terrain envelope, without building
+    per-point profiles (polar losses are computed once per radial and used as is).
+
+    Every interior sample lies at most ``high`` and the direct path at least ``low`` plus
+    the lower antenna, so each knife edge's v is bounded by that clearance over the
+    closest (or, when negative, the farthest) Fresnel geometry of the sample spacing.
+    Points whose terrain is entirely missing fall back to free space: 0 dB.
+    """
+    if mode == "polar":
+        return _excess_loss(profiles, station, lats, lons, mode)
+    low, high, dist_km = profiles.relief_to(lats, lons)
+    clearance = high - low - min(station.antenna_height_m, RX_HEIGHT_M)
+    interior = np.arange(1, PATH_SAMPLES - 1)
+    spread = (PATH_SAMPLES - 1) * (1.0 / interior + 1.0 / (PATH_SAMPLES - 1 - interior))
+    geometry = np.where(clearance >= 0, spread.max(), spread.min())
+    dist_m = dist_km * 1000.0
+    wavelength_m = 300.0 / station.frequency_mhz
+    with np.errstate(invalid="ignore"):
+        scale = np.divide(2.0 / wavelength_m * geometry, dist_m, out=np.zeros(dist_m.shape), where=dist_m > 0)
+        ceiling = PATH_EDGES * knife_edge_loss(clearance * np.sqrt(scale))
+    return np.where(np.isnan(clearance), 0.0, ceiling)
+
+
+def _effective_fields(wanted_terms, unwanted_terms) -> tuple[np.ndarray, np.ndarray]:
+    """Wanted and unwanted fields after diffraction, both FSPL-only where either link lacks terrain."""
+    wanted, wanted_excess = wanted_terms
+    unwanted, unwanted_excess = unwanted_terms
+    # Fallback to FSPL-only (both links) when SRTM tiles are missing along either path.
+    terrain_ok = np.isfinite(wanted_excess) & np.isfinite(unwanted_excess)
+    return wanted - np.where(terrain_ok, wanted_excess, 0.0), unwanted - np.where(terrain_ok, unwanted_excess, 0.0)
+
+
+def _study_grid(victim: Station, radius_km: float, resolution_m: int, max_grid: int) -> dict:
+    """Grid axes, spacing and bbox of the square study area centred on the victim."""
+    victim_shape = to_shape(victim.location)
+    center_lat = victim_shape.y
+    center_lon = victim_shape.x
+    span_km = radius_km * 2
+    grid_size = max(10, min(max_grid, int((span_km * 1000) / resolution_m)))
+
+    delta_lat = radius_km / 111.0
+    delta_lon = radius_km / (111.0 * max(math.cos(math.radians(center_lat)), 0.01))
+    return {
+        "center_lat": center_lat,
+        "center_lon": center_lon,
+        "lats": np.linspace(center_lat - delta_lat, center_lat + delta_lat, grid_size),
+        "lons": np.linspace(center_lon - delta_lon, center_lon + delta_lon, grid_size),
+        "cell_area_km2": (span_km / max(grid_size - 1, 1)) ** 2,
+        "bbox": {
+            "north": center_lat + delta_lat,
+            "south": center_lat - delta_lat,
+            "east": center_lon + delta_lon,
+            "west": center_lon - delta_lon,
+        },
+    }
+
+
+def _interferer_profiles(
+    provider: ElevationProvider, interferer: Station, grid: dict, radius_km: float, step_km: float
+) -> RadialProfileSet:
+    interferer_shape = to_shape(interferer.location)
+    separation_km = float(
+        geodesy.distance_km(grid["center_lat"], grid["center_lon"], interferer_shape.y, interferer_shape.x)
+    )
+    interferer_reach_km = separation_km + radius_km + step_km
+    return profile_cache.get(
+        provider,
+        interferer_shape.y,
+        interferer_shape.x,
+        interferer_reach_km,
+        step_km,
+        radials_for(interferer_reach_km, step_km),
+    )
+
+
+def _victim_link(
+    provider: ElevationProvider, victim: Station, grid: dict, radius_km: float, step_km: float
+) -> _Link:
+    return _link(
+        victim, grid["center_lat"], grid["center_lon"],
+        lambda: profile_cache.get(
+            provider, grid["center_lat"], grid["center_lon"], radius_km + step_km, step_km,
+            radials_for(radius_km, step_km),
+        ),
+    )
+
+
+def _interferer_link(
+    provider: ElevationProvider, interferer: Station, grid: dict, radius_km: float, step_km: float
+) -> _Link:
+    interferer_shape = to_shape(interferer.location)
+    return _link(
+        interferer, interferer_shape.y, interferer_shape.x,
+        lambda: _interferer_profiles(provider, interferer, grid, radius_km, step_km),
+    )
+
+
+def _evaluated(excess: np.ndarray) -> int:
+    return int(np.count_nonzero(~np.isnan(excess)))
+
+
+def _inside_radius(grid: dict, radius_km: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    return np.flatnonzero(geodesy.distance_km(grid["center_lat"], grid["center_lon"], lats, lons) <= radius_km)
+
+
+def _impacted_population(session: Session, bbox: dict, impacted: np.ndarray) -> int:
+    """Population of the ``impacted`` cells; every sector touching the bbox until the raster is built."""
+    raster = PopulationRaster.default()
+    if raster is None:
+        return _envelope_population(session, bbox)
+    return raster.sum_where(impacted, bbox)[0]
+
+
+def _envelope_population(session: Session, bbox: dict) -> int:
+    envelope = func.ST_MakeEnvelope(bbox["west"], bbox["south"], bbox["east"], bbox["north"], 4326)
+    population_sum = func.sum(cast(VectorFeature.properties["population"].astext, Integer))
+    result = session.execute(
+        select(population_sum).where(func.ST_Intersects(VectorFeature.geom, envelope))
+    ).scalar_one_or_none()
+    return int(result or 0)
+
+
+def _link_store(provider, mode: str, step_km: float) -> Optional[tuple]:
+    """``(store, model)`` for real terrain; test doubles have no version to key on."""
+    if not isinstance(provider, ElevationProvider):
+        return None
+    return loss_store, f"{INTERFERENCE_MODELS[mode]}/step={step_km}"
+
+
+def _link_key(provider: ElevationProvider, model: str, link: _Link, grid: dict, radius_km: float) -> str:
+    # ERP and pattern are applied per cell on top of the stored loss, so they stay out of the key.
+    return loss_key(
+        link.lat, link.lon, link.station.antenna_height_m, link.station.frequency_mhz,
+        grid["center_lat"], grid["center_lon"], radius_km, grid["lats"].size, model, provider.version,
+    )
+
+
+def _fill_excess(
+    known: np.ndarray,
+    link: _Link,
+    lats: np.ndarray,
+    lons: np.ndarray,
+    mode: str,
+    dtype=None,
+) -> np.ndarray:
+    """``known`` excess losses with the NaN (not yet evaluated) entries computed from terrain."""
+    excess = np.array(known, dtype=float)
+    todo = np.isnan(excess)
+    if todo.any():
+        fresh = _excess_loss(link.profiles, link.station, lats[todo], lons[todo], mode)
+        excess[todo] = fresh if dtype is None else quantize(fresh, dtype)
+    return excess
+
+
+class MarginBlock(NamedTuple):
+    """Margins for a set of points, plus the per-link excess losses they used (NaN = not evaluated)."""
+
+    margins: np.ndarray  # NaN outside the study radius; a lower bound at pruned points
+    pruned: np.ndarray  # Points whose bound cleared the PR, left without terrain evaluation
+    victim_excess: np.ndarray
+    interferer_excess: np.ndarray
+
+
+def _margin_points(
+    lat_points: np.ndarray,
+    lon_points: np.ndarray,
+    grid: dict,
+    radius_km: float,
+    victim: _Link,
+    interferer: _Link,
+    required_pr: float,
+    mode: str,
+    prune_above: Optional[float] = None,
+    victim_excess: Optional[np.ndarray] = None,
+    interferer_excess: Optional[np.ndarray] = None,
+    dtype=None,
+) -> MarginBlock:
+    """
+    Protection margin (dB) at arbitrary points; NaN outside the study radius.
+
+    ``victim_excess``/``interferer_excess`` hold already known excess losses for the
+    points (NaN where unknown); only the unknown ones are computed from terrain, rounded
+    through ``dtype`` when given so they match stored values.
+
+    With ``prune_above``, a lower bound on every margin is taken first: the wanted field
+    with its excess loss bounded by ``_excess_ceiling`` (or known), against the unwanted
+    field in free space (terrain can only weaken it). Points whose bound is at least
+    ``prune_above`` are flagged in ``pruned`` and keep the bound as their margin; no
+    terrain is evaluated there for either link. Of the rest, points whose wanted link
+    lacks terrain (both links fall back to free space) skip the interferer's terrain.
+    """
+    flat_lat, flat_lon = lat_points.ravel(), lon_points.ravel()
+    shape = lat_points.shape
+    unknown = np.full(flat_lat.size, np.nan)
+    victim_known = unknown if victim_excess is None else np.asarray(victim_excess, dtype=float).ravel()
+    interferer_known = unknown if interferer_excess is None else np.asarray(interferer_excess, dtype=float).ravel()
+    victim_out = victim_known.copy()
+    interferer_out = interferer_known.copy()
+
+    inside = _inside_radius(grid, radius_km, flat_lat, flat_lon)
+    margins = np.full(flat_lat.size, np.nan)
+    pruned = np.zeros(flat_lat.size, dtype=bool)
+    if inside.size:
+        lat_in, lon_in = flat_lat[inside], flat_lon[inside]
+        wanted = _free_field_at(victim, lat_in, lon_in)
+        unwanted = _free_field_at(interferer, lat_in, lon_in)
+
+        todo = np.ones(inside.size, dtype=bool)
+        if prune_above is not None:
+            ceiling = victim_known[inside].copy()
+            missing = np.isinf(ceiling)  # exact: both links in free space
+            ceiling[missing] = 0.0
+            todo_ceiling = np.isnan(ceiling)
+            if todo_ceiling.any():
+                ceiling[todo_ceiling] = _excess_ceiling(
+                    victim.profiles, victim.station, lat_in[todo_ceiling], lon_in[todo_ceiling], mode
+                )
+            bound = wanted - ceiling - unwanted - required_pr
+            cleared = bound >= prune_above
+            margins[inside[cleared]] = bound[cleared]
+            pruned[inside[cleared]] = True
+            todo = ~cleared
+
+        points = inside[todo]
+        lat_todo, lon_todo = lat_in[todo], lon_in[todo]
+        wanted_excess = _fill_excess(victim_known[points], victim, lat_todo, lon_todo, mode, dtype)
+        victim_out[points] = wanted_excess
+        unwanted_excess = interferer_known[points].copy()
+        # When pruning, points without wanted terrain (both links in free space) skip the interferer's.
+        needed = np.isfinite(wanted_excess) if prune_above is not None else np.ones(points.size, dtype=bool)
+        unwanted_excess[needed] = _fill_excess(
+            unwanted_excess[needed], interferer, lat_todo[needed], lon_todo[needed], mode, dtype
+        )
+        interferer_out[points] = unwanted_excess
+        wanted_field, unwanted_field = _effective_fields(
+            (wanted[todo], wanted_excess), (unwanted[todo], unwanted_excess)
+        )
+        margins[points] = (wanted_field - unwanted_field) - required_pr
+    return MarginBlock(
+        margins.reshape(shape), pruned.reshape(shape),
+        victim_out.reshape(shape), interferer_out.reshape(shape),
+    )
+
+
+def _margin_band(
+    row_start: int,
+    row_stop: int,
+    grid: dict,
+    radius_km: float,
+    victim: _Link,
+    interferer: _Link,
+    required_pr: float,
+    mode: str,
+    prune_above: Optional[float],
+    dtype,
+) -> MarginBlock:
+    # Pool task: rows [row_start, row_stop) of the margin grid; terrain (through the
+    # links' loaders) and stored excess losses come from shared memory.
+    lat_grid, lon_grid = np.meshgrid(grid["lats"][row_start:row_stop], grid["lons"], indexing="ij")
+    victim_excess, interferer_excess = (
+        None if stored is None else stored[row_start:row_stop]
+        for stored in (attached_array("victim_excess"), attached_array("interferer_excess"))
+    )
+    return _margin_points(
+        lat_grid, lon_grid, grid, radius_km, victim, interferer,
+        required_pr, mode, prune_above, victim_excess, interferer_excess, dtype,
+    )
 
 
 def calculate_interference_matrix(
@@ -93,84 +394,275 @@ def calculate_interference_matrix(
     resolution_m: int = 100,
     provider: Optional[ElevationProvider] = None,
     standard: Optional[RegulatoryStandard] = None,
+    render: bool = True,
+    mode: str = "grid",
+    adaptive: bool = False,
+    band_db: float = 3.0,
+    workers: Optional[int] = None,
+    prune: bool = False,
 ) -> dict:
-    """Vectorized margin map using FSPL + simplified Deygout."""
+    """
+    Margin map using FSPL + simplified Deygout.
+
+    The float32 margin raster (dB) is written as a GeoTIFF; ``render`` also produces the
+    PNG heatmap (tasks skip it and let the API render lazily).
+
+    ``mode="polar"`` replaces the per-cell Deygout profiles with FSPL + horizon knife edge
+    evaluated once along each radial of both transmitters, resampled onto the same grid.
+
+    With ``adaptive`` the grid is refined as a quadtree around margin 0 (within
+    ``band_db``) down to ``resolution_m``; elsewhere margins are interpolated from
+    coarser cells. ``evaluations`` in the result counts the cells actually computed.
+
+    ``workers`` > 1 (default ``INTERFERENCE_WORKERS``) evaluates uniform grids in row
+    bands on a process pool; the margins are identical to the serial run. Adaptive
+    grids always run serially.
+
+    ``prune`` bounds every cell's margin from below before any terrain is evaluated
+    (see ``_margin_points``) and skips both links' terrain wherever the bound already
+    clears the protection ratio. The raster holds the bound there (a margin of at least
+    that much) and ``pruned_cells`` counts those cells; the impacted area is unaffected.
+    Adaptive grids never prune.
+
+    On uniform grids with real terrain, each link's excess loss is read from and
+    written back to ``loss_store``; cells already stored skip terrain entirely.
+    ERP, antenna pattern, azimuth and tilt are not part of the stored loss, so a rerun
+    that only changes those is an array adjustment of the stored rasters (no terrain is
+    read). ``terrain_cells`` counts the per-link losses actually computed from terrain.
+    """
+    if mode not in ("grid", "polar"):
+        raise ValueError(f"Unknown interference mode: {mode}")
     provider = provider or ElevationProvider()
-    standard = standard or RegulatoryStandard()
+    standard = standard or RegulatoryStandard.from_session(session)
     freq_offset = _freq_offset(victim, interferer)
     required_pr = standard.get_required_pr(victim.service_type, freq_offset)
 
-    victim_shape = to_shape(victim.location)
-    interferer_shape = to_shape(interferer.location)
+    grid = _study_grid(victim, radius_km, resolution_m, MAX_ADAPTIVE_GRID if adaptive else MAX_GRID)
+    lats, lons, bbox = grid["lats"], grid["lons"], grid["bbox"]
 
-    center_lat = victim_shape.y
-    center_lon = victim_shape.x
-    span_km = radius_km * 2
-    grid_size = max(10, min(200, int((span_km * 1000) / resolution_m)))
+    # Radial terrain profiles from each transmitter, shared by every grid cell.
+    step_km = max(resolution_m, 100) / 1000.0
+    victim_link = _victim_link(provider, victim, grid, radius_km, step_km)
+    interferer_link = _interferer_link(provider, interferer, grid, radius_km, step_km)
+    # Adaptive grids interpolate between evaluated cells, so a pruned cell would leak
+    # its bound into its neighbours; they already skip cells clear of the band.
+    prune_above = 0.0 if prune and not adaptive else None
 
-    # Build grid
-    delta_lat = radius_km / 111.0
-    delta_lon = radius_km / (111.0 * max(math.cos(math.radians(center_lat)), 0.01))
-    lats = np.linspace(center_lat - delta_lat, center_lat + delta_lat, grid_size)
-    lons = np.linspace(center_lon - delta_lon, center_lon + delta_lon, grid_size)
-    margin_map = np.full((grid_size, grid_size), np.nan)
-
-    for i, lat in enumerate(lats):
-        for j, lon in enumerate(lons):
-            dist_victim = geodesic((center_lat, center_lon), (lat, lon)).km
-            if dist_victim > radius_km:
-                continue
-            try:
-                _, wanted_field = _link_loss(provider, victim, lat, lon)
-                _, unwanted_field = _link_loss(provider, interferer, lat, lon)
-            except FileNotFoundError:
-                # Fallback to FSPL-only when SRTM tile is missing
-                dist_int = geodesic((interferer_shape.y, interferer_shape.x), (lat, lon)).km
-                wanted_field = erp_kw_to_dbm(victim.erp_kw) - fspl(max(dist_victim, 0.001), victim.frequency_mhz)
-                wanted_field += 20 * math.log10(victim.frequency_mhz) + 77.2
-                unwanted_field = erp_kw_to_dbm(interferer.erp_kw) - fspl(max(dist_int, 0.001), interferer.frequency_mhz)
-                unwanted_field += 20 * math.log10(interferer.frequency_mhz) + 77.2
-
-            margin = (wanted_field - unwanted_field) - required_pr
-            margin_map[i, j] = margin
+    if adaptive:
+        terrain_cells = 0
+        pruned_cells = 0
+
+        def margin_at(lat_points: np.ndarray, lon_points: np.ndarray) -> np.ndarray:
+            nonlocal terrain_cells
+            block = _margin_points(
+                lat_points, lon_points, grid, radius_km, victim_link, interferer_link, required_pr, mode,
+            )
+            terrain_cells += _evaluated(block.victim_excess) + _evaluated(block.interferer_excess)
+            return block.margins
+
+        margin_map, evaluations = adaptive_grid(margin_at, lats, lons, threshold=0.0, band=band_db)
+    else:
+        shape = (lats.size, lons.size)
+        store = _link_store(provider, mode, step_km)
+        dtype = stored_victim = stored_interferer = None
+        if store is not None:
+            store, model = store
+            dtype = store.dtype
+            victim_key = _link_key(provider, model, victim_link, grid, radius_km)
+            interferer_key = _link_key(provider, model, interferer_link, grid, radius_km)
+            stored_victim = store.get(victim_key, shape)
+            stored_interferer = store.get(interferer_key, shape)
+
+        # The pool pays off on terrain work; stored links are array adjustments only.
+        workers = resolve_workers(workers)
+        if workers > 1 and (stored_victim is None or stored_interferer is None):
+            shared = {"victim": victim_link.profiles.heights, "interferer": interferer_link.profiles.heights}
+            for name, stored in (("victim_excess", stored_victim), ("interferer_excess", stored_interferer)):
+                if stored is not None:
+                    shared[name] = stored
+            band_links = [
+                _Link(
+                    Transmitter.from_station(link.station), link.lat, link.lon, link.pattern,
+                    partial(attached_profiles, profile_meta(link.profiles), name),
+                )
+                for name, link in (("victim", victim_link), ("interferer", interferer_link))
+            ]
+            bands = map_row_bands(
+                _margin_band,
+                lats.size,
+                workers,
+                shared,
+                grid, radius_km, *band_links,
+                required_pr, mode, prune_above, dtype,
+            )
+            block = MarginBlock(
+                margins=np.concatenate([band.margins for band in bands]),
+                pruned=np.concatenate([band.pruned for band in bands]),
+                victim_excess=np.concatenate([band.victim_excess for band in bands]),
+                interferer_excess=np.concatenate([band.interferer_excess for band in bands]),
+            )
+        else:
+            lat_grid, lon_grid = np.meshgrid(lats, lons, indexing="ij")
+            block = _margin_points(
+                lat_grid, lon_grid, grid, radius_km, victim_link, interferer_link, required_pr, mode, prune_above,
+                stored_victim, stored_interferer, dtype,
+            )
+        margin_map, pruned_cells = block.margins, np.count_nonzero(block.pruned)
+        evaluations = margin_map.size
+        terrain_cells = sum(
+            _evaluated(current) - (0 if stored is None else _evaluated(stored))
+            for stored, current in (
+                (stored_victim, block.victim_excess), (stored_interferer, block.interferer_excess)
+            )
+        )
+
+        if store is not None:
+            for key, stored, current in (
+                (victim_key, stored_victim, block.victim_excess),
+                (interferer_key, stored_interferer, block.interferer_excess),
+            ):
+                if stored is None or np.count_nonzero(np.isnan(current)) < np.count_nonzero(np.isnan(stored)):
+                    store.put(key, current)
 
     violations = margin_map < 0
-    masked = np.ma.array(margin_map, mask=np.isnan(margin_map))
-    plt.figure(figsize=(6, 6))
-    cmap = plt.cm.Reds
-    cmap.set_bad(alpha=0.0)
-    plt.imshow(
-        masked,
-        extent=(lons.min(), lons.max(), lats.min(), lats.max()),
-        origin="lower",
-        cmap=cmap,
-        alpha=0.6,
-    )
-    plt.axis("off")
-    heatmap_path = OUTPUT_DIR / f"interference_{victim.id}_{interferer.id}.png"
-    plt.savefig(heatmap_path, bbox_inches="tight", pad_inches=0, transparent=True)
-    plt.close()
-
-    cell_area_km2 = (resolution_m / 1000.0) ** 2
-    impacted_area_km2 = float(np.nansum(violations) * cell_area_km2)
-
-    bbox = {
-        "north": center_lat + delta_lat,
-        "south": center_lat - delta_lat,
-        "east": center_lon + delta_lon,
-        "west": center_lon - delta_lon,
-    }
-    envelope = func.ST_MakeEnvelope(bbox["west"], bbox["south"], bbox["east"], bbox["north"], 4326)
-    population_sum = func.sum(cast(VectorFeature.properties["population"].astext, Integer))
-    result = session.execute(
-        select(population_sum).where(func.ST_Intersects(VectorFeature.geom, envelope))
-    ).scalar_one_or_none()
-    impacted_population = int(result or 0)
+    impacted_area_km2 = float(np.nansum(violations) * grid["cell_area_km2"])
+    impacted_population = _impacted_population(session, bbox, violations)
 
-    return {
-        "heatmap_path": str(heatmap_path),
+    raster_path = write_raster(OUTPUT_DIR / f"interference_{victim.id}_{interferer.id}.tif", margin_map, bbox)
+    output = {
+        "raster_path": str(raster_path),
         "bbox": bbox,
+        "style": dict(MARGIN_STYLE),
         "impacted_area_km2": impacted_area_km2,
         "impacted_population": impacted_population,
         "required_pr": required_pr,
+        "evaluations": int(evaluations),
+        "pruned_cells": int(pruned_cells),
+        "terrain_cells": int(terrain_cells),
+    }
+    if render:
+        output["heatmap_path"] = str(render_png(raster_path, **MARGIN_STYLE))
+    return output
+
+
+def calculate_interference_batch(
+    victim: Station,
+    interferers: Iterable[Station],
+    radius_km: float,
+    session: Session,
+    resolution_m: int = 100,
+    provider: Optional[ElevationProvider] = None,
+    standard: Optional[RegulatoryStandard] = None,
+    render: bool = False,
+    mode: str = "grid",
+    write_rasters: bool = False,
+) -> dict:
+    """
+    Margins of one victim against many interferers on a shared grid.
+
+    The victim's wanted field is computed once and each interferer's unwanted field once
+    (or read from ``loss_store`` with real terrain). ``terrain_cells`` counts the per-link
+    losses computed from terrain; it is 0 when only ERP, pattern or rotation changed.
+    Returns per-interferer statistics (and rasters with ``write_rasters``) plus an
+    aggregate: the margin against the power sum of all nuisance fields (unwanted + PR),
+    written as a raster, and the area where any single interferer violates protection.
+    Interferers with no tabulated protection ratio are reported as skipped.
+    """
+    if mode not in ("grid", "polar"):
+        raise ValueError(f"Unknown interference mode: {mode}")
+    provider = provider or ElevationProvider()
+    standard = standard or RegulatoryStandard.from_session(session)
+
+    grid = _study_grid(victim, radius_km, resolution_m, MAX_GRID)
+    lats, lons, bbox = grid["lats"], grid["lons"], grid["bbox"]
+    cell_area_km2 = grid["cell_area_km2"]
+    lat_grid, lon_grid = np.meshgrid(lats, lons, indexing="ij")
+    flat_lat, flat_lon = lat_grid.ravel(), lon_grid.ravel()
+    inside = _inside_radius(grid, radius_km, flat_lat, flat_lon)
+    lat_in, lon_in = flat_lat[inside], flat_lon[inside]
+
+    step_km = max(resolution_m, 100) / 1000.0
+    store = _link_store(provider, mode, step_km)
+
+    terrain_cells = 0
+
+    def link_terms(link: _Link) -> tuple[np.ndarray, np.ndarray]:
+        # Free-space field and excess loss inside the radius, through the loss store.
+        nonlocal terrain_cells
+        known = np.full(inside.size, np.nan)
+        if store is None:
+            excess = _fill_excess(known, link, lat_in, lon_in, mode)
+        else:
+            link_store, model = store
+            key = _link_key(provider, model, link, grid, radius_km)
+            stored = link_store.get(key, lat_grid.shape)
+            if stored is not None:
+                known = stored.ravel()[inside]
+            excess = _fill_excess(known, link, lat_in, lon_in, mode, link_store.dtype)
+            if stored is None or np.isnan(known).any():
+                full = np.full(lat_grid.size, np.nan) if stored is None else stored.ravel()
+                full[inside] = excess
+                link_store.put(key, full.reshape(lat_grid.shape))
+        terrain_cells += int(np.count_nonzero(np.isnan(known)))
+        return _free_field_at(link, lat_in, lon_in), excess
+
+    wanted_terms = link_terms(_victim_link(provider, victim, grid, radius_km, step_km))
+
+    results = []
+    # Power sum of the nuisance fields (unwanted + PR) relative to the wanted field. Each
+    # term comes from that interferer's margin, so it shares its terrain fallback.
+    nuisance_ratio = np.zeros(inside.size)
+    worst_margin = np.full(inside.size, np.inf)
+    for interferer in interferers:
+        try:
+            required_pr = standard.get_required_pr(victim.service_type, _freq_offset(victim, interferer))
+        except ValueError as exc:
+            results.append({"interferer_id": interferer.id, "skipped": str(exc)})
+            continue
+        unwanted_terms = link_terms(_interferer_link(provider, interferer, grid, radius_km, step_km))
+        wanted, unwanted = _effective_fields(wanted_terms, unwanted_terms)
+        margin = (wanted - unwanted) - required_pr
+        nuisance_ratio += 10 ** (-margin / 10.0)
+        worst_margin = np.minimum(worst_margin, margin)
+
+        entry = {
+            "interferer_id": interferer.id,
+            "required_pr": required_pr,
+            "impacted_area_km2": float(np.count_nonzero(margin < 0) * cell_area_km2),
+            "min_margin_db": float(margin.min()) if margin.size else None,
+            "mean_margin_db": float(margin.mean()) if margin.size else None,
+        }
+        if write_rasters:
+            margin_map = np.full(flat_lat.size, np.nan)
+            margin_map[inside] = margin
+            path = write_raster(
+                OUTPUT_DIR / f"interference_{victim.id}_{interferer.id}.tif", margin_map.reshape(lat_grid.shape), bbox
+            )
+            entry["raster_path"] = str(path)
+        results.append(entry)
+
+    evaluated = [r for r in results if "skipped" not in r]
+    aggregate_map = np.full(flat_lat.size, np.nan)
+    if evaluated:
+        aggregate_map[inside] = -10 * np.log10(nuisance_ratio)
+    aggregate_map = aggregate_map.reshape(lat_grid.shape)
+    raster_path = write_raster(OUTPUT_DIR / f"interference_{victim.id}_aggregate.tif", aggregate_map, bbox)
+
+    worst = min(evaluated, key=lambda r: r["min_margin_db"] if r["min_margin_db"] is not None else math.inf, default=None)
+    aggregate = {
+        "raster_path": str(raster_path),
+        "impacted_area_km2": float(np.nansum(aggregate_map < 0) * cell_area_km2),
+        "any_single_impacted_area_km2": float(np.count_nonzero(worst_margin < 0) * cell_area_km2) if evaluated else 0.0,
+        "impacted_population": _impacted_population(session, bbox, aggregate_map < 0),
+        "worst_interferer_id": worst["interferer_id"] if worst else None,
+    }
+    output = {
+        "bbox": bbox,
+        "style": dict(MARGIN_STYLE),
+        "interferers": results,
+        "aggregate": aggregate,
+        "terrain_cells": terrain_cells,
     }
+    if render:
+        aggregate["heatmap_path"] = str(render_png(raster_path, **MARGIN_STYLE))
+    return output
@@ -2,44 +2,61 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.protection_ratios import DEFAULT_RATIOS, PRTable, ProtectionRatios
+
+# TV ratios are tabulated per channel; offsets here are MHz.
+TV_CHANNEL_MHZ = 6.0
+
 
 @dataclass(frozen=True)
 class RegulatoryStandard:
-    fm_pr: dict[int, float] = None
-    tv_pr: dict[int, float] = None
+    ratios: ProtectionRatios = DEFAULT_RATIOS
 
     def __post_init__(self):
-        object.__setattr__(
-            self,
-            "fm_pr",
-            {
-                0: 45.0,
-                200: 6.0,
-                400: -20.0,
-                600: -40.0,
-            },
-        )
-        object.__setattr__(
-            self,
-            "tv_pr",
-            {
-                0: 23.0,
-                -6: -28.0,
-                6: -27.0,
-            },
-        )
+        object.__setattr__(self, "_fm", self.ratios.table("FM"))
+        object.__setattr__(self, "_tv", self.ratios.table("TV").scaled(TV_CHANNEL_MHZ))
+
+    @classmethod
+    def from_session(cls, session: Session) -> "RegulatoryStandard":
+        """Standard over the ratios stored in the database (defaults where none are)."""
+        return cls(ProtectionRatios.from_session(session))
+
+    @property
+    def version(self) -> str:
+        """Stamp of the ratio tables, for caching derived results."""
+        return self.ratios.version
+
+    @property
+    def fm_pr(self) -> dict[int, float]:
+        return _as_dict(self._fm)
+
+    @property
+    def tv_pr(self) -> dict[int, float]:
+        return _as_dict(self._tv)
 
     def get_required_pr(self, service_type: str, freq_offset: float) -> float:
         """Return protection ratio (dB) for the given service and offset."""
+        pr = float(self.get_required_pr_array(service_type, freq_offset))
+        if np.isnan(pr):
+            if service_type.upper() == "FM":
+                raise ValueError(f"Unsupported FM offset: {freq_offset} kHz")
+            raise ValueError(f"Unsupported TV channel offset: {freq_offset} MHz")
+        return pr
+
+    def get_required_pr_array(self, service_type: str, freq_offsets) -> np.ndarray:
+        """Vectorized ``get_required_pr``: NaN where the offset has no tabulated ratio."""
         service = service_type.upper()
         if service == "FM":
-            offset = int(round(abs(freq_offset)))
-            if offset not in self.fm_pr:
-                raise ValueError(f"Unsupported FM offset: {freq_offset} kHz")
-            return self.fm_pr[offset]
-        if service == "TV":
-            offset = int(round(freq_offset))
-            if offset not in self.tv_pr:
-                raise ValueError(f"Unsupported TV channel offset: {freq_offset} MHz")
-            return self.tv_pr[offset]
-        raise ValueError(f"Unknown service type {service_type}")
+            table = self._fm
+        elif service == "TV":
+            table = self._tv
+        else:
+            raise ValueError(f"Unknown service type {service_type}")
+        return table.exact(np.round(np.asarray(freq_offsets, dtype=float)))
+
+
+def _as_dict(table: PRTable) -> dict[int, float]:
+    return {int(offset): float(pr) for offset, pr in zip(table.offsets, table.ratios)}
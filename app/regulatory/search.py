@@ -2,16 +2,18 @@ from __future__ import annotations
 
 import math
 from dataclasses import dataclass
-from typing import List
+from typing import List, NamedTuple, Optional, Sequence
 
 from geoalchemy2.shape import to_shape
-from pyproj import Geod
-from sqlalchemy import and_, func, select
+from sqlalchemy import Float, Integer, String, and_, cast, column, func, or_, select, true, values
 from sqlalchemy.orm import Session
 
+from app.core import geodesy
+from app.core.station_index import StationIndex, stations_for
 from app.models import Station
 
-geod = Geod(ellps="WGS84")
+# Proposals per bulk query (8 bind parameters each, well under the driver limit).
+BULK_CHUNK = 2000
 
 
 @dataclass
@@ -21,23 +23,66 @@ class NeighborCandidate:
     azimuth_deg: float
 
 
+class BulkNeighbor(NamedTuple):
+    """One (proposal, neighbor) pair from ``find_relevant_neighbors_bulk``."""
+
+    proposal_index: int
+    station_id: int
+    name: str
+    service_type: str
+    frequency_mhz: float
+    channel_number: Optional[int]
+    erp_kw: float
+    antenna_height_m: float
+    latitude: float
+    longitude: float
+    distance_km: float
+    azimuth_deg: float
+
+
 def _radius_for_service(service_type: str) -> float:
     return 300.0 if service_type.upper() == "FM" else 400.0
 
 
-def _frequency_window(station: Station) -> tuple[float, float]:
-    if station.service_type.upper() == "FM":
-        return station.frequency_mhz - 0.6, station.frequency_mhz + 0.6
+def _frequency_margin(service_type: str) -> float:
     # TV channels are 6 MHz wide; include +/- 1 channel
-    return station.frequency_mhz - 6.0, station.frequency_mhz + 6.0
+    return 0.6 if service_type.upper() == "FM" else 6.0
 
 
-def find_relevant_neighbors(proposal: Station, session: Session) -> List[NeighborCandidate]:
-    """Return neighbors within regulatory distance and adjacency mask."""
+def _frequency_window(station: Station) -> tuple[float, float]:
+    margin = _frequency_margin(station.service_type)
+    return station.frequency_mhz - margin, station.frequency_mhz + margin
+
+
+def find_relevant_neighbors(
+    proposal: Station, session: Session, index: Optional[StationIndex] = None
+) -> List[NeighborCandidate]:
+    """
+    Return neighbors within regulatory distance and adjacency mask.
+
+    With ``index`` the search runs in memory (nearest first) instead of in PostGIS.
+    """
     radius_km = _radius_for_service(proposal.service_type)
     freq_min, freq_max = _frequency_window(proposal)
     proposal_shape = to_shape(proposal.location)
 
+    if index is not None:
+        hits = index.refresh(session).query(
+            proposal_shape.y,
+            proposal_shape.x,
+            proposal.service_type,
+            radius_km,
+            freq_min,
+            freq_max,
+            exclude_id=proposal.id,
+        )
+        stations = stations_for(session, hits.station_ids)
+        return [
+            NeighborCandidate(station=stations[station_id], distance_km=float(dist), azimuth_deg=float(azimuth))
+            for station_id, dist, azimuth in zip(hits.station_ids.tolist(), hits.distance_km, hits.azimuth_deg)
+            if station_id in stations
+        ]
+
     stmt = (
         select(Station)
         .where(
@@ -55,15 +100,88 @@ def find_relevant_neighbors(proposal: Station, session: Session) -> List[Neighbo
             )
         )
     )
-    neighbors = []
-    for station in session.execute(stmt).scalars().all():
-        shape = to_shape(station.location)
-        az12, _, dist_m = geod.inv(proposal_shape.x, proposal_shape.y, shape.x, shape.y)
-        neighbors.append(
-            NeighborCandidate(
-                station=station,
-                distance_km=dist_m / 1000.0,
-                azimuth_deg=(az12 + 360.0) % 360.0,
+    stations = session.execute(stmt).scalars().all()
+    shapes = [to_shape(station.location) for station in stations]
+    azimuths, distances = geodesy.inverse(
+        proposal_shape.y, proposal_shape.x, [shape.y for shape in shapes], [shape.x for shape in shapes]
+    )
+    return [
+        NeighborCandidate(station=station, distance_km=float(dist), azimuth_deg=float(azimuth))
+        for station, dist, azimuth in zip(stations, distances, azimuths)
+    ]
+
+
+def find_relevant_neighbors_bulk(proposals: Sequence[Station], session: Session) -> List[BulkNeighbor]:
+    """
+    ``find_relevant_neighbors`` for many proposals in one query per ``BULK_CHUNK``.
+
+    Proposals only need ``latitude``, ``longitude``, ``frequency_mhz``,
+    ``service_type`` and (optionally) ``id``, so unsaved candidate sites work too.
+    They are sent as a VALUES list and joined LATERAL to the stations with the
+    same radius and spectral window; distances and azimuths come from PostGIS
+    geography. Rows are plain tuples ordered by proposal, then distance.
+    """
+    neighbors: List[BulkNeighbor] = []
+    for start in range(0, len(proposals), BULK_CHUNK):
+        rows = []
+        for offset, proposal in enumerate(proposals[start:start + BULK_CHUNK]):
+            freq_min, freq_max = _frequency_window(proposal)
+            rows.append(
+                (
+                    start + offset,
+                    getattr(proposal, "id", None),
+                    proposal.service_type,
+                    float(proposal.longitude),
+                    float(proposal.latitude),
+                    _radius_for_service(proposal.service_type) * 1000.0,
+                    freq_min,
+                    freq_max,
+                )
             )
-        )
+        neighbors.extend(BulkNeighbor(*row) for row in session.execute(_bulk_statement(rows)))
     return neighbors
+
+
+def _bulk_statement(rows: list):
+    proposals = values(
+        column("idx", Integer),
+        column("station_id", Integer),
+        column("service", String),
+        column("lon", Float),
+        column("lat", Float),
+        column("radius_m", Float),
+        column("freq_min", Float),
+        column("freq_max", Float),
+        name="proposals",
+    ).data(rows)
+    origin = func.Geography(func.ST_SetSRID(func.ST_MakePoint(proposals.c.lon, proposals.c.lat), 4326))
+    target = func.Geography(Station.location)
+    nearby = (
+        select(
+            Station.id,
+            Station.name,
+            Station.station_type,
+            Station.frequency_mhz,
+            Station.channel_number,
+            Station.erp_kw,
+            Station.antenna_height,
+            Station.latitude,
+            Station.longitude,
+            (func.ST_Distance(origin, target) / 1000.0).label("distance_km"),
+            # ST_Azimuth is NULL for coincident points, reported as north.
+            func.coalesce(func.degrees(func.ST_Azimuth(origin, target)), 0.0).label("azimuth_deg"),
+        )
+        .where(
+            Station.station_type == proposals.c.service,
+            Station.frequency_mhz.between(proposals.c.freq_min, proposals.c.freq_max),
+            func.ST_DWithin(target, origin, proposals.c.radius_m),
+            # An all-NULL VALUES column would be typed text.
+            or_(proposals.c.station_id.is_(None), Station.id != cast(proposals.c.station_id, Integer)),
+        )
+        .lateral("nearby")
+    )
+    return (
+        select(proposals.c.idx, *nearby.c)
+        .select_from(proposals.join(nearby, true()))
+        .order_by(proposals.c.idx, nearby.c.distance_km)
+    )
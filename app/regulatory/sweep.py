@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from scipy.spatial import cKDTree
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core import geodesy
+from app.core.parallel import attached_array, map_row_bands, resolve_workers
+from app.core.station_index import SPHERE_SLACK, chord_length, unit_vectors
+from app.models import Station, StationConflict
+from app.regulatory.contours import screen_pairs
+from app.regulatory.regulatory import RegulatoryStandard
+from app.regulatory.search import _frequency_margin, _radius_for_service
+
+# All-pairs contour viability sweep.
+#
+# Every station of a service is paired with every other one inside the discovery
+# radius and spectral window. Candidate pairs come from a frequency x space grid
+# join: stations are binned by frequency (bin width = the spectral window, so partners
+# sit in the same or the next bin) and each bin's KD-tree of unit vectors is joined
+# with itself and its upper neighbour. Surviving pairs are measured on WGS84 and
+# screened in both directions (each station once as victim) in fixed chunks, in a
+# process pool for large sweeps when more than one worker is configured. Overlapping
+# pairs are written to ``station_conflicts``, replacing the service's previous sweep.
+
+CHUNK_PAIRS = 200_000
+# Screening costs well under a microsecond per pair; below this a process pool's
+# start-up outweighs the work.
+PARALLEL_MIN_PAIRS = 5_000_000
+INSERT_BATCH = 10_000
+# Float slack on the spectral window (98.7 - 98.1 is not exactly 0.6).
+WINDOW_EPS_MHZ = 1e-6
+
+@dataclass(frozen=True)
+class ServiceStations:
+    """Stations of one service as parallel arrays."""
+
+    ids: np.ndarray
+    latitude: np.ndarray
+    longitude: np.ndarray
+    frequency_mhz: np.ndarray
+    erp_kw: np.ndarray
+    antenna_height_m: np.ndarray
+
+    @classmethod
+    def load(cls, session: Session, service_type: str) -> "ServiceStations":
+        rows = session.execute(
+            select(
+                Station.id,
+                func.ST_Y(Station.location),
+                func.ST_X(Station.location),
+                Station.frequency_mhz,
+                Station.erp_kw,
+                Station.antenna_height,
+            )
+            .where(Station.station_type == service_type, Station.location.isnot(None))
+            .order_by(Station.id)
+        ).all()
+        columns = list(zip(*rows)) if rows else [()] * 6
+        return cls(
+            ids=np.asarray(columns[0], dtype=np.int64),
+            latitude=np.asarray(columns[1], dtype=float),
+            longitude=np.asarray(columns[2], dtype=float),
+            frequency_mhz=np.asarray(columns[3], dtype=float),
+            erp_kw=np.asarray(columns[4], dtype=float),
+            antenna_height_m=np.asarray(columns[5], dtype=float),
+        )
+
+
+def candidate_pairs(
+    latitude: np.ndarray, longitude: np.ndarray, frequency_mhz: np.ndarray, radius_km: float, window_mhz: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Unordered index pairs within ``radius_km`` (WGS84) and ``window_mhz``, with their distances."""
+    vectors = unit_vectors(latitude, longitude)
+    chord = chord_length(radius_km * SPHERE_SLACK)
+    bins = np.floor(frequency_mhz / window_mhz).astype(np.int64)
+    members: Dict[int, np.ndarray] = {int(b): np.flatnonzero(bins == b) for b in np.unique(bins)}
+    trees = {b: cKDTree(vectors[idx]) for b, idx in members.items()}
+
+    first, second = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)]
+    for b, idx in members.items():
+        pairs = trees[b].query_pairs(chord, output_type="ndarray")
+        first.append(idx[pairs[:, 0]])
+        second.append(idx[pairs[:, 1]])
+        if b + 1 in trees:
+            hits = trees[b].sparse_distance_matrix(trees[b + 1], chord, output_type="ndarray")
+            first.append(idx[hits["i"]])
+            second.append(members[b + 1][hits["j"]])
+    first, second = np.concatenate(first), np.concatenate(second)
+
+    in_window = np.abs(frequency_mhz[first] - frequency_mhz[second]) <= window_mhz + WINDOW_EPS_MHZ
+    first, second = first[in_window], second[in_window]
+    if first.size == 0:
+        return first, second, np.empty(0)
+    distance_km = geodesy.distance_km(latitude[first], longitude[first], latitude[second], longitude[second])
+    within = distance_km <= radius_km
+    return first[within], second[within], distance_km[within]
+
+
+def _conflicts(
+    stations: Dict[str, np.ndarray],
+    victim: np.ndarray,
+    interferer: np.ndarray,
+    distance_km: np.ndarray,
+    service_type: str,
+    standard: RegulatoryStandard,
+) -> Dict[str, np.ndarray]:
+    offsets, pr, overlap = screen_pairs(
+        service_type,
+        stations["frequency_mhz"],
+        stations["erp_kw"],
+        stations["antenna_height_m"],
+        victim,
+        interferer,
+        distance_km,
+        standard,
+    )
+    hit = np.flatnonzero(overlap > 0)
+    return {
+        "station_a_id": stations["ids"][victim[hit]],
+        "station_b_id": stations["ids"][interferer[hit]],
+        "distance_km": distance_km[hit],
+        "freq_offset": offsets[hit],
+        "protection_ratio_db": pr[hit],
+        "overlap_km": overlap[hit],
+    }
+
+
+_STATION_FIELDS = ("ids", "frequency_mhz", "erp_kw", "antenna_height_m")
+
+
+def _sweep_chunk(start: int, stop: int, service_type: str, standard: RegulatoryStandard) -> Dict[str, np.ndarray]:
+    # Pool task: station and pair arrays are shared, only the chunk bounds travel.
+    stations = {name: attached_array(name) for name in _STATION_FIELDS}
+    return _conflicts(
+        stations,
+        attached_array("victim")[start:stop],
+        attached_array("interferer")[start:stop],
+        attached_array("distance_km")[start:stop],
+        service_type,
+        standard,
+    )
+
+
+def sweep_service(
+    session: Session,
+    service_type: str,
+    standard: Optional[RegulatoryStandard] = None,
+    workers: Optional[int] = None,
+) -> dict:
+    """
+    Screen every station pair of ``service_type`` and store the conflicts.
+
+    Replaces the service's rows in ``station_conflicts`` (the caller commits) and
+    returns counts of stations, screened directed pairs and conflicts.
+    """
+    standard = standard or RegulatoryStandard.from_session(session)
+    loaded = ServiceStations.load(session, service_type)
+    first, second, distance_km = candidate_pairs(
+        loaded.latitude,
+        loaded.longitude,
+        loaded.frequency_mhz,
+        _radius_for_service(service_type),
+        _frequency_margin(service_type),
+    )
+    # Each pair is screened both ways: A protected against B and B against A.
+    victim = np.concatenate([first, second])
+    interferer = np.concatenate([second, first])
+    distance_km = np.concatenate([distance_km, distance_km])
+    stations = {name: getattr(loaded, name) for name in _STATION_FIELDS}
+
+    workers = resolve_workers(workers)
+    if workers > 1 and victim.size >= PARALLEL_MIN_PAIRS:
+        shared = dict(stations, victim=victim, interferer=interferer, distance_km=distance_km)
+        chunks = map_row_bands(
+            _sweep_chunk, victim.size, workers, shared, service_type, standard, band_rows=CHUNK_PAIRS
+        )
+    else:
+        chunks = [
+            _conflicts(
+                stations,
+                victim[start:start + CHUNK_PAIRS],
+                interferer[start:start + CHUNK_PAIRS],
+                distance_km[start:start + CHUNK_PAIRS],
+                service_type,
+                standard,
+            )
+            for start in range(0, victim.size, CHUNK_PAIRS)
+        ]
+
+    session.execute(delete(StationConflict).where(StationConflict.service_type == service_type))
+    conflicts = 0
+    for chunk in chunks:
+        n = chunk["station_a_id"].size
+        for start in range(0, n, INSERT_BATCH):
+            columns = {name: values[start:start + INSERT_BATCH].tolist() for name, values in chunk.items()}
+            rows = [dict(zip(columns, values), service_type=service_type) for values in zip(*columns.values())]
+            session.execute(insert(StationConflict), rows)
+        conflicts += n
+    return {"stations": int(loaded.ids.size), "pairs": int(victim.size), "conflicts": conflicts}
@@ -1,9 +1,12 @@
 from app.config import get_session
-from app.models import RegulatoryClass
+from app.core.protection_ratios import DEFAULT_ROWS
+from app.models import ProtectionRatio, RegulatoryClass
 from sqlalchemy import select
 
+PR_REFERENCES = {"FM": "Res. 67 / Act 112", "TV": "Act 932"}
+
 def seed_regulatory_data():
-    """Seeds the database with FM regulatory classes."""
+    """Seeds the database with FM regulatory classes and protection ratios."""
     
     # Data from Table 2 of requirements
     fm_classes = [
@@ -45,5 +48,20 @@ def seed_regulatory_data():
                 # Update if needed (optional, here we just skip)
                 print(f"Class {data['class_name']} already exists.")
         
+        print("Seeding Protection Ratios...")
+        for service_type, offset, pr in DEFAULT_ROWS:
+            stmt = select(ProtectionRatio).where(
+                ProtectionRatio.service_type == service_type,
+                ProtectionRatio.offset == offset
+            )
+            if session.execute(stmt).scalar_one_or_none() is None:
+                session.add(ProtectionRatio(
+                    service_type=service_type,
+                    offset=offset,
+                    protection_ratio_db=pr,
+                    reference=PR_REFERENCES.get(service_type)
+                ))
+                print(f"Added PR {service_type} {offset:g}: {pr:g} dB")
+        
         session.commit()
         print("Seeding complete.")
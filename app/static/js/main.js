@@ -65,8 +65,8 @@ checkStatusBtn?.addEventListener("click", async () => {
   const res = await fetch(`${apiBase}/simulation/${simId}/status`);
   const json = await res.json();
   logJSON(simulationStatus, json);
-  if (json.result_path) {
-    coveragePlot.innerHTML = `<img src="/${json.result_path.replace(/^app\\//,'').replace(/^\\.\\//,'')}" alt="coverage">`;
+  if (json.overlay_url) {
+    coveragePlot.innerHTML = `<img src="${json.overlay_url}" alt="coverage">`;
   }
 });
 
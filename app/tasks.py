@@ -4,8 +4,10 @@ from celery import Celery
 from celery.utils.log import get_task_logger
 
 from app.config import AppConfig, get_session
-from app.core.propagation import calculate_coverage
-from app.models import Simulation
+from app.core.propagation import OUTPUT_DIR, calculate_coverage
+from app.core.result_cache import coverage_cache, coverage_key_for
+from app.core.terrain import ElevationProvider
+from app.models import ProjectArtifact, Simulation, Station
 
 config = AppConfig()
 celery_app = Celery(
@@ -17,6 +19,48 @@ celery_app.conf.update(task_track_started=True, timezone="UTC")
 
 logger = get_task_logger(__name__)
 
+SIMULATION_DIR = OUTPUT_DIR / "simulations"
+
+
+def cached_coverage(station: Station, radius_km: float, session) -> dict:
+    """Coverage result for ``station``, reusing a cached raster when the inputs match."""
+    provider = ElevationProvider()
+    key = coverage_key_for(station, radius_km, provider=provider)
+    cached = coverage_cache.get(key)
+    if cached is not None:
+        return cached
+    result = calculate_coverage(
+        station_id=station.id,
+        radius_km=radius_km,
+        session=session,
+        elevation_provider=provider,
+        render=False,
+    )
+    return coverage_cache.put(key, result["raster_path"], result["bbox"], result.get("style"))
+
+
+def record_simulation_result(simulation: Simulation, result: dict, session) -> None:
+    """Point ``simulation`` at a finished raster (fresh or cached) and mark it successful."""
+    # A simulation owns its raster: cached results are linked out of the cache first.
+    result = coverage_cache.checkout(result, SIMULATION_DIR / f"{simulation.id}.tif")
+    # Persist only the numeric raster; PNG overlays are rendered lazily by the API.
+    simulation.status = "SUCCESS"
+    simulation.result_path = result["raster_path"]
+    session.add(
+        ProjectArtifact(
+            simulation_id=simulation.id,
+            artifact_type="raster",
+            file_path=result["raster_path"],
+            bounds=result["bbox"],
+            style_metadata=result.get("style"),
+        )
+    )
+    simulation.bbox_north = result["bbox"]["north"]
+    simulation.bbox_south = result["bbox"]["south"]
+    simulation.bbox_east = result["bbox"]["east"]
+    simulation.bbox_west = result["bbox"]["west"]
+    session.flush()
+
 
 @celery_app.task(bind=True, name="run_coverage_simulation")
 def run_coverage_simulation(self, simulation_id: str, radius_km: float) -> dict:
@@ -69,37 +113,26 @@ def run_coverage_simulation(self, simulation_id: str, radius_km: float) -> dict:
                 
                 # To make this robust without changing the model too much:
                 # I'll search for the nearest neighbor and use it as the victim for the demo.
+                from app.core.station_index import station_index
                 from app.regulatory.search import find_relevant_neighbors
-                neighbors = find_relevant_neighbors(simulation.station, session)
+                neighbors = find_relevant_neighbors(simulation.station, session, index=station_index)
                 if neighbors:
                     victim = neighbors[0].station
                     result = calculate_interference_matrix(
                         victim=victim,
                         interferer=simulation.station,
                         radius_km=radius_km,
-                        session=session
+                        session=session,
+                        render=False,
+                        prune=True,
                     )
                 else:
                     # Fallback to coverage if no neighbors found
-                    result = calculate_coverage(
-                        station_id=simulation.station_id,
-                        radius_km=radius_km,
-                        session=session,
-                    )
+                    result = cached_coverage(simulation.station, radius_km, session)
             else:
-                result = calculate_coverage(
-                    station_id=simulation.station_id,
-                    radius_km=radius_km,
-                    session=session,
-                )
+                result = cached_coverage(simulation.station, radius_km, session)
 
-            simulation.status = "SUCCESS"
-            simulation.result_path = result.get("heatmap_path") or result.get("image_path")
-            simulation.bbox_north = result["bbox"]["north"]
-            simulation.bbox_south = result["bbox"]["south"]
-            simulation.bbox_east = result["bbox"]["east"]
-            simulation.bbox_west = result["bbox"]["west"]
-            session.flush()
+            record_simulation_result(simulation, result, session)
         except Exception as exc:  # noqa: BLE001 - propagate details to task state
             simulation.status = "FAILURE"
             session.flush()
@@ -107,11 +140,13 @@ def run_coverage_simulation(self, simulation_id: str, radius_km: float) -> dict:
             raise
 
         return {
-            "image_path": simulation.result_path,
+            "raster_path": simulation.result_path,
             "bbox": {
                 "north": simulation.bbox_north,
                 "south": simulation.bbox_south,
                 "east": simulation.bbox_east,
                 "west": simulation.bbox_west,
             },
+            # Evaluation statistics (cells computed / pruned / from terrain), when the study reports them.
+            "stats": {key: result[key] for key in ("evaluations", "pruned_cells", "terrain_cells") if key in result},
         }
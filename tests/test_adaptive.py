@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import numpy as np
+
+from app.core.adaptive import adaptive_grid
+
+
+def _field(lats, lons):
+    # Smooth field falling away from an off-centre peak, NaN outside a unit disc.
+    value = 80.0 - 40.0 * np.hypot(lats - 0.4, lons - 0.55) + 3.0 * np.sin(20.0 * lats)
+    return np.where(np.hypot(lats - 0.5, lons - 0.5) <= 0.5, value, np.nan)
+
+
+def test_adaptive_grid_matches_full_evaluation_near_threshold():
+    lats = np.linspace(0.0, 1.0, 201)
+    lons = np.linspace(0.0, 1.0, 197)
+    full = _field(*np.meshgrid(lats, lons, indexing="ij"))
+
+    grid, evaluations = adaptive_grid(_field, lats, lons, threshold=70.0, band=2.0)
+
+    assert evaluations < full.size / 2
+    assert np.array_equal(np.isnan(grid), np.isnan(full))
+    assert np.array_equal(grid < 70.0, full < 70.0)
+    # Exact near the threshold; interpolated (approximate) away from it.
+    near = np.abs(full - 70.0) < 2.0
+    np.testing.assert_array_equal(grid[near], full[near])
+    np.testing.assert_allclose(grid, full, atol=1.0, equal_nan=True)
+
+
+def test_adaptive_grid_evaluates_each_cell_at_most_once():
+    calls = []
+
+    def evaluate(lats, lons):
+        calls.extend(zip(lats.tolist(), lons.tolist()))
+        return _field(lats, lons)
+
+    lats = np.linspace(0.0, 1.0, 33)
+    lons = np.linspace(0.0, 1.0, 33)
+    _, evaluations = adaptive_grid(evaluate, lats, lons, threshold=70.0)
+
+    assert evaluations == len(calls) == len(set(calls))
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.core.antenna import AntennaPattern
+
+
+def _station(**overrides):
+    fields = dict(antenna_pattern={}, antenna_model=None, azimuth=0.0, mechanical_tilt=0.0, antenna_height=30.0)
+    fields.update(overrides)
+    return SimpleNamespace(**fields)
+
+
+def test_omni_station_has_no_gain_terms():
+    pattern = AntennaPattern.for_station(_station(antenna_pattern={"azimuth": "omni"}))
+
+    assert pattern.is_omni
+    np.testing.assert_array_equal(pattern.gain_db([0.0, 90.0], [1.0, 5.0]), [0.0, 0.0])
+
+
+def test_horizontal_pattern_follows_azimuth_and_normalises():
+    # Relative field: main lobe at 0 degrees, half field (-6 dB) at the back.
+    table = {"0": 1.0, "90": 0.5, "180": 0.5, "270": 0.5}
+    station = _station(antenna_pattern={"horizontal": table, "unit": "field"}, azimuth=90.0)
+    pattern = AntennaPattern.for_station(station)
+
+    gains = pattern.gain_db([90.0, 270.0, 135.0], [1.0, 1.0, 1.0])
+
+    assert gains[0] == 0.0
+    np.testing.assert_allclose(gains[1], 20 * np.log10(0.5))
+    assert gains[1] < gains[2] < gains[0]
+
+
+def test_model_pattern_in_attenuation_db():
+    model = SimpleNamespace(horizontal_pattern=[0, 3, 10, 3], vertical_pattern=None)
+    pattern = AntennaPattern.for_station(_station(antenna_model=model))
+
+    np.testing.assert_allclose(pattern.gain_db([0.0, 90.0, 180.0], [1.0, 1.0, 1.0]), [0.0, -3.0, -10.0])
+
+
+def test_vertical_list_pattern_wraps_above_boresight():
+    # 10 degree steps from 0; entries from 180 on wrap to -180..-10 (above the boresight).
+    vertical = [0, 3, 10] + [20] * 32 + [6]
+
+    def gain_at_horizon(tilt_deg):
+        # Antenna at ground level: the horizon is at depression 0, read at -tilt.
+        station = _station(antenna_pattern={"vertical": vertical}, antenna_height=0.0, mechanical_tilt=tilt_deg)
+        return AntennaPattern.for_station(station).gain_db([0.0], [5.0])[0]
+
+    np.testing.assert_allclose(gain_at_horizon(10.0), -6.0)  # Downtilt: horizon 10 degrees above boresight
+    np.testing.assert_allclose(gain_at_horizon(-10.0), -3.0)  # Uptilt: horizon 10 degrees below
+    np.testing.assert_allclose(gain_at_horizon(5.0), -3.0)
+
+
+def test_unit_comes_from_the_record_not_the_values():
+    # A near-omni vertical pattern whose attenuations all fall within 0..1 dB.
+    vertical = {"0": 0.0, "45": 0.5, "90": 1.0, "270": 1.0}
+    model = SimpleNamespace(horizontal_pattern=None, vertical_pattern=vertical, pattern_unit="db")
+    station = _station(antenna_model=model, antenna_height=1000.0)  # 45 degrees below at 1 km
+
+    np.testing.assert_allclose(AntennaPattern.for_station(station).gain_db([0.0], [1.0]), [-0.5])
+    model.pattern_unit = "field"
+    np.testing.assert_allclose(AntennaPattern.for_station(station).gain_db([0.0], [1.0]), [20 * np.log10(0.5)])
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pytest
+
+from app.core.diffraction import deygout_loss, knife_edge_loss, multi_edge_loss, single_edge_loss
+
+
+def _ridge_profiles():
+    # Two 10 km paths of 11 samples: one clear, one with a 200 m ridge at mid-path.
+    heights = np.zeros((2, 11))
+    heights[1, 5] = 200.0
+    return heights
+
+
+def test_knife_edge_loss_matches_itu_approximation():
+    v = np.array([-1.0, 0.0, 2.0])
+    expected = [0.0] + [6.9 + 20 * math.log10(math.sqrt((x - 0.1) ** 2 + 1) + x - 0.1) for x in v[1:]]
+    np.testing.assert_allclose(knife_edge_loss(v), expected)
+
+
+def test_single_ridge_loss_per_path():
+    loss = single_edge_loss(_ridge_profiles(), 10.0, 100.0, tx_height_m=100.0, rx_height_m=100.0)
+
+    # v = h * sqrt(2/lambda * (1/d1 + 1/d2)) with h = 100 m, d1 = d2 = 5 km, lambda = 3 m.
+    v = 100.0 * math.sqrt((2 / 3.0) * (2 / 5000.0))
+    assert loss[0] == 0.0
+    assert loss[1] == pytest.approx(float(knife_edge_loss(v)))
+
+
+def test_deygout_levels_and_three_edge_sum():
+    rng = np.random.default_rng(7)
+    heights = rng.uniform(0.0, 200.0, size=(50, 16))
+    distance_km = rng.uniform(2.0, 40.0, size=50)
+
+    single = single_edge_loss(heights, distance_km, 98.1, 30.0, 1.5)
+    np.testing.assert_allclose(deygout_loss(heights, distance_km, 98.1, 30.0, 1.5, levels=1), single)
+    assert np.all(deygout_loss(heights, distance_km, 98.1, 30.0, 1.5, levels=3) >= single)
+    assert np.all(multi_edge_loss(heights, distance_km, 98.1, 30.0, 1.5) >= single)
+
+
+def test_missing_samples_are_not_obstacles():
+    heights = _ridge_profiles()
+    heights[1, 5] = np.nan
+
+    np.testing.assert_array_equal(deygout_loss(heights, 10.0, 100.0, 100.0, 100.0), [0.0, 0.0])
+
+
+def test_earth_bulge_raises_mid_path_terrain():
+    flat = np.zeros((1, 21))
+    # 100 km at 4/3 earth: the ~147 m mid-path bulge reaches into the first Fresnel zone.
+    assert deygout_loss(flat, 100.0, 100.0, 150.0, 150.0)[0] == 0.0
+    assert deygout_loss(flat, 100.0, 100.0, 150.0, 150.0, k_factor=4.0 / 3.0)[0] > 0.0
@@ -0,0 +1,60 @@
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from app.core.engine.channels import FM_CHANNELS_MHZ, find_available_channels, tv_channel_center_mhz
+from app.core.engine.contour import ContourAnalysis, NeighborArrays
+from app.core.engine.discovery import NeighborCandidate
+from app.core.protection_ratios import DEFAULT_RATIOS
+from app.models import Station
+
+
+def _neighbor(station_id, freq, erp, height, distance_km):
+    station = Station(
+        id=station_id, station_type="FM", frequency_mhz=freq, erp_kw=erp, antenna_height=height,
+        latitude=0.0, longitude=0.0,
+    )
+    return NeighborCandidate(station, distance_km, 0.0)
+
+
+def test_channel_margins_match_two_way_contour_screen():
+    neighbors = [
+        _neighbor(1, 98.1, 5.0, 100.0, 120.0),
+        _neighbor(2, 98.3, 1.0, 60.0, 40.0),
+        _neighbor(3, 101.5, 0.5, 30.0, 25.0),
+    ]
+    with patch("app.core.engine.discovery.NeighborDiscovery.find_near", return_value=neighbors):
+        options = find_available_channels(MagicMock(), -23.5, -46.6, 1.0, 60.0, "FM", ratios=DEFAULT_RATIOS)
+
+    assert len(options) == FM_CHANNELS_MHZ.size == 101
+    assert [o.margin_km for o in options] == sorted((o.margin_km for o in options), reverse=True)
+    # Ri at 1% time comes from curves derived from the 50% figure.
+    assert not any(o.tabulated for o in options)
+
+    analysis = ContourAnalysis()
+    by_freq = {o.frequency_mhz: o for o in options}
+    for freq in (98.1, 98.5, 101.7, 90.1):
+        proposal = Station(station_type="FM", frequency_mhz=freq, erp_kw=1.0, antenna_height=60.0)
+        inbound = analysis.screen(proposal, NeighborArrays.from_candidates(neighbors))
+        margins = []
+        for i, candidate in enumerate(neighbors):
+            if np.isnan(inbound.protection_ratio_db[i]):
+                continue
+            back = NeighborCandidate(proposal, candidate.distance_km, 0.0)
+            outbound = analysis.screen(candidate.station, NeighborArrays.from_candidates([back]))
+            margins += [-inbound.overlap_km[i], -outbound.overlap_km[0]]
+        expected = min(margins) if margins else np.inf
+        assert np.isclose(by_freq[freq].margin_km, expected)
+    assert by_freq[90.1].margin_km == np.inf and by_freq[90.1].limiting_station_id is None
+
+
+def test_tv_channel_centres():
+    np.testing.assert_allclose(tv_channel_center_mhz([7, 13, 14, 51]), [177.0, 213.0, 473.0, 695.0])
+
+
+def test_tv_channels_report_the_approximated_contours():
+    with patch("app.core.engine.discovery.NeighborDiscovery.find_near", return_value=[]):
+        options = find_available_channels(MagicMock(), -23.5, -46.6, 1.0, 60.0, "TV", ratios=DEFAULT_RATIOS)
+
+    # No P.1546 figure above 100 MHz is tabulated yet.
+    assert options and not any(o.tabulated for o in options)
@@ -1,12 +1,17 @@
+import numpy as np
 from unittest.mock import MagicMock
+from app.core import geodesy
 from app.core.engine.diffraction import DeygoutMatrix
+from app.core.profiles import RadialProfileSet
+from app.core.propagation import fspl_array
 from app.models import Station
 
 def test_deygout_matrix_structure():
     provider = MagicMock()
     # Mock elevation profile: Flat terrain
-    # get_elevation_profile takes lists, returns list of ints
-    provider.get_elevation_profile.return_value = [100, 100, 100, 100, 100]
+    # sample takes arrays, returns an int16 array of the same shape
+    provider.sample.side_effect = lambda lats, lons, fill_value=None: np.full(np.shape(lats), 100, dtype=np.int16)
+    provider.mosaic.return_value = provider
     
     matrix = DeygoutMatrix(provider)
     
@@ -27,3 +32,47 @@ def test_deygout_matrix_structure():
     
     assert "impacted_area_km2" in result
     assert result["impacted_area_km2"] >= 0.0
+
+
+def test_deygout_matrix_parallel_matches_serial():
+    provider = MagicMock()
+    provider.sample.side_effect = lambda lats, lons, fill_value=None: (
+        100 + 80 * np.sin(np.asarray(lats) * 300.0) * np.cos(np.asarray(lons) * 200.0)
+    ).astype(np.int16)
+    provider.mosaic.return_value = provider
+
+    matrix = DeygoutMatrix(provider)
+    proposal = Station(
+        id=1, station_type="FM", frequency_mhz=100.0,
+        erp_kw=1.0, antenna_height=50.0,
+        latitude=0.0, longitude=0.0
+    )
+    interferer = Station(
+        id=2, station_type="FM", frequency_mhz=100.2,
+        erp_kw=5.0, antenna_height=80.0,
+        latitude=0.05, longitude=0.1
+    )
+
+    serial = matrix.calculate_matrix(proposal, interferer, grid_res_km=2.0, workers=1)
+    parallel = matrix.calculate_matrix(proposal, interferer, grid_res_km=2.0, workers=2)
+
+    assert serial["impacted_area_km2"] > 0.0
+    assert parallel == serial
+
+
+def test_deygout_signals_without_provider_keep_free_space_beyond_profiles():
+    terrain = MagicMock(spec=["sample"])
+    terrain.sample.side_effect = lambda lats, lons, fill_value=None: np.full(np.shape(lats), 400.0)
+    profiles = RadialProfileSet.extract(terrain, 0.0, 0.0, 5.0, 0.1)
+    station = Station(
+        id=1, station_type="FM", frequency_mhz=100.0,
+        erp_kw=1.0, antenna_height=30.0,
+        latitude=0.0, longitude=0.0
+    )
+
+    matrix = DeygoutMatrix(elevation_provider=None)
+    near, far = matrix._calculate_signals(station, np.array([0.0, 0.0]), np.array([0.03, 0.09]), profiles)
+
+    near_km, far_km = geodesy.distance_km(0.0, 0.0, 0.0, np.array([0.03, 0.09]))
+    assert near < 106.9 - fspl_array(np.array([near_km]), 100.0)[0]
+    assert np.isclose(far, 106.9 - fspl_array(np.array([far_km]), 100.0)[0])
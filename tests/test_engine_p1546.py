@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from app.core.engine.p1546 import P1546Curves, approximate_distance, contour_distances, free_space_field, p1546_curves
+from app.core.engine.p1546_tables import FIGURES
+
+
+def test_tabulated_values_and_free_space_cap():
+    # Figure 1 (100 MHz, land, 50%), h1 = 150 m.
+    field = p1546_curves.field_strength(1.0, 150.0, 100.0, [1.0, 10.0, 100.0], 50)
+    np.testing.assert_allclose(field, [100.3181, 73.6382, 23.2014])
+
+    # Derived 1% curve: stronger, but never above free space.
+    strong = p1546_curves.field_strength(1.0, 150.0, 100.0, [1.0, 100.0], 1)
+    np.testing.assert_allclose(strong, [free_space_field(1.0), 23.2014 + 12.0])
+
+
+def test_inverse_round_trips_vectorized_queries():
+    rng = np.random.default_rng(0)
+    n = 2000
+    erp_kw = rng.uniform(0.1, 50.0, n)
+    height_m = rng.uniform(10.0, 600.0, n)
+    freq_mhz = rng.uniform(88.0, 108.0, n)
+    distance_km = rng.uniform(1.5, 500.0, n)
+    time_pct = rng.choice([1, 10, 50], n)
+
+    field = p1546_curves.field_strength(erp_kw, height_m, freq_mhz, distance_km, time_pct)
+    solved = p1546_curves.distance_for(erp_kw, height_m, freq_mhz, field, time_pct)
+
+    np.testing.assert_allclose(solved, distance_km, rtol=1e-9)
+
+
+def test_inverse_is_monotone_in_target_and_time():
+    targets = np.linspace(140.0, -80.0, 50)
+    distances = p1546_curves.distance_for(1.0, 75.0, 98.0, targets, 50)
+
+    assert np.all(np.diff(distances) >= 0)
+    assert distances[0] == 0.1  # stronger than anything within 1 km
+    assert distances[-1] == p1546_curves.distances_km[-1]  # never reached
+    assert p1546_curves.distance_for(1.0, 75.0, 98.0, 30.0, 1) > p1546_curves.distance_for(1.0, 75.0, 98.0, 30.0, 50)
+
+
+def test_uncovered_frequencies_keep_the_approximation():
+    # Only the 100 MHz figure is tabulated: UHF television is not covered.
+    assert p1546_curves.covers(98.0) and not p1546_curves.covers(177.0) and not p1546_curves.covers(599.0)
+    with pytest.raises(ValueError, match="599 MHz"):
+        p1546_curves.distance_for(1.0, 150.0, 599.0, 60.0, 50)
+
+    distances, tabulated = contour_distances(1.0, 150.0, [98.0, 599.0], 60.0, 50)
+
+    np.testing.assert_array_equal(tabulated, [True, False])
+    assert distances[0] == p1546_curves.distance_for(1.0, 150.0, 98.0, 60.0, 50)
+    # Previous approximation: 100 - 35 log(d) = 60 dB(uV/m).
+    np.testing.assert_allclose(distances[1], 10 ** (40.0 / 35.0))
+    np.testing.assert_allclose(approximate_distance(1.0, 150.0, 60.0, 1), 10 ** (52.0 / 35.0))
+
+
+def test_derived_time_curves_are_not_reported_as_tabulated():
+    # Only the 50% figure exists: 1% distances are solved, but from a derived curve.
+    distances, tabulated = contour_distances(1.0, 150.0, 98.0, 60.0, [50, 10, 1])
+
+    np.testing.assert_allclose(distances, p1546_curves.distance_for(1.0, 150.0, 98.0, 60.0, [50, 10, 1]))
+    np.testing.assert_array_equal(tabulated, [True, False, False])
+
+    # A real 1% figure makes 1% (and interpolated times) tabulated.
+    figure = FIGURES[(100, 50)]
+    curves = P1546Curves({(100, 50): figure, (100, 1): [[row[0], *(e + 10.0 for e in row[1:])] for row in figure]})
+    np.testing.assert_array_equal(curves.tabulated(98.0, [50, 10, 1]), [True, True, True])
+    np.testing.assert_array_equal(curves.tabulated(599.0, [50, 1]), [False, False])
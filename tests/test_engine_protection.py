@@ -1,4 +1,9 @@
+import numpy as np
+
+from app.core.engine.contour import ContourAnalysis, NeighborArrays
 from app.core.engine.protection import RegulatoryStandard
+from app.core.protection_ratios import DEFAULT_RATIOS, ProtectionRatios
+from app.models import Station
 
 def test_fm_protection_ratios():
     # Co-channel
@@ -28,3 +33,32 @@ def test_tv_protection_ratios():
     
     # Unregulated
     assert RegulatoryStandard.get_required_pr("TV", 2) == -999.0
+
+def test_pr_array_matches_scalar_lookup():
+    fm_offsets = [0, 50, 100, -200, 300, 400, 600, 700, 701, 800]
+    fm = RegulatoryStandard.get_required_pr_array("FM", fm_offsets)
+    assert list(np.where(np.isnan(fm), -999.0, fm)) == [
+        RegulatoryStandard.get_required_pr("FM", offset) for offset in fm_offsets
+    ]
+
+    tv_offsets = [0, 1, -1, 2, 0.5]
+    tv = RegulatoryStandard.get_required_pr_array("TV", tv_offsets)
+    assert list(np.where(np.isnan(tv), -999.0, tv)) == [
+        RegulatoryStandard.get_required_pr("TV", offset) for offset in tv_offsets
+    ]
+
+
+def test_engine_uses_the_ratios_it_is_given():
+    tv_rows = [row for row in DEFAULT_RATIOS.rows if row[0] == "TV"]
+    ratios = ProtectionRatios([("FM", 0.0, 37.0), ("FM", 200.0, 7.0), *tv_rows])
+    proposal = Station(station_type="FM", frequency_mhz=100.0, erp_kw=1.0, antenna_height=150.0)
+    neighbors = NeighborArrays(
+        frequency_mhz=np.array([100.0, 100.4]), erp_kw=np.ones(2), antenna_height=np.full(2, 150.0),
+        distance_km=np.full(2, 100.0), channel_number=np.full(2, np.nan),
+    )
+
+    screen = ContourAnalysis(ratios).screen(proposal, neighbors)
+
+    np.testing.assert_array_equal(screen.protection_ratio_db, [37.0, np.nan])
+    assert RegulatoryStandard.get_required_pr("FM", 400, ratios) == -999.0
+    assert RegulatoryStandard.get_required_pr("FM", 400) == -20.0
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import numpy as np
+from pyproj import Geod
+
+from app.core import geodesy
+
+
+def test_inverse_matches_pyproj_and_keeps_shape():
+    lats = np.array([[-23.0, -22.5], [-24.0, -23.5]])
+    lons = np.array([[-46.0, -47.0], [-46.6, -45.0]])
+
+    azimuth, distance_km = geodesy.inverse(-23.5, -46.6, lats, lons)
+
+    az, _, dist_m = Geod(ellps="WGS84").inv(np.full(4, -46.6), np.full(4, -23.5), lons.ravel(), lats.ravel())
+    assert azimuth.shape == distance_km.shape == (2, 2)
+    np.testing.assert_allclose(distance_km.ravel(), dist_m / 1000.0)
+    np.testing.assert_allclose(azimuth.ravel(), np.asarray(az) % 360.0)
+    assert np.all((azimuth >= 0) & (azimuth < 360))
+
+
+def test_destination_round_trips_in_both_modes():
+    azimuths = np.array([0.0, 45.0, 135.0, 270.0])
+    for spherical in (False, True):
+        lats, lons = geodesy.destination(-23.5, -46.6, azimuths, 150.0, spherical=spherical)
+        azimuth, distance_km = geodesy.inverse(-23.5, -46.6, lats, lons, spherical=spherical)
+        np.testing.assert_allclose(distance_km, 150.0)
+        np.testing.assert_allclose(azimuth, azimuths, atol=1e-9)
+
+    spherical_km = geodesy.distance_km(-23.5, -46.6, -10.0, -35.0, spherical=True)
+    assert abs(spherical_km / geodesy.distance_km(-23.5, -46.6, -10.0, -35.0) - 1.0) < 0.005
+
+
+def test_bbox_reaches_radius_on_each_side():
+    box = geodesy.bbox(-23.5, -46.6, 20.0)
+
+    distances = geodesy.distance_km(
+        -23.5, -46.6, [box["north"], box["south"], -23.5, -23.5], [-46.6, -46.6, box["east"], box["west"]]
+    )
+    np.testing.assert_allclose(distances, 20.0, rtol=1e-3)
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import os
+
+import numpy as np
+
+from app.core.loss_store import LossStore, loss_key
+
+
+def _key(**overrides):
+    fields = dict(
+        site_lat=-22.0,
+        site_lon=-43.0,
+        antenna_height_m=30.0,
+        frequency_mhz=98.1,
+        grid_lat=-22.0,
+        grid_lon=-43.0,
+        radius_km=20.0,
+        grid_size=200,
+        model="multi-edge-3/rx1.5/1",
+        terrain_version="t1",
+    )
+    fields.update(overrides)
+    return loss_key(**fields)
+
+
+def test_key_shares_band_but_not_geometry():
+    key = _key()
+
+    assert _key(frequency_mhz=98.3) == key
+    assert _key(frequency_mhz=107.9) != key
+    assert _key(antenna_height_m=45.0) != key
+    assert _key(grid_lat=-22.1) != key
+    assert _key(grid_size=100) != key
+    assert _key(terrain_version="t2") != key
+
+
+def test_round_trip_keeps_markers_and_matches_quantize(tmp_path):
+    store = LossStore(tmp_path / "losses", max_bytes=1_000_000)
+    values = np.array([[0.0, 12.3456], [np.nan, np.inf]])
+
+    store.put("a", values)
+    loaded = store.get("a", shape=(2, 2))
+
+    np.testing.assert_array_equal(loaded, store.quantize(values))
+    assert store.get("a", shape=(3, 3)) is None
+    assert store.get("missing") is None
+
+
+def test_evicts_least_recently_used(tmp_path):
+    store = LossStore(tmp_path / "losses", max_bytes=3_000)
+    raster = np.zeros((30, 30))  # 1800 bytes of float16 plus header
+
+    store.put("old", raster)
+    os.utime(store.root / "old.npy", ns=(1, 1))
+    store.put("new", raster)
+
+    assert store.get("old") is None
+    assert store.get("new") is not None
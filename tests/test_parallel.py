@@ -0,0 +1,38 @@
+import multiprocessing
+import os
+import time
+
+import billiard
+import numpy as np
+import pytest
+
+from app.core.parallel import attached_array, map_row_bands
+
+
+def _band_sums(row_start, row_stop, scale):
+    time.sleep(0.2)  # long enough for the bands to spread over the workers
+    return os.getpid(), attached_array("grid")[row_start:row_stop].sum(axis=1) * scale
+
+
+def _run_in_daemon(queue):
+    grid = np.arange(40.0).reshape(10, 4)
+    bands = map_row_bands(_band_sums, 10, 2, {"grid": grid}, 2.0, band_rows=3)
+    pids = {pid for pid, _ in bands}
+    queue.put((len(pids - {os.getpid()}), np.concatenate([sums for _, sums in bands]).tolist()))
+
+
+@pytest.mark.parametrize("library", [multiprocessing, billiard])
+def test_map_row_bands_uses_a_pool_from_a_daemonic_process(library):
+    # Celery prefork workers are billiard daemons.
+    method = "fork" if "fork" in library.get_all_start_methods() else "spawn"
+    context = library.get_context(method)
+    queue = context.Queue()
+    process = context.Process(target=_run_in_daemon, args=(queue,), daemon=True)
+    process.start()
+    workers, result = queue.get(timeout=60)
+    process.join(timeout=60)
+
+    assert process.exitcode == 0
+    assert workers > 1
+    assert result == (np.arange(40.0).reshape(10, 4).sum(axis=1) * 2.0).tolist()
+    assert attached_array("grid") is None
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from app.core.polar import horizon_diffraction_loss, polar_path_loss, polar_to_grid
+from app.core.profiles import RadialProfileSet
+from app.core.propagation import fspl_array
+
+
+def _profiles(heights, step_km=0.1):
+    heights = np.asarray(heights, dtype=np.float32)
+    n_radials, n_samples = heights.shape
+    return RadialProfileSet(
+        lat=-22.0,
+        lon=-43.0,
+        radius_km=(n_samples - 1) * step_km,
+        step_km=step_km,
+        azimuths_deg=np.arange(n_radials) * (360.0 / n_radials),
+        distances_km=np.arange(n_samples) * step_km,
+        heights=heights,
+    )
+
+
+def test_flat_radials_have_no_diffraction():
+    profiles = _profiles(np.zeros((4, 51)))
+
+    assert np.all(horizon_diffraction_loss(profiles, 98.1, tx_height_m=30.0) == 0.0)
+
+
+def test_ridge_shadows_only_samples_behind_it():
+    heights = np.zeros((4, 51))
+    heights[0, 20] = 200.0  # ridge 2 km north of the site
+    profiles = _profiles(heights)
+
+    excess = horizon_diffraction_loss(profiles, 98.1, tx_height_m=30.0)
+
+    assert np.all(excess[0, :21] == 0.0)
+    assert np.all(excess[0, 21:] > 6.0)
+    assert np.all(excess[1:] == 0.0)
+
+
+def test_missing_terrain_falls_back_to_free_space():
+    heights = np.zeros((2, 21))
+    heights[0, 5:] = np.nan
+    heights[1, 0] = np.nan
+    profiles = _profiles(heights)
+
+    excess = horizon_diffraction_loss(profiles, 98.1, tx_height_m=30.0)
+
+    assert np.all(np.isfinite(excess))
+    assert np.all(excess == 0.0)
+
+
+def test_polar_to_grid_interpolates_distance_and_masks_outside():
+    # Values equal to distance on every radial, so resampling should recover distance.
+    profiles = _profiles(np.zeros((360, 51)))
+    values = np.broadcast_to(profiles.distances_km, profiles.heights.shape)
+
+    lats = np.array([[-22.0 + 0.0225, -22.0, -22.0 + 0.1]])
+    lons = np.array([[-43.0, -43.0 + 0.0242, -43.0]])
+    grid = polar_to_grid(profiles, values, lats, lons)
+
+    assert grid.shape == (1, 3)
+    assert grid[0, 0] == pytest.approx(2.49, abs=0.02)
+    assert grid[0, 1] == pytest.approx(2.50, abs=0.02)
+    assert np.isnan(grid[0, 2])
+
+
+def test_path_loss_uses_exact_free_space_near_site():
+    profiles = _profiles(np.zeros((360, 51)))
+    lats = np.array([-22.0 + 0.0009, -22.0 + 0.0225])
+    lons = np.array([-43.0, -43.0])
+
+    loss = polar_path_loss(profiles, 98.1, 30.0, lats, lons)
+
+    np.testing.assert_allclose(loss, fspl_array(np.array([0.0996, 2.49]), 98.1), atol=0.05)
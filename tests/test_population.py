@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import numpy as np
+from shapely.geometry import box
+
+from app.core.population import PopulationRaster, rasterize_population
+
+
+def test_area_weighted_raster_preserves_sector_totals(tmp_path):
+    bbox = {"west": -43.0, "south": -22.0, "east": -42.98, "north": -21.98}
+    sectors = [
+        # Western half of the box, and a sector far smaller than one cell.
+        (box(-43.0, -22.0, -42.99, -21.98), 1000.0, 300.0),
+        (box(-42.9851, -21.9851, -42.985, -21.985), 10.0, 0.0),
+    ]
+    path = rasterize_population(
+        sectors, (bbox["west"], bbox["south"], bbox["east"], bbox["north"]), tmp_path / "pop.tif"
+    )
+    raster = PopulationRaster(path)
+
+    everything = np.ones((21, 21), dtype=bool)
+    assert raster.sum_where(everything, bbox) == (1010, 300)
+
+    west_half = np.zeros((21, 21), dtype=bool)
+    west_half[:, :10] = True
+    population, households = raster.sum_where(west_half, bbox)
+    assert abs(population - 1000) <= 60
+    assert abs(households - 300) <= 20
+
+    assert raster.sum_where(np.zeros((21, 21), dtype=bool), bbox) == (0, 0)
+    outside = {"west": -40.0, "south": -20.0, "east": -39.9, "north": -19.9}
+    assert raster.sum_where(everything, outside) == (0, 0)
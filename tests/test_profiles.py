@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from app.core import geodesy
+from app.core.profiles import RadialProfileCache, RadialProfileSet
+from app.core.terrain import ElevationProvider
+
+
+def _write_ramp_tile(tmp_path):
+    # 121x121 tile rising 10 m per sample toward the east.
+    ramp = np.tile(np.arange(121) * 10, (121, 1)).astype(">i2")
+    ramp.tofile(tmp_path / "S23W044.hgt")
+    return ElevationProvider(srtm_root=tmp_path)
+
+
+def test_extract_returns_radial_grid(tmp_path):
+    provider = _write_ramp_tile(tmp_path)
+
+    profiles = RadialProfileSet.extract(provider, -22.5, -43.5, radius_km=10.0, step_km=1.0, n_radials=4)
+
+    assert profiles.heights.shape == (4, 11)
+    assert profiles.azimuths_deg.tolist() == [0.0, 90.0, 180.0, 270.0]
+    assert profiles.distances_km[-1] == pytest.approx(10.0)
+    # East radial climbs, west radial descends, north radial stays level.
+    assert np.all(np.diff(profiles.heights[1]) > 0)
+    assert np.all(np.diff(profiles.heights[3]) < 0)
+    np.testing.assert_allclose(profiles.heights[0], profiles.heights[0, 0], atol=1.0)
+
+
+def test_paths_to_matches_direct_sampling(tmp_path):
+    provider = _write_ramp_tile(tmp_path)
+    profiles = RadialProfileSet.extract(provider, -22.5, -43.5, radius_km=10.0, step_km=0.1, n_radials=360)
+
+    heights, dist_km = profiles.paths_to([-22.5], [-43.45], samples=5)
+
+    assert heights.shape == (1, 5)
+    assert dist_km[0] == pytest.approx(5.14, abs=0.05)
+    direct = provider.mosaic(-22.6, -43.6, -22.4, -43.4).sample(np.full(5, -22.5), np.linspace(-43.5, -43.45, 5))
+    np.testing.assert_allclose(heights[0], direct, atol=2.0)
+    with pytest.raises(ValueError):
+        profiles.paths_to([-22.5], [-43.0])
+
+
+def test_paths_between_radials_interpolate_by_azimuth():
+    # Four radials, each at its own constant height: 0 (N), 90 (E), 180 (S), 270 (W).
+    distances_km = np.arange(11, dtype=float)
+    profiles = RadialProfileSet(
+        lat=0.0, lon=0.0, radius_km=10.0, step_km=1.0,
+        azimuths_deg=np.array([0.0, 90.0, 180.0, 270.0]),
+        distances_km=distances_km,
+        heights=np.repeat(np.array([[0.0], [90.0], [180.0], [270.0]], dtype=np.float32), 11, axis=1),
+    )
+    lats, lons = geodesy.destination(0.0, 0.0, np.array([30.0, 90.0, 315.0]), np.array([8.0, 8.0, 8.0]))
+
+    heights, _ = profiles.paths_to(lats, lons, samples=5)
+
+    # A third of the way from N to E, exactly on E, halfway from W back to N.
+    np.testing.assert_allclose(heights, [[30.0] * 5, [90.0] * 5, [135.0] * 5], atol=0.05)
+    low, high, _ = profiles.relief_to(lats, lons)
+    np.testing.assert_allclose(low, [0.0, 90.0, 0.0])
+    np.testing.assert_allclose(high, [90.0, 180.0, 270.0])
+
+
+def test_cache_reuses_profiles_per_site(tmp_path):
+    provider = _write_ramp_tile(tmp_path)
+    # 8 radials x 6 float32 samples: room for one entry.
+    cache = RadialProfileCache(max_bytes=8 * 6 * 4)
+
+    first = cache.get(provider, -22.5, -43.5, 5.0, 1.0, 8)
+    assert cache.get(provider, -22.5, -43.5, 4.95, 1.0, 8) is first
+    cache.get(provider, -22.4, -43.5, 5.0, 1.0, 8)
+    assert cache.nbytes == first.heights.nbytes
+    assert cache.get(provider, -22.5, -43.5, 5.0, 1.0, 8) is not first
+
+
+def test_cache_misses_when_terrain_changes(tmp_path):
+    provider = _write_ramp_tile(tmp_path)
+    cache = RadialProfileCache(max_bytes=1 << 20)
+    first = cache.get(provider, -22.5, -43.5, 5.0, 1.0, 8)
+    assert cache.get(ElevationProvider(srtm_root=tmp_path), -22.5, -43.5, 5.0, 1.0, 8) is first
+
+    np.zeros((121, 121), dtype=">i2").tofile(tmp_path / "S23W045.hgt")
+
+    assert cache.get(ElevationProvider(srtm_root=tmp_path), -22.5, -43.5, 5.0, 1.0, 8) is not first
@@ -2,10 +2,12 @@ from __future__ import annotations
 
 from pathlib import Path
 
+import numpy as np
 from geoalchemy2.shape import from_shape
 from shapely.geometry import Point
 
-from app.core.propagation import calculate_coverage
+from app.core.rasters import read_raster
+from app.core.propagation import calculate_coverage, fspl, fspl_array
 from app.models import Project, Station, User
 
 
@@ -13,6 +15,12 @@ class MockElevationProvider:
     def get_elevation_profile(self, lat_list, lon_list):
         return [0 for _ in lat_list]
 
+    def sample(self, lats, lons, fill_value=None):
+        return np.zeros(np.shape(lats), dtype=np.int16)
+
+    def mosaic(self, south, west, north, east, spacing_m=None):
+        return self
+
 
 def test_calculate_coverage_creates_png(tmp_path, monkeypatch, db_session):
     # Redirect output directory for test isolation.
@@ -49,3 +57,49 @@ def test_calculate_coverage_creates_png(tmp_path, monkeypatch, db_session):
     image_path = Path(result["image_path"])
     assert image_path.exists()
     assert set(result["bbox"].keys()) == {"north", "south", "east", "west"}
+
+
+def test_polar_mode_matches_grid_on_flat_terrain(tmp_path, monkeypatch, db_session):
+    monkeypatch.setattr(
+        "app.core.propagation.OUTPUT_DIR", tmp_path, raising=False
+    )
+
+    owner = User(email="polar@example.com", password_hash="hash")
+    project = Project(name="Polar", owner=owner)
+    station = Station(
+        name="Station P",
+        project=project,
+        station_type="FM",
+        status="Proposed",
+        latitude=-22.0,
+        longitude=-43.0,
+        frequency_mhz=100.0,
+        erp_kw=1.0,
+        antenna_height=30.0,
+        antenna_pattern={"azimuth": "omni"},
+        location=from_shape(Point(-43.0, -22.0), srid=4326),
+    )
+    db_session.add_all([owner, project, station])
+    db_session.flush()
+
+    fields = {}
+    for mode in ("grid", "polar"):
+        result = calculate_coverage(
+            station_id=station.id,
+            radius_km=5.0,
+            grid_size=30,
+            session=db_session,
+            elevation_provider=MockElevationProvider(),
+            render=False,
+            mode=mode,
+        )
+        fields[mode], _ = read_raster(result["raster_path"])
+
+    # No terrain relief: both modes reduce to free space on the same cells.
+    np.testing.assert_allclose(fields["polar"], fields["grid"], atol=0.01, equal_nan=True)
+
+
+def test_fspl_array_matches_scalar():
+    distances = np.array([0.0, 0.5, 10.0, 150.0])
+    expected = [fspl(d, 98.1) for d in distances]
+    np.testing.assert_allclose(fspl_array(distances, 98.1), expected)
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from app.core.protection_ratios import DEFAULT_RATIOS, ProtectionRatios
+from app.regulatory.regulatory import RegulatoryStandard
+
+
+def test_lookups_fold_symmetric_tables_only():
+    fm, tv = DEFAULT_RATIOS.table("FM"), DEFAULT_RATIOS.table("TV")
+
+    np.testing.assert_array_equal(fm.exact([0, -200, 250, 600]), [45.0, 6.0, np.nan, -40.0])
+    np.testing.assert_array_equal(fm.nearest([90, 110, 300, 701], 100.0), [45.0, 6.0, 6.0, np.nan])
+    np.testing.assert_array_equal(tv.exact([-1, 1, 2]), [-28.0, -27.0, np.nan])
+    np.testing.assert_array_equal(tv.scaled(6.0).exact([-6, 6]), [-28.0, -27.0])
+
+
+def test_stored_rows_replace_defaults_per_service():
+    session = MagicMock()
+    session.execute.return_value.all.return_value = [("FM", 0.0, 37.0), ("FM", 200.0, 7.0)]
+
+    ratios = ProtectionRatios.from_session(session)
+    standard = RegulatoryStandard(ratios)
+
+    assert ratios.version != DEFAULT_RATIOS.version
+    assert ProtectionRatios.defaults().version == DEFAULT_RATIOS.version
+    assert ProtectionRatios.from_session(session) is ratios
+    assert standard.fm_pr == {0: 37.0, 200: 7.0}
+    assert standard.get_required_pr("TV", -6) == -28.0
+    assert np.isnan(standard.get_required_pr_array("FM", [400.0])[0])
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+import rasterio
+
+from app.core.rasters import evict_renders, read_raster, render_png, render_style, write_raster
+
+BBOX = {"north": -22.0, "south": -23.0, "east": -43.0, "west": -44.0}
+
+
+def test_raster_round_trip_is_north_up(tmp_path):
+    # Engine grids are south-up: row 0 is the southernmost latitude.
+    grid = np.array([[1.0, 2.0], [3.0, np.nan]])
+    path = write_raster(tmp_path / "field.tif", grid, BBOX)
+
+    data, bbox = read_raster(path)
+
+    assert data.dtype == np.float32
+    assert data[1].tolist() == [1.0, 2.0]
+    assert data[0, 0] == 3.0 and np.isnan(data[0, 1])
+    assert bbox == BBOX
+
+
+def test_raster_pixels_are_centred_on_grid_samples(tmp_path):
+    # 3 x 5 linspace samples: the bbox edges are the outer sample rows/columns.
+    lats = np.linspace(BBOX["south"], BBOX["north"], 3)
+    lons = np.linspace(BBOX["west"], BBOX["east"], 5)
+    path = write_raster(tmp_path / "grid.tif", np.zeros((3, 5)), BBOX)
+
+    with rasterio.open(path) as src:
+        assert src.res == (0.25, 0.5)
+        centres = [src.xy(row, col) for row, col in ((0, 0), (2, 4), (1, 2))]
+
+    assert centres == [(lons[0], lats[2]), (lons[4], lats[0]), (lons[2], lats[1])]
+
+
+def test_render_png_is_cached_per_style(tmp_path):
+    path = write_raster(tmp_path / "margin.tif", np.arange(16, dtype=float).reshape(4, 4), BBOX)
+
+    first = render_png(path, cmap="Reds", alpha=0.6)
+    again = render_png(path, cmap="Reds", alpha=0.6)
+    masked = render_png(path, cmap="Reds", alpha=0.6, mask_above=0.0)
+
+    assert first.exists() and first == again
+    assert masked != first and masked.exists()
+
+
+def test_render_styles_are_allow_listed_and_quantised(tmp_path):
+    path = write_raster(tmp_path / "margin.tif", np.arange(16, dtype=float).reshape(4, 4), BBOX)
+
+    assert render_style("Reds", 0.61, vmin=-3.2) == {
+        "cmap": "Reds", "alpha": 0.6, "vmin": -3.0, "vmax": None, "mask_below": None, "mask_above": None,
+    }
+    assert render_png(path, cmap="Reds", alpha=0.61) == render_png(path, cmap="Reds", alpha=0.6)
+    for style in ({"cmap": "not-a-cmap"}, {"alpha": 1.5}, {"vmin": float("nan")}, {"mask_above": 1e6}):
+        with pytest.raises(ValueError):
+            render_style(**style)
+
+
+def test_renders_are_dropped_with_their_raster_and_bounded(tmp_path):
+    grid = np.arange(16, dtype=float).reshape(4, 4)
+    path = write_raster(tmp_path / "margin.tif", grid, BBOX)
+    old = [render_png(path, cmap="Reds", alpha=alpha) for alpha in (0.2, 0.4, 0.6)]
+
+    # Rewriting the raster (a rerun) drops its renders.
+    write_raster(path, grid + 1.0, BBOX)
+    assert not any(render.exists() for render in old)
+
+    renders = [render_png(path, cmap="Reds", alpha=alpha) for alpha in (0.2, 0.4, 0.6)]
+    evicted = evict_renders(tmp_path / "renders", renders[-1].stat().st_size, keep=renders[-1])
+    assert renders[-1].exists()
+    assert evicted and not any(render.exists() for render in evicted)
@@ -1,19 +1,30 @@
 from __future__ import annotations
 
 from pathlib import Path
+from unittest.mock import MagicMock
 
+import numpy as np
 from geoalchemy2.shape import from_shape
 from shapely.geometry import Point
 
+from app.core.rasters import read_raster
 from app.models import Project, Station, User
-from app.regulatory.diffraction import calculate_interference_matrix
+from app.regulatory.contours import NeighborArrays, analyze_contours, screen_contours
+from app.regulatory.diffraction import calculate_interference_batch, calculate_interference_matrix
 from app.regulatory.regulatory import RegulatoryStandard
+from app.regulatory.search import NeighborCandidate, find_relevant_neighbors, find_relevant_neighbors_bulk
 
 
 class FlatProvider:
     def get_elevation_profile(self, lat_list, lon_list):
         return [10 for _ in lat_list]
 
+    def sample(self, lats, lons, fill_value=None):
+        return np.full(np.shape(lats), 10, dtype=np.int16)
+
+    def mosaic(self, south, west, north, east, spacing_m=None):
+        return self
+
 
 def test_fm_adjacent_station_viability(tmp_path, monkeypatch, db_session):
     # Redirect output directory to isolate test artifacts.
@@ -66,3 +77,317 @@ def test_fm_adjacent_station_viability(tmp_path, monkeypatch, db_session):
 
     assert Path(result["heatmap_path"]).exists()
     assert result["required_pr"] == 6.0
+
+
+def test_polar_mode_covers_same_cells(tmp_path, monkeypatch, db_session):
+    monkeypatch.setattr(
+        "app.regulatory.diffraction.OUTPUT_DIR", tmp_path, raising=False
+    )
+
+    owner = User(email="polar@example.com", password_hash="hash")
+    project = Project(name="Polar", owner=owner)
+    victim = Station(
+        name="Victim",
+        project=project,
+        station_type="FM",
+        status="Proposed",
+        latitude=0.0,
+        longitude=0.0,
+        frequency_mhz=98.1,
+        erp_kw=5.0,
+        antenna_height=30.0,
+        antenna_pattern={"azimuth": "omni"},
+        location=from_shape(Point(0.0, 0.0), srid=4326),
+    )
+    interferer = Station(
+        name="Interferer",
+        project=project,
+        station_type="FM",
+        status="Proposed",
+        latitude=0.135,
+        longitude=0.0,
+        frequency_mhz=98.3,
+        erp_kw=3.0,
+        antenna_height=25.0,
+        antenna_pattern={"azimuth": "omni"},
+        location=from_shape(Point(0.0, 0.135), srid=4326),
+    )
+    db_session.add_all([owner, project, victim, interferer])
+    db_session.flush()
+
+    kwargs = dict(
+        victim=victim,
+        interferer=interferer,
+        radius_km=10.0,
+        session=db_session,
+        provider=FlatProvider(),
+        resolution_m=1000,
+        render=False,
+    )
+    grid = calculate_interference_matrix(**kwargs)
+    grid_margin, _ = read_raster(grid["raster_path"])
+    polar = calculate_interference_matrix(mode="polar", **kwargs)
+    polar_margin, _ = read_raster(polar["raster_path"])
+
+    assert polar["required_pr"] == grid["required_pr"]
+    assert np.array_equal(np.isnan(grid_margin), np.isnan(polar_margin))
+    assert np.isfinite(polar_margin).any()
+
+
+def test_batch_matches_single_interferer_runs(tmp_path, monkeypatch, db_session):
+    monkeypatch.setattr(
+        "app.regulatory.diffraction.OUTPUT_DIR", tmp_path, raising=False
+    )
+
+    owner = User(email="batch@example.com", password_hash="hash")
+    project = Project(name="Batch", owner=owner)
+
+    def fm_station(name, lat, frequency_mhz, erp_kw):
+        return Station(
+            name=name,
+            project=project,
+            station_type="FM",
+            status="Proposed",
+            latitude=lat,
+            longitude=0.0,
+            frequency_mhz=frequency_mhz,
+            erp_kw=erp_kw,
+            antenna_height=30.0,
+            antenna_pattern={"azimuth": "omni"},
+            location=from_shape(Point(0.0, lat), srid=4326),
+        )
+
+    victim = fm_station("Victim", 0.0, 98.1, 5.0)
+    adjacent = fm_station("Adjacent", 0.135, 98.3, 3.0)
+    cochannel = fm_station("Co-channel", -0.2, 98.1, 1.0)
+    far_offset = fm_station("Far offset", 0.3, 99.9, 5.0)
+    db_session.add_all([owner, project, victim, adjacent, cochannel, far_offset])
+    db_session.flush()
+
+    common = dict(radius_km=10.0, session=db_session, provider=FlatProvider(), resolution_m=1000)
+    batch = calculate_interference_batch(victim, [adjacent, cochannel, far_offset], **common)
+    by_id = {entry["interferer_id"]: entry for entry in batch["interferers"]}
+
+    for interferer in (adjacent, cochannel):
+        single = calculate_interference_matrix(victim, interferer, render=False, **common)
+        assert by_id[interferer.id]["required_pr"] == single["required_pr"]
+        assert by_id[interferer.id]["impacted_area_km2"] == single["impacted_area_km2"]
+    assert "skipped" in by_id[far_offset.id]
+
+    aggregate = batch["aggregate"]
+    assert Path(aggregate["raster_path"]).exists()
+    # Power-summed nuisance can only be worse than any single entry.
+    assert aggregate["impacted_area_km2"] >= aggregate["any_single_impacted_area_km2"]
+    assert aggregate["any_single_impacted_area_km2"] >= max(
+        by_id[i.id]["impacted_area_km2"] for i in (adjacent, cochannel)
+    )
+
+
+def test_pruning_keeps_impacted_area(tmp_path, monkeypatch, db_session):
+    monkeypatch.setattr(
+        "app.regulatory.diffraction.OUTPUT_DIR", tmp_path, raising=False
+    )
+
+    owner = User(email="prune@example.com", password_hash="hash")
+    project = Project(name="Prune", owner=owner)
+    victim = Station(
+        name="Victim",
+        project=project,
+        station_type="FM",
+        status="Proposed",
+        latitude=0.0,
+        longitude=0.0,
+        frequency_mhz=98.1,
+        erp_kw=5.0,
+        antenna_height=30.0,
+        antenna_pattern={"azimuth": "omni"},
+        location=from_shape(Point(0.0, 0.0), srid=4326),
+    )
+    interferer = Station(
+        name="Second adjacent",
+        project=project,
+        station_type="FM",
+        status="Proposed",
+        latitude=0.05,
+        longitude=0.0,
+        frequency_mhz=98.5,
+        erp_kw=5.0,
+        antenna_height=30.0,
+        antenna_pattern={"azimuth": "omni"},
+        location=from_shape(Point(0.0, 0.05), srid=4326),
+    )
+    db_session.add_all([owner, project, victim, interferer])
+    db_session.flush()
+
+    kwargs = dict(
+        victim=victim,
+        interferer=interferer,
+        radius_km=10.0,
+        session=db_session,
+        provider=FlatProvider(),
+        resolution_m=500,
+        render=False,
+    )
+    exact = calculate_interference_matrix(**kwargs)
+    exact_margins, _ = read_raster(exact["raster_path"])
+    pruned = calculate_interference_matrix(prune=True, **kwargs)
+    pruned_margins, _ = read_raster(pruned["raster_path"])
+
+    assert exact["pruned_cells"] == 0
+    assert pruned["pruned_cells"] > 0
+    assert pruned["impacted_area_km2"] == exact["impacted_area_km2"]
+    # Pruned cells hold a lower bound that clears the PR; every other cell the exact margin.
+    np.testing.assert_array_equal(np.isnan(pruned_margins), np.isnan(exact_margins))
+    bounded = pruned_margins != exact_margins
+    bounded &= ~np.isnan(exact_margins)
+    assert 0 < np.count_nonzero(bounded) <= pruned["pruned_cells"]
+    assert np.all(pruned_margins[bounded] >= 0.0)
+    assert np.all(pruned_margins[bounded] <= exact_margins[bounded] + 1e-4)
+
+
+def test_contour_screen_matches_per_neighbor_analysis():
+    def fm(station_id, frequency_mhz, erp_kw):
+        return Station(
+            id=station_id, station_type="FM", frequency_mhz=frequency_mhz, erp_kw=erp_kw, antenna_height=50.0
+        )
+
+    proposal = fm(1, 98.1, 5.0)
+    neighbors = [
+        NeighborCandidate(fm(2, 98.1, 1.0), 1000.0, 0.0),  # co-channel: Ri alone spans thousands of km
+        NeighborCandidate(fm(3, 98.3, 1.0), 400.0, 90.0),  # first adjacent: Rp + Ri ~ 385 km
+        NeighborCandidate(fm(4, 98.5, 30.0), 5.0, 180.0),
+    ]
+    standard = RegulatoryStandard()
+
+    screen = screen_contours(proposal, NeighborArrays.from_candidates(neighbors), standard)
+    critical = analyze_contours(proposal, neighbors, standard)
+
+    assert list(screen.critical) == [True, False, True]
+    assert [c["neighbor_station_id"] for c in critical] == [2, 4]
+    assert list(screen.protection_ratio_db) == [45.0, 6.0, -20.0]
+    assert critical[1]["interferer_radius_km"] == screen.interferer_radius_km[2]
+
+    far_offset = NeighborArrays.from_candidates([NeighborCandidate(fm(5, 99.1, 1.0), 1.0, 0.0)])
+    untabulated = screen_contours(proposal, far_offset, standard)
+    assert np.isnan(untabulated.protection_ratio_db[0]) and not untabulated.critical[0]
+
+
+def test_bulk_discovery_matches_per_proposal_search(db_session):
+    owner = User(email="bulk@example.com", password_hash="hash")
+    project = Project(name="Bulk", owner=owner)
+
+    def fm(name, lat, lon, freq):
+        return Station(
+            name=name,
+            project=project,
+            station_type="FM",
+            latitude=lat,
+            longitude=lon,
+            frequency_mhz=freq,
+            erp_kw=1.0,
+            antenna_height=30.0,
+            location=from_shape(Point(lon, lat), srid=4326),
+        )
+
+    stations = [
+        fm("A", 0.0, 0.0, 98.1),
+        fm("B", 0.5, 0.0, 98.3),
+        fm("C", 0.0, 1.0, 98.7),
+        fm("D", 0.0, 2.0, 101.1),
+        fm("E", 5.0, 0.0, 98.1),
+    ]
+    db_session.add_all([owner, project, *stations])
+    db_session.flush()
+    site = Station(station_type="FM", latitude=0.2, longitude=0.2, frequency_mhz=98.5)
+
+    rows = find_relevant_neighbors_bulk([*stations[:3], site], db_session)
+
+    for index, proposal in enumerate(stations[:3]):
+        expected = {n.station.id: n for n in find_relevant_neighbors(proposal, db_session)}
+        got = {row.station_id: row for row in rows if row.proposal_index == index}
+        assert got.keys() == expected.keys()
+        for station_id, row in got.items():
+            assert abs(row.distance_km - expected[station_id].distance_km) < 0.01
+            assert abs(row.azimuth_deg - expected[station_id].azimuth_deg) < 0.1
+    assert {row.name for row in rows if row.proposal_index == 3} == {"A", "B", "C"}
+
+
+class PatchyProvider(FlatProvider):
+    """Flat terrain with no tiles north of 0.02 degrees."""
+
+    def sample(self, lats, lons, fill_value=None):
+        return np.where(np.asarray(lats) > 0.02, np.nan, 10.0)
+
+
+def test_aggregate_of_one_interferer_is_its_margin(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "app.regulatory.diffraction.OUTPUT_DIR", tmp_path, raising=False
+    )
+
+    def fm_station(station_id, lat, frequency_mhz):
+        return Station(
+            id=station_id,
+            station_type="FM",
+            latitude=lat,
+            longitude=0.0,
+            frequency_mhz=frequency_mhz,
+            erp_kw=5.0,
+            antenna_height=30.0,
+            antenna_pattern={"azimuth": "omni"},
+            location=from_shape(Point(0.0, lat), srid=4326),
+        )
+
+    victim, interferer = fm_station(1, 0.0, 98.1), fm_station(2, 0.05, 98.3)
+    session = MagicMock()
+    session.execute.return_value.scalar_one_or_none.return_value = 0
+
+    batch = calculate_interference_batch(
+        victim, [interferer], radius_km=10.0, session=session, provider=PatchyProvider(),
+        resolution_m=1000, standard=RegulatoryStandard(), write_rasters=True,
+    )
+
+    single, _ = read_raster(batch["interferers"][0]["raster_path"])
+    aggregate, _ = read_raster(batch["aggregate"]["raster_path"])
+    np.testing.assert_allclose(aggregate, single, rtol=1e-5)
+    assert batch["aggregate"]["impacted_area_km2"] == batch["interferers"][0]["impacted_area_km2"]
+
+
+def test_pruned_cells_skip_terrain_and_keep_their_bound(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "app.regulatory.diffraction.OUTPUT_DIR", tmp_path, raising=False
+    )
+
+    def fm_station(station_id, lat, frequency_mhz):
+        return Station(
+            id=station_id,
+            station_type="FM",
+            latitude=lat,
+            longitude=0.0,
+            frequency_mhz=frequency_mhz,
+            erp_kw=5.0,
+            antenna_height=30.0,
+            antenna_pattern={"azimuth": "omni"},
+            location=from_shape(Point(0.0, lat), srid=4326),
+        )
+
+    session = MagicMock()
+    session.execute.return_value.scalar_one_or_none.return_value = 0
+    kwargs = dict(
+        victim=fm_station(1, 0.0, 98.1), interferer=fm_station(2, 0.05, 98.5), radius_km=10.0, session=session,
+        provider=FlatProvider(), resolution_m=500, render=False, standard=RegulatoryStandard(),
+    )
+
+    exact = calculate_interference_matrix(**kwargs)
+    exact_margins, _ = read_raster(exact["raster_path"])
+    pruned = calculate_interference_matrix(prune=True, **kwargs)
+    pruned_margins, _ = read_raster(pruned["raster_path"])
+
+    assert "pruned_mask" not in pruned
+    assert pruned["pruned_cells"] > 0
+    # Neither link's terrain is evaluated at a pruned cell.
+    assert pruned["terrain_cells"] == exact["terrain_cells"] - 2 * pruned["pruned_cells"]
+    assert pruned["impacted_area_km2"] == exact["impacted_area_km2"]
+    np.testing.assert_array_equal(np.isnan(pruned_margins), np.isnan(exact_margins))
+    bounded = (pruned_margins != exact_margins) & ~np.isnan(exact_margins)
+    assert np.all(pruned_margins[bounded] >= 0.0)
+    assert np.all(pruned_margins[bounded] <= exact_margins[bounded] + 1e-4)
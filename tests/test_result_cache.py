@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from geoalchemy2.shape import from_shape
+from shapely.geometry import Point
+
+from app.core.result_cache import ResultCache, coverage_cache_key
+from app.models import AntennaModel, Station
+
+
+def _station(**overrides):
+    fields = dict(
+        name="Station A",
+        station_type="FM",
+        latitude=-22.0,
+        longitude=-43.0,
+        frequency_mhz=100.0,
+        erp_kw=1.0,
+        antenna_height=30.0,
+        azimuth=0.0,
+        mechanical_tilt=0.0,
+        antenna_pattern={"azimuth": "omni"},
+        location=from_shape(Point(-43.0, -22.0), srid=4326),
+    )
+    fields.update(overrides)
+    return Station(**fields)
+
+
+def test_key_ignores_identity_but_not_physics():
+    key = coverage_cache_key(_station(), 30.0, 100, "fspl-gradient/1", "t1")
+
+    assert coverage_cache_key(_station(name="Copy"), 30.0, 100, "fspl-gradient/1", "t1") == key
+    assert coverage_cache_key(_station(erp_kw=2.0), 30.0, 100, "fspl-gradient/1", "t1") != key
+    directional = _station(antenna_pattern={"horizontal": [0, 3, 10, 3]})
+    assert coverage_cache_key(directional, 30.0, 100, "fspl-gradient/1", "t1") != key
+    assert coverage_cache_key(_station(), 30.0, 200, "fspl-gradient/1", "t1") != key
+    assert coverage_cache_key(_station(), 30.0, 100, "fspl-gradient/1", "t2") != key
+
+
+def test_key_follows_the_antenna_model_pattern():
+    model = AntennaModel(name="Panel", horizontal_pattern={"0": 0, "90": 3, "180": 10, "270": 3})
+    key = coverage_cache_key(_station(antenna_model=model), 30.0, 100, "fspl-gradient/1", "t1")
+
+    assert key != coverage_cache_key(_station(), 30.0, 100, "fspl-gradient/1", "t1")
+    model.horizontal_pattern["180"] = 20
+    assert coverage_cache_key(_station(antenna_model=model), 30.0, 100, "fspl-gradient/1", "t1") != key
+
+
+def _raster(tmp_path: Path, name: str, size: int) -> Path:
+    path = tmp_path / name
+    path.write_bytes(b"\0" * size)
+    return path
+
+
+def test_put_moves_raster_and_get_returns_it(tmp_path):
+    cache = ResultCache(tmp_path / "cache", max_bytes=10_000)
+    bbox = {"north": 1.0, "south": 0.0, "east": 1.0, "west": 0.0}
+
+    entry = cache.put("abc", _raster(tmp_path, "coverage.tif", 100), bbox, {"cmap": "inferno"})
+
+    assert not (tmp_path / "coverage.tif").exists()
+    assert Path(entry["raster_path"]).exists()
+    assert cache.get("abc") == entry
+    assert cache.get("missing") is None
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    cache = ResultCache(tmp_path / "cache", max_bytes=2_500)
+    bbox = {"north": 1.0, "south": 0.0, "east": 1.0, "west": 0.0}
+    cache.put("old", _raster(tmp_path, "a.tif", 1_000), bbox)
+    cache.put("used", _raster(tmp_path, "b.tif", 1_000), bbox)
+    # Age both entries, then touch "used" so "old" is the LRU.
+    for key in ("old", "used"):
+        os.utime(cache.root / f"{key}.json", (1, 1))
+    cache.get("used")
+
+    cache.put("new", _raster(tmp_path, "c.tif", 1_000), bbox)
+
+    assert cache.get("old") is None
+    assert cache.get("used") is not None
+    assert cache.get("new") is not None
+
+
+def test_checked_out_raster_survives_eviction(tmp_path):
+    cache = ResultCache(tmp_path / "cache", max_bytes=1_500)
+    bbox = {"north": 1.0, "south": 0.0, "east": 1.0, "west": 0.0}
+    entry = cache.put("first", _raster(tmp_path, "a.tif", 1_000), bbox)
+
+    owned = cache.checkout(entry, tmp_path / "simulations" / "sim-1.tif")
+    cache.put("second", _raster(tmp_path, "b.tif", 1_000), bbox)
+
+    assert cache.get("first") is None
+    assert Path(owned["raster_path"]).read_bytes() == b"\0" * 1_000
+    assert owned["bbox"] == bbox
+    elsewhere = {"raster_path": str(tmp_path / "interference.tif"), "bbox": bbox}
+    assert cache.checkout(elsewhere, tmp_path / "simulations" / "sim-2.tif") is elsewhere
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+import numpy as np
+from geoalchemy2.shape import from_shape
+from pyproj import Geod
+from shapely.geometry import Point
+from sqlalchemy import update
+
+from app.core.station_index import StationIndex
+from app.models import Project, Station, User
+
+
+def _stations(n=5000, seed=3):
+    rng = np.random.default_rng(seed)
+    ids = np.arange(1, n + 1)
+    services = np.where(rng.random(n) < 0.7, "FM", "TV")
+    lats = rng.uniform(-30.0, -15.0, n)
+    lons = rng.uniform(-55.0, -38.0, n)
+    freqs = np.where(services == "FM", 87.9 + 0.2 * rng.integers(0, 101, n), rng.uniform(54.0, 700.0, n))
+    return ids, services, lats, lons, freqs
+
+
+def test_query_matches_brute_force_geodesic_filter():
+    ids, services, lats, lons, freqs = _stations()
+    index = StationIndex(refresh_s=0).load(ids, services, lats, lons, freqs)
+
+    hits = index.query(-23.5, -46.6, "FM", 300.0, 97.5, 98.7, exclude_id=ids[0])
+
+    az, _, dist_m = Geod(ellps="WGS84").inv(np.full(ids.size, -46.6), np.full(ids.size, -23.5), lons, lats)
+    expected = (
+        (services == "FM") & (freqs >= 97.5) & (freqs <= 98.7) & (dist_m / 1000.0 <= 300.0) & (ids != ids[0])
+    )
+    assert len(hits) > 0
+    assert set(hits.station_ids.tolist()) == set(ids[expected].tolist())
+    assert np.all(np.diff(hits.distance_km) >= 0)
+    by_id = dict(zip(ids.tolist(), (az + 360.0) % 360.0))
+    np.testing.assert_allclose(hits.azimuth_deg, [by_id[i] for i in hits.station_ids.tolist()])
+    assert len(index.query(-23.5, -46.6, "FM", 300.0, 97.5, 98.7, limit=3)) == 3
+
+
+def test_refresh_reloads_only_when_version_changes():
+    session = MagicMock()
+    rows = [(1, "FM", -23.5, -46.6, 98.1)]
+    session.execute.return_value.one.return_value = (1, 1, "t0")
+    session.execute.return_value.all.return_value = rows
+    index = StationIndex(refresh_s=0)
+
+    index.refresh(session)
+    assert index.size == 1 and index.version == (1, 1, "t0")
+
+    rows.append((2, "FM", -23.6, -46.7, 98.3))
+    index.refresh(session)
+    assert index.size == 1
+
+    session.execute.return_value.one.return_value = (2, 2, "t1")
+    index.refresh(session)
+    assert index.size == 2
+    assert index.query(-23.5, -46.6, "FM", 50.0, 97.5, 98.7, exclude_id=1).station_ids.tolist() == [2]
+
+
+def test_bulk_update_moves_the_station_version(db_session):
+    owner = User(email="index@example.com", password_hash="hash")
+    project = Project(name="Index", owner=owner)
+    station = Station(
+        name="Station A",
+        project=project,
+        station_type="FM",
+        status="Proposed",
+        latitude=-23.5,
+        longitude=-46.6,
+        frequency_mhz=98.1,
+        erp_kw=5.0,
+        antenna_height=30.0,
+        antenna_pattern={"azimuth": "omni"},
+        location=from_shape(Point(-46.6, -23.5), srid=4326),
+    )
+    db_session.add_all([owner, project, station])
+    db_session.flush()
+    before = StationIndex.station_version(db_session)
+
+    # Core statement: bypasses the ORM ``onupdate`` of ``updated_at``.
+    db_session.execute(update(Station).where(Station.id == station.id).values(frequency_mhz=98.3))
+    after = StationIndex.station_version(db_session)
+
+    assert after[:2] == before[:2]
+    assert after[2] > before[2]
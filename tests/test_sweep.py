@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import numpy as np
+from pyproj import Geod
+
+from app.models import Station
+from app.regulatory.contours import NeighborArrays, screen_contours, screen_pairs
+from app.regulatory.regulatory import RegulatoryStandard
+from app.regulatory.sweep import candidate_pairs
+
+
+def test_candidate_pairs_match_brute_force():
+    rng = np.random.default_rng(5)
+    n = 600
+    lats = rng.uniform(-25.0, -20.0, n)
+    lons = rng.uniform(-50.0, -44.0, n)
+    freqs = 87.9 + 0.2 * rng.integers(0, 101, n)
+
+    first, second, distance_km = candidate_pairs(lats, lons, freqs, 300.0, 0.6)
+
+    i, j = np.triu_indices(n, k=1)
+    _, _, dist_m = Geod(ellps="WGS84").inv(lons[i], lats[i], lons[j], lats[j])
+    expected = (dist_m / 1000.0 <= 300.0) & (np.abs(freqs[i] - freqs[j]) <= 0.6 + 1e-6)
+    found = {(min(a, b), max(a, b)) for a, b in zip(first.tolist(), second.tolist())}
+    assert len(found) == first.size
+    assert found == set(zip(i[expected].tolist(), j[expected].tolist()))
+    by_pair = dict(zip(zip(i.tolist(), j.tolist()), dist_m / 1000.0))
+    ordered = zip(np.minimum(first, second).tolist(), np.maximum(first, second).tolist())
+    np.testing.assert_allclose(distance_km, [by_pair[pair] for pair in ordered])
+
+
+def test_screen_pairs_matches_per_proposal_screen():
+    standard = RegulatoryStandard()
+    freqs = np.array([98.1, 98.1, 98.3, 98.7])
+    erp = np.array([5.0, 1.0, 10.0, 0.5])
+    height = np.array([30.0, 60.0, 45.0, 20.0])
+    distance_km = np.array([1000.0, 400.0, 5.0])
+    victim = np.zeros(3, dtype=int)
+    interferer = np.array([1, 2, 3])
+
+    offsets, pr, overlap = screen_pairs("FM", freqs, erp, height, victim, interferer, distance_km, standard)
+
+    proposal = Station(station_type="FM", frequency_mhz=98.1, erp_kw=5.0, antenna_height=30.0)
+    screen = screen_contours(proposal, NeighborArrays(freqs[1:], erp[1:], height[1:], distance_km), standard)
+    np.testing.assert_allclose(offsets, screen.freq_offset)
+    np.testing.assert_allclose(pr, screen.protection_ratio_db)
+    np.testing.assert_allclose(overlap, screen.overlap_km)
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 import numpy as np
+import rasterio
+import pytest
 
-from app.core.terrain import ElevationProvider
+from app.core.terrain import ElevationProvider, HgtTileStore
+from app.core.terrain_store import build_terrain_store
 
 
 def test_elevation_profile_from_mock_hgt(tmp_path):
@@ -24,3 +27,131 @@ def test_elevation_profile_from_mock_hgt(tmp_path):
     assert elevations[0] == 900
     # Point near the southeast corner should read the bottom-right value.
     assert elevations[1] == 702
+
+
+def test_sample_batches_across_tiles(tmp_path):
+    west = np.array([[1, 2], [3, 4]], dtype=">i2")
+    east = np.array([[5, 6], [7, 8]], dtype=">i2")
+    west.tofile(tmp_path / "N10W001.hgt")
+    east.tofile(tmp_path / "N10E000.hgt")
+
+    provider = ElevationProvider(srtm_root=tmp_path)
+    lats = np.array([[10.9, 10.1], [10.9, 10.1]])
+    lons = np.array([[-0.9, -0.1], [0.1, 0.9]])
+    elevations = provider.sample(lats, lons)
+
+    assert elevations.shape == (2, 2)
+    assert elevations.dtype == np.int16
+    assert elevations.tolist() == [[1, 4], [5, 8]]
+
+
+def test_sample_fill_value_for_missing_tile(tmp_path):
+    np.array([[1, 2], [3, 4]], dtype=">i2").tofile(tmp_path / "N10W001.hgt")
+    provider = ElevationProvider(srtm_root=tmp_path)
+
+    elevations = provider.sample([10.9, 20.5], [-0.9, 5.5], fill_value=np.nan)
+
+    assert elevations[0] == 1
+    assert np.isnan(elevations[1])
+
+
+def test_tile_store_indexes_directory_and_memory_maps(tmp_path):
+    np.array([[1, 2], [3, 4]], dtype=">i2").tofile(tmp_path / "S23W044.hgt")
+    (tmp_path / "notes.txt").write_text("not a tile")
+    store = HgtTileStore(tmp_path)
+
+    assert set(store.index) == {(-23, -44)}
+    tile = store.open(store.path_for(-23, -44))
+    assert isinstance(tile, np.memmap)
+    assert tile[1, 0] == 3
+
+    with pytest.raises(FileNotFoundError):
+        store.path_for(-22, -44)
+
+
+def test_mosaic_joins_tiles_and_interpolates_across_edge(tmp_path):
+    # 3x3 tiles share their edge column: west tile's last column == east tile's first.
+    west = np.array([[0, 10, 20], [0, 10, 20], [0, 10, 20]], dtype=">i2")
+    east = np.array([[20, 30, 40], [20, 30, 40], [20, 30, 40]], dtype=">i2")
+    west.tofile(tmp_path / "N10W001.hgt")
+    east.tofile(tmp_path / "N10E000.hgt")
+    provider = ElevationProvider(srtm_root=tmp_path)
+
+    mosaic = provider.mosaic(10.0, -1.0, 11.0, 1.0)
+
+    assert mosaic.data.dtype == np.float32
+    assert mosaic.data.shape == (3, 5)
+    assert mosaic.data[0].tolist() == [0, 10, 20, 30, 40]
+    # Bilinear sampling is continuous across the 0 deg meridian.
+    values = mosaic.sample([10.5, 10.5, 10.5], [-0.25, 0.0, 0.25])
+    np.testing.assert_allclose(values, [15.0, 20.0, 25.0])
+
+
+def test_mosaic_missing_tiles_are_nan(tmp_path):
+    np.array([[1, 1], [1, 1]], dtype=">i2").tofile(tmp_path / "N10W001.hgt")
+    provider = ElevationProvider(srtm_root=tmp_path)
+
+    mosaic = provider.mosaic(10.2, -0.8, 10.8, 0.8)
+
+    assert mosaic.sample([10.5], [-0.5])[0] == 1
+    assert np.isnan(mosaic.sample([10.5], [0.5], fill_value=np.nan)[0])
+    with pytest.raises(FileNotFoundError):
+        mosaic.sample([10.5], [0.5])
+
+
+def test_terrain_store_levels_and_selection(tmp_path):
+    # 10 arcsec tiles (361 samples per side) -> native 10" level plus a 30" overview.
+    srtm = tmp_path / "srtm"
+    srtm.mkdir()
+    ramp = np.tile(np.arange(361, dtype=">i2"), (361, 1))
+    ramp.tofile(srtm / "S23W044.hgt")
+    (ramp + 360).astype(">i2").tofile(srtm / "S23W043.hgt")
+
+    written = build_terrain_store(srtm, srtm / "store", levels_arcsec=(3, 9, 30))
+    assert sorted(written) == [10, 30]
+
+    provider = ElevationProvider(srtm_root=srtm)
+    assert provider.store is not None
+    assert provider.store.select_level(None) == 10
+    assert provider.store.select_level(500.0) == 10
+    assert provider.store.select_level(1000.0) == 30
+
+    fine = provider.mosaic(-22.6, -43.2, -22.4, -42.8, spacing_m=300.0)
+    coarse = provider.mosaic(-22.6, -43.2, -22.4, -42.8, spacing_m=2000.0)
+    assert coarse.step == pytest.approx(30 / 3600)
+    assert coarse.data.size < fine.data.size
+    # Both levels agree with the HGT ramp, including across the tile seam at -43.
+    lons = np.array([-43.1, -43.0, -42.9])
+    expected = provider.sample(np.full(3, -22.5), lons)
+    np.testing.assert_allclose(fine.sample(np.full(3, -22.5), lons), expected, atol=1)
+    np.testing.assert_allclose(coarse.sample(np.full(3, -22.5), lons), expected, atol=1)
+
+
+def test_terrain_store_overviews_are_block_averages(tmp_path):
+    # A 300 m ridge every third sample: decimating by 3 would keep only the ridges.
+    srtm = tmp_path / "srtm"
+    srtm.mkdir()
+    ridges = np.zeros((361, 361), dtype=">i2")
+    ridges[:, ::3] = 300
+    ridges[:, 180:183] = -32768  # Voids only shrink the footprints they fall in.
+    ridges.tofile(srtm / "S23W044.hgt")
+
+    written = build_terrain_store(srtm, srtm / "store", levels_arcsec=(30,))
+
+    with rasterio.open(written[30]) as src:
+        overview = src.read(1)
+    assert overview.shape == (121, 121)
+    # Each 30" pixel averages native columns 3c-1..3c+1: one ridge, two valleys.
+    np.testing.assert_array_equal(np.delete(overview[:, 1:-1], [59, 60], axis=1), 100)
+    assert np.all(overview[:, 60] == 0)  # Columns 180-181 void: only the valley at 179
+    assert np.all(overview[:, 61] == 150)  # Column 182 void: the ridge at 183 and the valley at 184
+    assert np.all(overview[:, [0, -1]] == 150)  # Footprints cut by the raster edge
+
+
+def test_version_changes_when_tiles_change(tmp_path):
+    np.array([[1, 2], [3, 4]], dtype=">i2").tofile(tmp_path / "N10W001.hgt")
+    version = ElevationProvider(srtm_root=tmp_path).version
+
+    assert ElevationProvider(srtm_root=tmp_path).version == version
+    np.array([[5, 6], [7, 8]], dtype=">i2").tofile(tmp_path / "N10E000.hgt")
+    assert ElevationProvider(srtm_root=tmp_path).version != version